@@ -1,4 +1,6 @@
 import discord
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from discord import app_commands
 from discord.ext import commands
@@ -17,6 +19,25 @@ except ImportError:
 scopes = ['https://www.googleapis.com/auth/spreadsheets']
 logger = settings.logging.getLogger("discord")
 
+# The Sheets client is not thread-safe, so every request runs on one worker thread
+_sheets_executor = None
+
+
+def get_sheets_executor():
+    """Return the worker thread that executes Google Sheets requests"""
+    global _sheets_executor
+    if _sheets_executor is None:
+        _sheets_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="google-sheets")
+    return _sheets_executor
+
+
+def rows_to_cells(rows):
+    """Convert rows of values to RowData for updateCells/appendCells, written as plain text like RAW input"""
+    return [
+        {'values': [{'userEnteredValue': {'stringValue': str(value)}} for value in row]}
+        for row in rows
+    ]
+
 class Import_Export(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -50,44 +71,59 @@ class Import_Export(commands.Cog):
 
         return spreadsheets_service
     
-    #Method to check if a sheet exists, returns True/False
-    def isSheetExists(self, sheet_name):
-        spreadsheet = self.spreadsheets_service.get(spreadsheetId=self.googleSheetId).execute()
-        sheets = spreadsheet.get('sheets', [])
+    async def run_sheets_request(self, request):
+        """Execute a prepared Sheets API request on the Sheets worker thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_sheets_executor(), request.execute)
+
+    async def sheet_ids(self):
+        """Return {sheet title: sheetId} for every sheet of the spreadsheet"""
+        spreadsheet = await self.run_sheets_request(self.spreadsheets_service.get(
+            spreadsheetId=self.googleSheetId, fields='sheets.properties(sheetId,title)'
+        ))
+        return {sheet['properties']['title']: sheet['properties']['sheetId'] for sheet in spreadsheet.get('sheets', [])}
 
-        for sheet in sheets:
-            if sheet['properties']['title'] == sheet_name:
-                return True
-        return False
+    #Method to check if a sheet exists, returns True/False
+    async def isSheetExists(self, sheet_name):
+        return sheet_name in await self.sheet_ids()
     
     '''Method to create a sheet with the name passed in and a bool to clear the sheet if it already exists
         steps:
-            Check if the sheet name already exist, 
-                if not then create it 
-                    Call the API to add a new sheet
-                    Get the new sheet's ID from the response and return the value
-                if exist then check if the clear parm is True to delete the data
+            Look up the existing sheets once
+            Build one batchUpdate that
+                adds the sheet with a chosen ID if it does not exist
+                or clears its values if it exists and clear is True
+                and appends the first chunk of rows
+            Send the remaining rows in further batchUpdates of SHEETS_BATCH_ROWS rows
+            Return the sheet ID
     '''
-    async def sheets_create(self, sheet_name, clear):
-        if not self.isSheetExists(sheet_name):
-            request_body = {'requests': [{'addSheet': {'properties': {'title': sheet_name}}}]}
+    async def sheets_create(self, sheet_name, clear, rows=(), batch_rows=None):
+        batch_rows = batch_rows or settings.SHEETS_BATCH_ROWS
+        sheet_ids = await self.sheet_ids()
+        sheet_id = sheet_ids.get(sheet_name)
 
-            response = self.spreadsheets_service.batchUpdate(spreadsheetId=self.googleSheetId, body=request_body).execute()
-
-            return response['replies'][0]['addSheet']['properties']['sheetId']
-        
+        requests = []
+        if sheet_id is None:
+            # Choosing the ID lets later requests in the same batch refer to the new sheet
+            sheet_id = max(sheet_ids.values(), default=0) + 1
+            requests.append({'addSheet': {'properties': {'sheetId': sheet_id, 'title': sheet_name}}})
         elif clear:
-            range_to_clear = f'{sheet_name}'
+            requests.append({'updateCells': {'range': {'sheetId': sheet_id}, 'fields': 'userEnteredValue'}})
 
-            request_body = {}
-            self.spreadsheets_service.values().clear(spreadsheetId=self.googleSheetId,range=range_to_clear,body=request_body).execute()
+        rows = list(rows)
+        chunks = [rows[start:start + batch_rows] for start in range(0, len(rows), batch_rows)] or [[]]
+        for chunk in chunks:
+            if chunk:
+                requests.append({'appendCells': {
+                    'sheetId': sheet_id, 'rows': rows_to_cells(chunk), 'fields': 'userEnteredValue'
+                }})
+            if requests:
+                await self.run_sheets_request(self.spreadsheets_service.batchUpdate(
+                    spreadsheetId=self.googleSheetId, body={'requests': requests}
+                ))
+            requests = []
 
-        # Get the sheet ID from the sheet name by looping through each sheet until it matches
-        spreadsheet = self.spreadsheets_service.get(spreadsheetId=self.googleSheetId).execute()
-        sheets = spreadsheet.get('sheets', [])
-        for sheet in sheets:
-            if sheet['properties']['title'] == sheet_name:
-                return sheet['properties']['sheetId']
+        return sheet_id
     
     '''Method to export the points data from the database to the sheet
         steps:
@@ -121,45 +157,30 @@ class Import_Export(commands.Cog):
             try:
                 await interaction.response.defer()
                 
-                # Create or clear sheet
+                # Export player data, off the event loop
+                db = Player_game_info()
                 try:
-                    await self.sheets_create(sheet_name, True)
-                except Exception as sheet_error:
-                    logger.error(f"Error creating/clearing sheet: {sheet_error}")
-                    await interaction.followup.send(
-                        f"⚠️ Error preparing Google Sheet: {str(sheet_error)}",
-                        ephemeral=True
-                    )
-                    return
-
-                # Export player data
-                db = Tournament_DB()
-                header, list_of_playeres = Player_game_info.exportToGoogleSheet(db)
-                db.close_db()
+                    header, list_of_playeres = await db.exportToGoogleSheet_async()
+                finally:
+                    db.close_db()
                 
                 if not list_of_playeres:
                     await interaction.followup.send("No player data found to export.", ephemeral=True)
                     return
 
-                # Format data for Google Sheets
-                data = [list(map(str, row)) for row in list_of_playeres]
-                data.insert(0, header)
-
-                # Define range and update sheet
-                start_cell = 'A1'
-                end_cell = f'{chr(ord("A") + len(data[0]) - 1)}{len(data)}'
-                range_name = f'{sheet_name}!{start_cell}:{end_cell}'
-
-                body = {'values': data}
-                self.spreadsheets_service.values().update(
-                    spreadsheetId=self.googleSheetId,
-                    range=range_name,
-                    valueInputOption='RAW',
-                    body=body
-                ).execute()
+                # Create or clear the sheet and write the data in as few requests as possible
+                try:
+                    sheet_id = await self.sheets_create(sheet_name, True, [header] + [list(row) for row in list_of_playeres])
+                except Exception as sheet_error:
+                    logger.error(f"Error writing Google Sheet: {sheet_error}")
+                    await interaction.followup.send(
+                        f"⚠️ Error writing Google Sheet: {str(sheet_error)}",
+                        ephemeral=True
+                    )
+                    return
                 
                 # Create sheet URL and send success message
-                sheet_url = f"https://docs.google.com/spreadsheets/d/{self.googleSheetId}/edit#gid=0"
+                sheet_url = f"https://docs.google.com/spreadsheets/d/{self.googleSheetId}/edit#gid={sheet_id}"
                 
                 # More descriptive success message
                 if custom_name:
@@ -213,9 +234,9 @@ class Import_Export(commands.Cog):
                 
                 # Fetch data from Google Sheet
                 try:
-                    sheet_data = self.spreadsheets_service.values().get(
+                    sheet_data = await self.run_sheets_request(self.spreadsheets_service.values().get(
                         spreadsheetId=self.googleSheetId, range=sheet_name
-                    ).execute()
+                    ))
                     
                     values = sheet_data.get("values", [])
                     if not values:
@@ -233,75 +254,26 @@ class Import_Export(commands.Cog):
                     )
                     return
 
-                # Process headers and rows
-                headers = [header.strip() for header in values[0]]
-                rows = values[1:]
-                db = Tournament_DB()
-                
-                records_updated = 0
-                records_created = 0
-
-                # Get table columns for both tables
-                table_columns = Player_game_info.metadata(db)
-                table_columns = {row[1]: row[1] for row in table_columns}  
-                valid_columns = [col for col in headers if col in table_columns]
-
-                player_columns = Player.metadata(db)
-                p_table_columns = {row[1]: row[1] for row in player_columns}
-                p_valid_columns = [col for col in headers if col in p_table_columns]
-                
-                # Process each row
-                for row in rows:
-                    # If row is shorter than headers, extend it with None values
-                    if len(row) < len(headers):
-                        row = row + [None] * (len(headers) - len(row))
-                        
-                    # Convert row into {header: value} format
-                    row_data = dict(zip(headers, row))
-                    
-                    values_to_insert = [row_data.get(col, None) for col in valid_columns]
-                    p_values_to_insert = [row_data.get(col, None) for col in p_valid_columns]
-
-                    if "player_id" in row_data:
-                        # Update player table first
-                        sql_query = f"""
-                            INSERT INTO player ({', '.join(p_valid_columns)}) 
-                            VALUES ({', '.join(['?' for _ in p_valid_columns])}) 
-                            ON CONFLICT(player_id) DO UPDATE SET 
-                            {', '.join([f"{col} = EXCLUDED.{col}" for col in p_valid_columns if col != 'player_id'])};
-                        """
-                        result = Player.generalplayerQuery(db, sql_query, p_values_to_insert)
-                        
-                        # Then update playerGameDetail table
-                        column_names = ', '.join(valid_columns)
-                        placeholders = ', '.join(['?' for _ in valid_columns])
-                        query = "SELECT COUNT(*) FROM playerGameDetail WHERE player_id = ?"
-                        query_params = (row_data["player_id"],)
-
-                        isExistPlayerId = Player_game_info.isExistPlayerId(db, query=query, query_param=query_params)
+                # Validate and upsert every row in one transaction, off the event loop
+                db = Player_game_info()
+                try:
+                    summary = await db.bulk_import_async(values[0], values[1:])
+                finally:
+                    db.close_db()
 
-                        if isExistPlayerId:
-                            update_query = f"""
-                                UPDATE playerGameDetail
-                                SET {', '.join([f"{col} = ?" for col in valid_columns if col != 'player_id'])}
-                                WHERE player_id = ?;
-                            """
-                            Player_game_info.importToDb(db, update_query, [row_data.get(col, None) for col in valid_columns if col != 'player_id'] + [row_data["player_id"]])
-                            records_updated += 1
-                        else:
-                            insert_query = f"""
-                                INSERT INTO playerGameDetail ({column_names}) 
-                                VALUES ({placeholders});
-                            """
-                            Player_game_info.importToDb(db, insert_query, [row_data.get(col, None) for col in valid_columns])
-                            records_created += 1
+                invalid_lines = "\n".join(f"Row {row_number}: {reason}" for row_number, reason in summary["invalid"][:10])
+                message = (
+                    f"✅ Import completed successfully!\n\n**Sheet:** {sheet_name}\n"
+                    f"**Records processed:** {summary['rows']} ({summary['rows_per_second']:.0f} rows/s)\n"
+                    f"**Records created:** {len(summary['inserted'])}\n"
+                    f"**Records updated:** {len(summary['updated'])}\n"
+                    f"**Records unchanged:** {len(summary['unchanged'])}"
+                )
+                if summary["invalid"]:
+                    message += f"\n**Rows skipped:** {len(summary['invalid'])}\n{invalid_lines}"
 
-                db.close_db()
-                
                 # Success message with stats
-                await interaction.followup.send(
-                    f"✅ Import completed successfully!\n\n**Sheet:** {sheet_name}\n**Records processed:** {len(rows)}\n**Records created:** {records_created}\n**Records updated:** {records_updated}"
-                )
+                await interaction.followup.send(message)
                 
             except Exception as ex:
                 logger.error(f"Import error: {ex}")
@@ -1,13 +1,16 @@
 import discord
 import asyncio
 import random
+import time
 import json
-import requests
 from discord import app_commands
 from discord.ext import commands
 from tournament_bot.config import settings
 from tournament_bot.models.dbc_model import Tournament_DB, Game
-from tournament_bot.bot.services.genetic_matchmaking import GeneticMatchMaking
+from tournament_bot.bot.services.genetic_matchmaking import GeneticMatchMaking, shutdown_process_pool
+from tournament_bot.bot.services.lobby_partitioner import partition_lobbies_async
+from tournament_bot.bot.services.riot_refresh import get_refresh_scheduler
+from tournament_bot.integrations.overfast import fetch_hero_roles, fetch_player_stats, get_overfast_cache
 from google import genai
 from google.genai import types
 
@@ -17,15 +20,11 @@ logger = settings.logging.getLogger("discord")
 client = genai.Client(api_key=settings.GEMINI_API_KEY)
 
 def get_hero_roles():
-    roles_dict = {}
     try:
-        response = requests.get("https://overfast-api.tekrop.fr/heroes")
-        if response.status_code == 200:
-            for hero in response.json():
-                roles_dict[hero['key']] = hero['role']
+        return fetch_hero_roles()
     except Exception as e:
-        print(f"Failed to fetch roles: {e}")
-    return roles_dict
+        logger.error(f"Failed to fetch roles: {e}")
+        return {}
 
 def extract_stat(categories, target_category_label, target_stat_label=None):
     if not categories:
@@ -52,11 +51,8 @@ def build_team_report_sync(usernames):
     skipped_players = {}  # NEW: Track players who fail validation
 
     for battletag in usernames:
-        formatted_tag = battletag.replace('#', '-')
-        
-        # 1. Fetch summary to check privacy
-        summary_url = f"https://overfast-api.tekrop.fr/players/{formatted_tag}/summary"
-        summary_res = requests.get(summary_url)
+        # 1. Fetch summary to check privacy, then competitive stats for BOTH PC and Console
+        summary_res, res_pc, res_console = fetch_player_stats(battletag, "competitive")
         
         if summary_res.status_code != 200:
             skipped_players[battletag] = "Profile not found or API error (Check spelling/casing)."
@@ -67,11 +63,7 @@ def build_team_report_sync(usernames):
             skipped_players[battletag] = "Profile is set to private."
             continue
 
-        # 2. Fetch Competitive detailed stats for BOTH PC and Console
-        stats_url = f"https://overfast-api.tekrop.fr/players/{formatted_tag}/stats"
-        res_pc = requests.get(stats_url, params={"platform": "pc", "gamemode": "competitive"})
-        res_console = requests.get(stats_url, params={"platform": "console", "gamemode": "competitive"})
-        
+        # 2. Competitive detailed stats
         stats_pc = res_pc.json() if res_pc.status_code == 200 else {}
         stats_console = res_console.json() if res_console.status_code == 200 else {}
 
@@ -138,6 +130,8 @@ def build_team_report_sync(usernames):
         else:
             team_data[battletag] = player_extracted_data
 
+    get_overfast_cache().log_stats("OverFast")
+
     if not team_data:
         return "No valid, public player data could be retrieved. Make sure profiles are public and have Competitive playtime."
 
@@ -268,6 +262,50 @@ def build_overwatch_report_embeds(report_text: str):
 class MatchmakingController(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+
+    def cog_unload(self):
+        shutdown_process_pool()
+
+    async def _balance_pools(self, interaction, matchmaker, pools, team_size, time_budget=None):
+        """
+        Run the genetic algorithm for every pool concurrently in the process pool
+
+        Sends a progress message as each game finishes.
+
+        Args:
+            time_budget: Wall-clock limit in seconds for each game, defaults to settings.GA_TIME_BUDGET
+
+        Returns:
+            List of (processed_players, best_chromosome) in pool order
+        """
+        processed_pools = [await matchmaker.calculate_performance(pool) for pool in pools]
+
+        async def balance(pool_idx):
+            best_chromosome, best_fitness, stats = await matchmaker.genetic_algorithm_async(
+                processed_pools[pool_idx],
+                population_size=100,
+                generations=100,
+                team_size=team_size,
+                time_budget=time_budget,
+                return_stats=True
+            )
+            return pool_idx, best_chromosome, best_fitness, stats
+
+        balanced = [None] * len(pools)
+        tasks = [balance(pool_idx) for pool_idx in range(len(pools))]
+        for finished_count, task in enumerate(asyncio.as_completed(tasks), start=1):
+            pool_idx, best_chromosome, best_fitness, stats = await task
+            balanced[pool_idx] = (processed_pools[pool_idx], best_chromosome)
+            logger.info(
+                f"Game {pool_idx + 1}: {stats['generations']} generations, "
+                f"{stats['evaluations_per_second']:.0f} evaluations/s, stopped by {stats['stopped_by']}"
+            )
+            await interaction.followup.send(
+                f"Game {pool_idx + 1} teams balanced (fitness {best_fitness:.2f}, {stats['elapsed']:.2f}s) - "
+                f"{finished_count}/{len(pools)} games ready."
+            )
+
+        return balanced
         
     class VolunteerSelectionView(discord.ui.View):
         def __init__(self, players, needed_count, timeout=300):
@@ -398,9 +436,7 @@ class MatchmakingController(commands.Cog):
                 db.cursor.execute("""
                     SELECT p.user_id, p.game_name, p.tag_id, g.tier, g.rank 
                     FROM player p
-                    JOIN game g ON p.user_id = g.user_id
-                    GROUP BY p.user_id
-                    HAVING MAX(g.game_date)
+                    JOIN player_current g ON p.user_id = g.user_id
                 """)
 
                 all_players = []
@@ -482,7 +518,8 @@ class MatchmakingController(commands.Cog):
                 # Get the next match ID for the volunteer session
                 from tournament_bot.models.dbc_model import Matches
                 matches_db = Matches(db_name=settings.DATABASE_NAME)
-                volunteer_match_num = matches_db.get_next_match_id()
+                volunteer_match_num = await matches_db.get_next_match_id_async()
+                matches_db.close_db()
                 for player in volunteers:
                     user_id = player.get('user_id')
                     if user_id:
@@ -518,6 +555,9 @@ class MatchmakingController(commands.Cog):
     ):
         if interaction.user.guild_permissions.administrator:
             await interaction.response.defer(thinking=True)
+            # GA_TIME_BUDGET only bounds team building, the Riot wait and match insights are timed separately
+            run_started = time.monotonic()
+            riot_wait = team_building = insights_time = 0.0
 
             try:
                 # Get all eligible players
@@ -525,14 +565,23 @@ class MatchmakingController(commands.Cog):
                 
                 all_players = []
 
+                try:
+                    # Bring stale ranks up to date before the pools are built, for at most RIOT_ON_DEMAND_TIMEOUT
+                    db.cursor.execute("SELECT user_id FROM player_current")
+                    refreshed = await get_refresh_scheduler().refresh_now(
+                        [row[0] for row in db.cursor.fetchall()], timeout=settings.RIOT_ON_DEMAND_TIMEOUT
+                    )
+                    logger.info(f"Refreshed ranks of {refreshed} players before matchmaking")
+                except Exception as ex:
+                    logger.error(f"Refreshing ranks before matchmaking has failed, using stored ranks: {ex}")
+                riot_wait = time.monotonic() - run_started
+
                 try:
                     # Get all players with game data
                     db.cursor.execute("""
                         SELECT p.user_id, p.game_name, p.tag_id, g.tier, g.rank, g.role, g.wins, g.losses, g.wr, g.manual_tier
                         FROM player p
-                        JOIN game g ON p.user_id = g.user_id
-                        GROUP BY p.user_id
-                        HAVING MAX(g.game_date)
+                        JOIN player_current g ON p.user_id = g.user_id
                         ORDER BY 
                             CASE 
                                 WHEN g.tier = 'challenger' THEN 1
@@ -683,38 +732,41 @@ class MatchmakingController(commands.Cog):
                     -p.get('wr', 0)
                 ))
 
-                # Create pools for skill-based games
-                pools = []
-                for i in range(game_count):
-                    start_idx = i * players_per_game
-                    end_idx = start_idx + players_per_game
-                    pool = filtered_players[start_idx:end_idx]
-                    pools.append(pool)
+                # Partitioning and balancing share one time budget, so team building takes a fixed time
+                building_started = time.monotonic()
+                deadline = building_started + settings.GA_TIME_BUDGET
 
-                # Run matchmaking for each pool
+                # Assign players to all games at once, starting from contiguous skill slices
+                matchmaker = GeneticMatchMaking(fitness_backend="numpy")
+                filtered_players = await matchmaker.calculate_performance(filtered_players)
+                pools = await partition_lobbies_async(
+                    matchmaker, filtered_players, players_per_game, time_budget=settings.GA_TIME_BUDGET / 2
+                )
+
+                # Run matchmaking for all pools at once, off the event loop
                 results = []
-                matchmaker = GeneticMatchMaking()
+                balanced_pools = await self._balance_pools(
+                    interaction, matchmaker, pools, players_per_game // 2,
+                    time_budget=max(deadline - time.monotonic(), 0.001) if settings.GA_TIME_BUDGET else 0
+                )
+                team_building = time.monotonic() - building_started
+
+                # Reserve one match ID per pool, plus one for the participation session, in a single statement
+                from tournament_bot.models.dbc_model import Matches
+                match_count = len(pools) + (1 if participation_players else 0)
+                matches_db = Matches(db_name=settings.DATABASE_NAME)
+                first_match_num = await matches_db.reserve_match_ids_async(match_count) if match_count else 0
+                matches_db.close_db()
 
                 for pool_idx, pool in enumerate(pools):
-                    # Get the next match ID
-                    from tournament_bot.models.dbc_model import Matches
-                    matches_db = Matches(db_name=settings.DATABASE_NAME)
-                    match_num = matches_db.get_next_match_id()
+                    match_num = first_match_num + pool_idx
                     match_id = f"match_{match_num}"
 
                     # Split pool into balanced teams
                     team1, team2 = [], []
 
-                    # Process players with performance metrics
-                    processed_players = await matchmaker.calculate_performance(pool)
-
-                    # Run matchmaking
-                    best_chromosome, best_fitness = matchmaker.genetic_algorithm(
-                        processed_players,
-                        population_size=100,
-                        generations=100,
-                        team_size=players_per_game // 2
-                    )
+                    # Players with performance metrics and the GA result for this pool
+                    processed_players, best_chromosome = balanced_pools[pool_idx]
 
                     if best_chromosome:
                         team1, team2 = matchmaker.decode_chromosome(
@@ -761,7 +813,9 @@ class MatchmakingController(commands.Cog):
                     
                     # Call our new service
                     from tournament_bot.bot.services.matchmaking_llm_analysis import analyze_matchup
+                    insights_started = time.monotonic()
                     llm_insights = await analyze_matchup(t1_minimal, t2_minimal, diff)
+                    insights_time += time.monotonic() - insights_started
 
                     # Log the insights to the database
                     try:
@@ -950,10 +1004,8 @@ class MatchmakingController(commands.Cog):
                 # Record participation points for excluded players
                 if participation_players:
                     participation_id = f"participation_{int(asyncio.get_event_loop().time())}"
-                    # Get the next match ID for the participation session
-                    from tournament_bot.models.dbc_model import Matches
-                    matches_db = Matches(db_name=settings.DATABASE_NAME)
-                    participation_match_num = matches_db.get_next_match_id()
+                    # The participation session uses the ID reserved after the pools
+                    participation_match_num = first_match_num + len(pools)
                     for player in participation_players:
                         user_id = player.get('user_id')
                         if user_id:
@@ -999,6 +1051,12 @@ class MatchmakingController(commands.Cog):
 
                     await interaction.followup.send(embed=participation_embed)
 
+                logger.info(
+                    f"Matchmaking finished in {time.monotonic() - run_started:.1f}s: {riot_wait:.1f}s waiting for Riot ranks, "
+                    f"{team_building:.1f}s building teams (budget {settings.GA_TIME_BUDGET:g}s), "
+                    f"{insights_time:.1f}s of match insights"
+                )
+
             except Exception as ex:
                 logger.error(f"Error running matchmaking: {ex}")
                 await interaction.followup.send(f"Error running matchmaking: {str(ex)}")
@@ -5,7 +5,8 @@ import random
 from discord import app_commands
 from discord.ext import commands
 from tournament_bot.config import settings
-from tournament_bot.models.dbc_model import Tournament_DB, Player, Game
+from tournament_bot.models.dbc_model import Tournament_DB, Player, Game, Player_current
+from tournament_bot.bot.views.player_list import PlayerListView
 from tournament_bot.bot.services.api import Api_Collection
 
 logger = settings.logging.getLogger("discord")
@@ -45,222 +46,21 @@ class PlayerManagement(commands.Cog):
     @app_commands.command(name="list_players", description="List all registered players")
     async def list_players(self, interaction: discord.Interaction):
         if interaction.user.guild_permissions.administrator:
-            db = Tournament_DB()
+            db = Player_current()
             try:
-                # Get all players from database
-                all_players = Player.get_all_player(db)
+                # Players and their newest game row in one query, off the event loop
+                all_players = await db.fetch_current_players_async(include_without_game=True, flag_game_rows=True)
 
                 if not all_players or len(all_players) == 0:
                     await interaction.response.send_message("No players registered yet.")
                     return
 
-                # Create an embed to display players
-                embed = discord.Embed(
-                    title="League of Legends Players",
-                    color=discord.Color.blue(),
-                    description=f"Total Players: {len(all_players)}"
-                )
-
-                for i, player in enumerate(all_players):
-                    user_id, game_name, tag_id = player
-
-                    # Try to get player stats from game table
-                    try:
-                        db.cursor.execute(
-                            "SELECT role, tier, rank, wins, losses, wr, manual_tier FROM game WHERE user_id = ? ORDER BY game_date DESC LIMIT 1",
-                            (user_id,)
-                        )
-                        game_data = db.cursor.fetchone()
-
-                        if game_data:
-                            role_data, tier, rank, wins, losses, win_rate, manual_tier = game_data
-
-                            # Role color mapping (using League of Legends colors)
-                            role_colors = {
-                                "top": "🟥",      # Red
-                                "jungle": "🟩",   # Green
-                                "mid": "🟨",      # Yellow
-                                "bottom": "🟦",   # Blue
-                                "support": "🟪",  # Purple
-                                "tbd": "⬜",      # White/empty
-                                "forced": "⬛"     # Black/forced
-                            }
-                            
-                            # Parse role preferences
-                            role_str = "None"
-                            if role_data:
-                                try:
-                                    roles = json.loads(role_data)
-                                    if isinstance(roles, list):
-                                        colored_roles = []
-                                        for role in roles:
-                                            role_lower = role.lower()
-                                            role_emoji = role_colors.get(role_lower, "⬜")
-                                            colored_roles.append(f"{role_emoji} {role.capitalize()}")
-                                        role_str = "  ".join(colored_roles)
-                                    else:
-                                        role_str = str(roles)
-                                except:
-                                    role_str = str(role_data)
-
-                            # Format tier and rank
-                            tier_str = tier.capitalize() if tier else "Unranked"
-                            rank_str = rank if rank else ""
-
-                            # Calculate win rate if not provided
-                            if win_rate is None and wins is not None and losses is not None:
-                                total_games = wins + losses
-                                if total_games > 0:
-                                    win_rate = (wins / total_games) * 100
-                                else:
-                                    win_rate = 0
-
-                            # Format stats string
-                            stats = f"**Rank:** {tier_str} {rank_str}\n"
-                            
-                            # Add manual tier if available
-                            if manual_tier is not None:
-                                stats += f"**Manual Tier:** {manual_tier:.1f}/10\n"
-                            
-                            if wins is not None and losses is not None:
-                                total_games = wins + losses
-                                # Calculate win rate if not already provided
-                                if win_rate is None and total_games > 0:
-                                    win_rate = (wins / total_games) * 100
-                                
-                                win_rate_str = f" ({win_rate:.1f}%)" if win_rate is not None else ""
-                                stats += f"**Record:** {wins}W {losses}L{win_rate_str}"
-
-                            # Add player to embed (up to 15 players per embed)
-                            if i < 15:
-                                embed.add_field(
-                                    name=f"{game_name}",
-                                    value=f"**ID:** {tag_id}\n{stats}\n**Roles:** {role_str}",
-                                    inline=True
-                                )
-                        else:
-                            # Fallback if no game data exists
-                            if i < 15:
-                                embed.add_field(
-                                    name=f"{game_name}",
-                                    value=f"**ID:** {tag_id}\nNo game data available",
-                                    inline=True
-                                )
-                    except Exception as ex:
-                        logger.error(f"Error retrieving data for player {user_id}: {ex}")
-                        if i < 15:
-                            embed.add_field(
-                                name=f"{game_name}",
-                                value=f"**ID:** {tag_id}\nError retrieving player data",
-                                inline=True
-                            )
-
-                await interaction.response.send_message(embed=embed)
-
-                # If there are more than 15 players, send additional messages
-                if len(all_players) > 15:
-                    remaining_embeds = []
-                    current_embed = None
-
-                    for i in range(15, len(all_players)):
-                        # Create a new embed every 15 players
-                        if i % 15 == 0:
-                            current_embed = discord.Embed(
-                                title=f"League of Legends Players (Continued {i // 15 + 1})",
-                                color=discord.Color.blue()
-                            )
-                            remaining_embeds.append(current_embed)
-
-                        user_id, game_name, tag_id = all_players[i]
-
-                        # Get player stats
-                        try:
-                            db.cursor.execute(
-                                "SELECT role, tier, rank, wins, losses, wr, manual_tier FROM game WHERE user_id = ? ORDER BY game_date DESC LIMIT 1",
-                                (user_id,)
-                            )
-                            game_data = db.cursor.fetchone()
-
-                            if game_data:
-                                role_data, tier, rank, wins, losses, win_rate, manual_tier = game_data
-
-                                # Role color mapping (using League of Legends colors)
-                                role_colors = {
-                                    "top": "🟥",      # Red
-                                    "jungle": "🟩",   # Green
-                                    "mid": "🟨",      # Yellow
-                                    "bottom": "🟦",   # Blue
-                                    "support": "🟪",  # Purple
-                                    "tbd": "⬜",      # White/empty
-                                    "forced": "⬛"     # Black/forced
-                                }
-                                
-                                # Parse role preferences
-                                role_str = "None"
-                                if role_data:
-                                    try:
-                                        roles = json.loads(role_data)
-                                        if isinstance(roles, list):
-                                            colored_roles = []
-                                            for role in roles:
-                                                role_lower = role.lower()
-                                                role_emoji = role_colors.get(role_lower, "⬜")
-                                                colored_roles.append(f"{role_emoji} {role.capitalize()}")
-                                            role_str = "  ".join(colored_roles)
-                                        else:
-                                            role_str = str(roles)
-                                    except:
-                                        role_str = str(role_data)
-
-                                # Format tier and rank
-                                tier_str = tier.capitalize() if tier else "Unranked"
-                                rank_str = rank if rank else ""
-
-                                # Calculate win rate if not provided
-                                if win_rate is None and wins is not None and losses is not None:
-                                    total_games = wins + losses
-                                    if total_games > 0:
-                                        win_rate = (wins / total_games) * 100
-                                    else:
-                                        win_rate = 0
-
-                                # Format stats string
-                                stats = f"**Rank:** {tier_str} {rank_str}\n"
-                                
-                                # Add manual tier if available
-                                if manual_tier is not None:
-                                    stats += f"**Manual Tier:** {manual_tier:.1f}/10\n"
-                                    
-                                if wins is not None and losses is not None:
-                                    total_games = wins + losses
-                                    # Calculate win rate if not already provided
-                                    if win_rate is None and total_games > 0:
-                                        win_rate = (wins / total_games) * 100
-                                    
-                                    win_rate_str = f" ({win_rate:.1f}%)" if win_rate is not None else ""
-                                    stats += f"**Record:** {wins}W {losses}L{win_rate_str}"
-
-                                current_embed.add_field(
-                                    name=f"{game_name}",
-                                    value=f"**ID:** {tag_id}\n{stats}\n**Roles:** {role_str}",
-                                    inline=True
-                                )
-                            else:
-                                current_embed.add_field(
-                                    name=f"{game_name}",
-                                    value=f"**ID:** {tag_id}\nNo game data available",
-                                    inline=True
-                                )
-                        except Exception as ex:
-                            logger.error(f"Error retrieving data for player {user_id}: {ex}")
-                            current_embed.add_field(
-                                name=f"{game_name}",
-                                value=f"**ID:** {tag_id}\nError retrieving player data",
-                                inline=True
-                            )
-
-                    for embed in remaining_embeds:
-                        await interaction.followup.send(embed=embed)
+                # Only the first page is built now, the buttons render the others on demand
+                view = PlayerListView(all_players)
+                if view.page_count > 1:
+                    await interaction.response.send_message(embed=view.render_page(), view=view)
+                else:
+                    await interaction.response.send_message(embed=view.render_page())
 
             except Exception as ex:
                 logger.error(f"Error listing players: {ex}")
@@ -3,8 +3,9 @@ import asyncio
 from discord import app_commands
 from discord.ext import commands
 from tournament_bot.config import settings
-from tournament_bot.models.dbc_model import Tournament_DB, Player, Game
+from tournament_bot.models.dbc_model import AsyncDAO, Matches
 from tournament_bot.bot.views.match_results import (
+    MAX_MATCHES,
     MatchResultView,
     create_mvp_voting_button,
     create_multiple_mvp_voting_buttons,
@@ -17,6 +18,7 @@ class MatchResultsController(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
+        self.dao = AsyncDAO()
     
     @app_commands.command(name="record_match_results", description="Record the outcomes of multiple matches")
     async def record_match_results(self, interaction: discord.Interaction):
@@ -28,24 +30,19 @@ class MatchResultsController(commands.Cog):
             )
             return
             
-        # Get recent matches that don't have results yet
-        db = Tournament_DB()
         try:
             # Look for matches without win/loss recorded
-            db.cursor.execute("""
+            recent_matches = await self.dao.fetch_all("""
                 SELECT DISTINCT teamId, MAX(date_played) 
                 FROM Matches 
                 WHERE win IS NULL AND loss IS NULL
                 GROUP BY teamId
                 ORDER BY teamId ASC
-                LIMIT 10
-            """)
-
-            recent_matches = db.cursor.fetchall()
+                LIMIT ?
+            """, (MAX_MATCHES,))
 
             if not recent_matches:
                 await interaction.response.send_message("No pending matches found to record results for.")
-                db.close_db()
                 return
 
             # Prepare match data for the view
@@ -74,7 +71,7 @@ class MatchResultsController(commands.Cog):
             await view.wait()
 
             # Process the results
-            results_processed = self._process_match_results(db, view.processed_results)
+            results_processed = await self.dao.transaction(self._process_match_results, view.processed_results)
 
             # Send final confirmation
             if results_processed > 0:
@@ -97,8 +94,6 @@ class MatchResultsController(commands.Cog):
         except Exception as ex:
             logger.error(f"Error recording match results: {ex}")
             await interaction.followup.send(f"Error recording match results: {str(ex)}")
-        finally:
-            db.close_db()
 
     @app_commands.command(name="record_match_result", description="Record the outcome of a single match")
     @app_commands.describe(
@@ -118,11 +113,9 @@ class MatchResultsController(commands.Cog):
             await interaction.response.send_message("Winning team must be either 1 or 2", ephemeral=True)
             return
 
-        db = Tournament_DB()
         try:
             # Verify the match exists
-            db.cursor.execute("SELECT COUNT(*) FROM Matches WHERE teamId = ?", (match_id,))
-            count = db.cursor.fetchone()[0]
+            count = (await self.dao.fetch_one("SELECT COUNT(*) FROM Matches WHERE teamId = ?", (match_id,)))[0]
 
             if count == 0:
                 await interaction.response.send_message(f"Match ID {match_id} not found", ephemeral=True)
@@ -130,7 +123,7 @@ class MatchResultsController(commands.Cog):
 
             # Process the match result
             results = {match_id: winning_team}
-            players_updated = self._process_match_results(db, results)
+            players_updated = await self.dao.transaction(self._process_match_results, results)
 
             # Create callback for MVP voting button
             async def mvp_callback(inter):
@@ -149,107 +142,21 @@ class MatchResultsController(commands.Cog):
         except Exception as ex:
             logger.error(f"Error recording match result: {ex}")
             await interaction.response.send_message(f"Error recording match result: {str(ex)}")
-        finally:
-            db.close_db()
 
-    def _process_match_results(self, db, match_results):
+    def _process_match_results(self, connection, match_results):
         """Process match results and update database
+
+        Runs on a DB thread through AsyncDAO.transaction, so all matches are
+        recorded in one transaction.
         
         Args:
-            db: Database connection
+            connection: sqlite3 connection borrowed from the pool
             match_results: Dictionary mapping match_id to winning_team
             
         Returns:
-            Number of results processed
+            Number of player stats updated
         """
-        results_processed = 0
-        players_updated = 0
-        
-        for match_id, winning_team in match_results.items():
-            # Update winners
-            winning_team_name = f"team{winning_team}"
-            losing_team_name = f"team{3 - winning_team}"  # If winning_team is 1, losing is 2 and vice versa
-
-            # Update winners
-            db.cursor.execute(
-                "UPDATE Matches SET win = 'yes', loss = 'no' WHERE teamId = ? AND teamUp = ?",
-                (match_id, winning_team_name)
-            )
-            winners_updated = db.cursor.rowcount
-            logger.info(f"Updated {winners_updated} winners for match {match_id}, team {winning_team_name}")
-
-            # Update losers
-            db.cursor.execute(
-                "UPDATE Matches SET win = 'no', loss = 'yes' WHERE teamId = ? AND teamUp = ?",
-                (match_id, losing_team_name)
-            )
-            losers_updated = db.cursor.rowcount
-            logger.info(f"Updated {losers_updated} losers for match {match_id}, team {losing_team_name}")
-            
-            # Update all other players in this match (e.g., volunteers or participation) to mark match as completed
-            db.cursor.execute(
-                "UPDATE Matches SET win = 'n/a', loss = 'n/a' WHERE teamId = ? AND win IS NULL AND loss IS NULL",
-                (match_id,)
-            )
-            others_updated = db.cursor.rowcount
-            logger.info(f"Updated {others_updated} other players for match {match_id} to mark as completed")
-
-            # Get player stats to update
-            db.cursor.execute(
-                "SELECT user_id, teamUp FROM Matches WHERE teamId = ?",
-                (match_id,)
-            )
-            players = db.cursor.fetchall()
-
-            # Update player stats in the Game table
-            for player_id, team in players:
-                # Get current player stats
-                db.cursor.execute(
-                    "SELECT wins, losses FROM game WHERE user_id = ? ORDER BY game_date DESC LIMIT 1",
-                    (player_id,)
-                )
-                result = db.cursor.fetchone()
-
-                if result:
-                    current_wins, current_losses = result
-
-                    # Set default values if None
-                    current_wins = current_wins if current_wins is not None else 0
-                    current_losses = current_losses if current_losses is not None else 0
-
-                    # Update based on match result
-                    if team == winning_team_name:
-                        new_wins = current_wins + 1
-                        update_query = """
-                            UPDATE game SET wins = ?
-                            WHERE user_id = ? AND game_date = (
-                                SELECT MAX(game_date) FROM game WHERE user_id = ?
-                            )
-                        """
-                        db.cursor.execute(update_query, (new_wins, player_id, player_id))
-                    elif team == losing_team_name:  # Exclude participation players
-                        new_losses = current_losses + 1
-                        update_query = """
-                            UPDATE game SET losses = ?
-                            WHERE user_id = ? AND game_date = (
-                                SELECT MAX(game_date) FROM game WHERE user_id = ?
-                            )
-                        """
-                        db.cursor.execute(update_query, (new_losses, player_id, player_id))
-                    
-                    players_updated += 1
-
-            # Make sure to commit changes after each match is processed
-            db.connection.commit()
-            logger.info(f"Committed changes for match {match_id}")
-
-            results_processed += 1
-
-        # Final commit for any remaining changes
-        db.connection.commit()
-        logger.info(f"Final commit complete, processed {results_processed} matches")
-        
-        return players_updated
+        return Matches.apply_match_results(connection, match_results)
 
     async def _start_mvp_voting(self, interaction, match_id):
         """Start MVP voting for a match
@@ -3,6 +3,9 @@ import random
 import json
 import sys
 import os
+import timeit
+
+from tournament_bot.bot.services.role_assignment import STANDARD_ROLES, assign_optimal_team_roles
 
 # Add function to assign roles to teams
 def assign_team_roles(team):
@@ -217,8 +220,53 @@ def test_role_assignment():
     else:
         print("\nFAILURE: Roles are not assigned correctly!")
 
+def _random_team(rng, size=5):
+    """Build a team with random role preferences and performance data"""
+    team = []
+    for i in range(size):
+        skill_factor = rng.uniform(1.0, 1.45)
+        roles = rng.sample(STANDARD_ROLES, rng.randint(1, 5))
+        performance = {role: skill_factor * 0.75 + (1 - (idx * 5) / 100) * 0.25 for idx, role in enumerate(roles)}
+        if len(roles) < 5:
+            performance['forced'] = skill_factor * 0.75
+        team.append({'user_id': f'player{i + 1}', 'game_name': f'Player{i + 1}', 'role': roles,
+                     'roleBasedPerformance': performance})
+    return team
+
+
+def _assigned_performance(team):
+    """Total performance of the assigned roles (unlisted roles count as -100)"""
+    return sum(player['roleBasedPerformance'].get(player['assigned_role'], -100.0)
+               for player in team if player['assigned_role'] != 'forced')
+
+
+def benchmark_role_assignment(team_count=500, repeat=5, seed=42):
+    """
+    Micro-benchmark the greedy assign_team_roles against the optimal assignment
+
+    Prints the per-call cost of both versions on the same seeded teams and how
+    often the optimal assignment beats the greedy one.
+    """
+    rng = random.Random(seed)
+    teams = [_random_team(rng) for _ in range(team_count)]
+
+    greedy_time = min(timeit.repeat(lambda: [assign_team_roles(team) for team in teams], number=1, repeat=repeat))
+    optimal_time = min(timeit.repeat(lambda: [assign_optimal_team_roles(team) for team in teams], number=1, repeat=repeat))
+
+    improved = 0
+    for team in teams:
+        if _assigned_performance(assign_optimal_team_roles(team)) > _assigned_performance(assign_team_roles(team)) + 1e-9:
+            improved += 1
+
+    print("=== Role Assignment Micro-benchmark ===")
+    print(f"Greedy:  {greedy_time / team_count * 1e6:.1f} us per call")
+    print(f"Optimal: {optimal_time / team_count * 1e6:.1f} us per call")
+    print(f"Optimal assignment scored higher on {improved}/{team_count} teams")
+
+
 if __name__ == "__main__":
     test_role_assignment()
+    benchmark_role_assignment()
     
 # Add discord.py extension setup function
 async def setup(bot):
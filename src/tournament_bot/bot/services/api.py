@@ -2,8 +2,7 @@ import asyncio
 import discord
 from discord.ext import commands, tasks
 from tournament_bot.config import settings
-from tournament_bot.models.dbc_model import Tournament_DB, Player, Game
-import requests
+from tournament_bot.bot.services.riot_refresh import get_refresh_pipeline, get_refresh_scheduler
 from colorama import Fore, Style, init
 
 # Initialize colorama
@@ -20,34 +19,23 @@ logger = settings.logging.getLogger("discord")
 class Api_Collection(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Riot ID cache and scheduler on top of the bot's shared Riot client
+        self.refresh_pipeline = get_refresh_pipeline()
+        self.refresh_scheduler = get_refresh_scheduler()
         self.fetch_all_players_details.start()
 
-    def cog_unload(self):
+    async def cog_unload(self):
+        # The Riot client belongs to the bot and is closed on shutdown
         self.fetch_all_players_details.cancel()
 
-    @tasks.loop(seconds=600)
+    @tasks.loop(seconds=settings.RIOT_REFRESH_TICK_SECONDS)
     async def fetch_all_players_details(self):
-        db = Tournament_DB()
-        #we pass here the game a hard coded
-        all_players = Player.get_all_player(db)
-        if all_players is not None:
-            for player in all_players:
-                logger.info(f"start to fetch a player discord is: {Fore.CYAN}{player[0]}{Style.RESET_ALL} details from riot api")
-                player_info = await self.get_player_details(player[1], player[2])
-
-                if player_info and player_info[0]['rank']:
-                    # player_rank = player_info.get('rank', 'unranked')
-                    player_tier = player_info[0]['tier']
-                    player_rank = player_info[0]['rank']
-                    player_wins = player_info[0]['wins']
-                    player_losses = player_info[0]['losses']
-                    
-                    # Create a Game instance to ensure the method is called properly
-                    game_db = Game(db_name=settings.DATABASE_NAME)
-                    game_db.connection = db.connection
-                    game_db.cursor = db.cursor
-                    game_db.update_player_API_info(player[0], player_tier, player_rank, player_wins, player_losses)
-            db.close_db()
+        """Refresh the stale players that fit in this tick, checked-in players first"""
+        try:
+            await self.refresh_scheduler.run_tick()
+        except Exception as ex:
+            logger.error(f"Riot refresh tick has failed with error {ex}")
+
     @fetch_all_players_details.before_loop
     async def before_fetch_all_players_details(self):
         await self.bot.wait_until_ready()
@@ -55,40 +43,22 @@ class Api_Collection(commands.Cog):
 
 
     async def get_player_details(interaction: discord.Interaction, game_name, tag_id):
-        # headers = {
-        #     'Authorization': f'Bearer {settings.API_KEY}',
-        #     'Content-Type': 'application/json'
-        #     }
-        headers = {'X-Riot-Token': settings.API_KEY}
-
-        url = f'https://americas.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_id}?api_key={settings.API_KEY}'
-        url_puuid = f"https://na1.api.riotgames.com/lol/summoner/v4/summoners/by-puuid"
-        url_summonId = f"https://na1.api.riotgames.com/lol/league/v4/entries/by-summoner"
-        try: 
-            # response = requests.get(url, headers=headers)
-            response = requests.get(url=url, headers=headers)
-
-            if response.status_code == 200:
-                account_info = response.json()
-                puuid = account_info['puuid']
-
-                if puuid is not None:
-                    response = requests.get(f"{url_puuid}/{puuid}?api_key={settings.API_KEY}", headers=headers)
-                    if response.status_code==200:
-                        result_format = response.json()
-                        summoner_id = result_format['id']
-
-                        if summoner_id is not None:
-                            response = requests.get(f"{url_summonId}/{summoner_id}?api_key={settings.API_KEY}", headers=headers)
-                            return response.json()
-                    else:
-                        logger.info(f"not result for user puuid {Fore.RED}{puuid}{Style.RESET_ALL} and url: {url_puuid}")
-                        return
-            else:
-                print(f"not result for user tag_id: {Fore.RED}{tag_id}{Style.RESET_ALL} and url: {url}")
-                return
+        """
+        League entries of a Riot ID
+
+        The puuid and summoner ID are resolved once and cached in riot_identity,
+        so a known player costs a single league request.
+
+        Returns:
+            list: League entries, or None when the player is not found
+        """
+        try:
+            entries = await get_refresh_pipeline().fetch_league_entries(game_name, tag_id)
+            if entries is None:
+                logger.info(f"not result for user {Fore.RED}{game_name}#{tag_id}{Style.RESET_ALL}")
+            return entries
         except Exception as ex:
-            logger.info(f"the request to get user puuid is failed")
+            logger.info(f"the request to get player details is failed: {ex}")
 
     
     @commands.Cog.listener()
@@ -0,0 +1,171 @@
+from tournament_bot.bot.services.role_assignment import (
+    STANDARD_ROLES,
+    UNLISTED_ROLE_PERFORMANCE,
+    assignment_transitions,
+)
+from tournament_bot.config import settings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = settings.logging.getLogger("discord")
+
+NUMPY_AVAILABLE = np is not None
+
+FORCED = len(STANDARD_ROLES)
+
+
+class VectorizedFitnessEngine:
+    """
+    Batch fitness evaluator for GeneticMatchMaking.
+
+    Everything the fitness function needs from the player dicts is extracted
+    once per pool: a players x roles performance matrix, the total performance
+    of every player and a combined tier/rank value. A whole population is then
+    scored with array operations instead of decoding each chromosome into
+    copied player dicts.
+
+    Scores are identical to GeneticMatchMaking.calculate_fitness: the role
+    assignment search walks the same transitions as optimal_role_assignment
+    across the population, and all sums are accumulated in the same order as
+    the Python implementation.
+    """
+
+    def __init__(self, players, tier_values, rank_values, team_size=5):
+        if np is None:
+            raise RuntimeError("numpy is required for the vectorized fitness engine")
+
+        self.team_size = team_size
+        self.player_count = len(players)
+
+        self.role_matrix = np.array([
+            [player.get("roleBasedPerformance", {}).get(role, UNLISTED_ROLE_PERFORMANCE) for role in STANDARD_ROLES]
+            for player in players
+        ], dtype=np.float64).reshape(len(players), len(STANDARD_ROLES))
+
+        # team_performance sums every roleBasedPerformance value, including "forced"
+        self.performance_totals = np.array([
+            sum(player["roleBasedPerformance"].values()) if "roleBasedPerformance" in player else 0
+            for player in players
+        ], dtype=np.float64)
+
+        self.rank_values = np.array([
+            tier_values.get(player.get("tier", "default").lower(), 0) * 5 + rank_values.get(player.get("rank", "V"), 0)
+            for player in players
+        ], dtype=np.int64)
+
+        self.max_rank_diff = (tier_values["challenger"] * 5 + rank_values["I"]) - (tier_values["iron"] * 5 + rank_values["V"])
+
+    def evaluate(self, population):
+        """
+        Score every chromosome in the population
+
+        Args:
+            population: List of chromosomes (permutations of player indices)
+
+        Returns:
+            List of fitness scores in population order
+        """
+        if len(population) == 0:
+            return []
+
+        chromosomes = np.asarray(population, dtype=np.int64)
+        team1 = chromosomes[:, :self.team_size]
+        team2 = chromosomes[:, self.team_size:]
+
+        performance1 = self.team_performance(team1)
+        performance2 = self.team_performance(team2)
+        team_diff = np.abs(performance1 - performance2)
+        max_team_diff = np.maximum(performance1, performance2) * 2
+        max_team_diff = np.where(max_team_diff == 0, 1, max_team_diff)
+        team_balance_score = 1 - (team_diff / max_team_diff)
+
+        role_matchup_score = self.role_matchup_score(
+            team1, self.assign_roles(team1),
+            team2, self.assign_roles(team2)
+        )
+
+        total_fitness = (0.7 * team_balance_score) + (0.3 * role_matchup_score)
+        return (total_fitness * 100).tolist()
+
+    def team_performance(self, team):
+        """Sum player performance per team, adding players in chromosome order"""
+        total = np.zeros(team.shape[0], dtype=np.float64)
+        for slot in range(team.shape[1]):
+            total = total + self.performance_totals[team[:, slot]]
+        return total
+
+    def assign_roles(self, team):
+        """
+        Vectorized replay of optimal_role_assignment
+
+        Args:
+            team: (population, team width) array of player indices
+
+        Returns:
+            (population, team width) array of role indices, FORCED for players
+            left without a role
+        """
+        population_size, width = team.shape
+        rows = np.arange(population_size)
+        performance = self.role_matrix[team]
+        steps, final_masks = assignment_transitions(width)
+        mask_count = 1 << len(STANDARD_ROLES)
+
+        best = {0: np.zeros(population_size, dtype=np.float64)}
+        choices = []
+        for slot, transitions in enumerate(steps):
+            step_best = {}
+            # Encodes the previous mask and the chosen role of every new state
+            step_choice = np.zeros((population_size, mask_count), dtype=np.int64)
+            for mask, role, new_mask in transitions:
+                if role is None:
+                    candidate = best[mask]
+                    encoded = mask * (FORCED + 1) + FORCED
+                else:
+                    candidate = best[mask] + performance[:, slot, role]
+                    encoded = mask * (FORCED + 1) + role
+                if new_mask not in step_best:
+                    step_best[new_mask] = candidate
+                    step_choice[:, new_mask] = encoded
+                else:
+                    better = candidate > step_best[new_mask]
+                    step_best[new_mask] = np.where(better, candidate, step_best[new_mask])
+                    step_choice[better, new_mask] = encoded
+            best = step_best
+            choices.append(step_choice)
+
+        mask = np.full(population_size, final_masks[0], dtype=np.int64)
+        best_total = best[final_masks[0]]
+        for final_mask in final_masks[1:]:
+            better = best[final_mask] > best_total
+            mask = np.where(better, final_mask, mask)
+            best_total = np.where(better, best[final_mask], best_total)
+
+        assigned = np.full((population_size, width), FORCED, dtype=np.int64)
+        for slot in range(width - 1, -1, -1):
+            encoded = choices[slot][rows, mask]
+            assigned[:, slot] = encoded % (FORCED + 1)
+            mask = encoded // (FORCED + 1)
+        return assigned
+
+    def role_matchup_score(self, team1, roles1, team2, roles2):
+        """Vectorized GeneticMatchMaking.calculate_role_matchup_score"""
+        rank1 = self.rank_values[team1]
+        rank2 = self.rank_values[team2]
+
+        total_diff = np.zeros(team1.shape[0], dtype=np.int64)
+        matchups = np.zeros(team1.shape[0], dtype=np.int64)
+        for role in range(len(STANDARD_ROLES)):
+            holder1 = roles1 == role
+            holder2 = roles2 == role
+            both = holder1.any(axis=1) & holder2.any(axis=1)
+            diff = np.abs((rank1 * holder1).sum(axis=1) - (rank2 * holder2).sum(axis=1))
+            total_diff += np.where(both, diff, 0)
+            matchups += both
+
+        safe_matchups = np.where(matchups == 0, 1, matchups)
+        avg_diff = total_diff / safe_matchups
+        return np.where(matchups == 0, 0.0, 1 - (avg_diff / self.max_rank_diff))
@@ -1,69 +1,186 @@
 import asyncio
+import itertools
+import math
+import multiprocessing
+import os
 import random
 import json
-from tournament_bot.models.dbc_model import Tournament_DB, Game, Player
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from tournament_bot.models.dbc_model import Tournament_DB, Game, Player, Player_current
+from tournament_bot.bot.services.fitness_engine import NUMPY_AVAILABLE, VectorizedFitnessEngine
+from tournament_bot.bot.services.role_assignment import assign_optimal_team_roles
 from tournament_bot.config import settings
 import logging
 
 logger = settings.logging.getLogger("discord")
 
+# Largest number of team splits exact_team_split enumerates (126 for 5v5, 92378 for 10v10)
+EXACT_SPLIT_LIMIT = 10000
+
+# Shared worker processes for running the genetic algorithm off the event loop
+_process_pool = None
+
+
+def get_process_pool():
+    """Return the shared matchmaking process pool, creating it on first use"""
+    global _process_pool
+    if _process_pool is None:
+        # spawn avoids forking the bot process while discord/aiohttp threads are running
+        _process_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+def shutdown_process_pool():
+    """Stop the shared matchmaking process pool"""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def run_genetic_algorithm_worker(players, population_size, generations, team_size, fitness_backend, fitness_cache_size,
+                                 time_budget=None, return_stats=False):
+    """Process pool entry point: runs the GA on plain player data without opening the database"""
+    matchmaker = GeneticMatchMaking(
+        fitness_backend=fitness_backend,
+        fitness_cache_size=fitness_cache_size,
+        connect_db=False
+    )
+    return matchmaker.genetic_algorithm(
+        players,
+        population_size=population_size,
+        generations=generations,
+        team_size=team_size,
+        time_budget=time_budget,
+        return_stats=return_stats
+    )
+
+
+def run_island_worker(players, population, generations, team_size, fitness_backend, fitness_cache_size, deadline):
+    """Process pool entry point: evolves one island for a migration interval"""
+    matchmaker = GeneticMatchMaking(
+        fitness_backend=fitness_backend,
+        fitness_cache_size=fitness_cache_size,
+        connect_db=False
+    )
+    return matchmaker.evolve_island(players, population, generations, team_size, deadline)
+
+
+class FitnessCache:
+    """
+    Bounded LRU cache of fitness scores keyed by team split
+
+    Chromosomes that only reorder players inside a team share one entry, keyed
+    by the pair of frozensets for team 1 and team 2.
+    """
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(chromosome, team_size=5):
+        return frozenset(chromosome[:team_size]), frozenset(chromosome[team_size:])
+
+    def get(self, key):
+        """Return the cached fitness and count a hit, or None and count a miss"""
+        fitness = self.entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return fitness
+
+    def put(self, key, fitness):
+        self.entries[key] = fitness
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def reset(self):
+        """Drop all entries and counters, called once per player pool"""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
 class GeneticMatchMaking:
-    def __init__(self):
-        self.db = Tournament_DB()
-        self.game_db = Game(db_name=settings.DATABASE_NAME)
-        self.player_db = Player(db_name=settings.DATABASE_NAME)
+    FITNESS_BACKENDS = ("python", "numpy")
+
+    def __init__(self, fitness_backend="python", fitness_cache_size=4096, connect_db=True):
+        """
+        Args:
+            fitness_backend: "python" scores chromosomes one at a time with calculate_fitness,
+                "numpy" scores whole populations with VectorizedFitnessEngine
+            fitness_cache_size: Maximum number of team splits kept in the fitness cache, 0 disables it
+            connect_db: Open database connections, disabled for process pool workers
+        """
+        if fitness_backend not in self.FITNESS_BACKENDS:
+            raise ValueError(f"Unknown fitness backend: {fitness_backend}")
+        if fitness_backend == "numpy" and not NUMPY_AVAILABLE:
+            logger.warning("numpy is not installed, falling back to the python fitness backend")
+            fitness_backend = "python"
+        self.fitness_backend = fitness_backend
+        self.fitness_cache_size = fitness_cache_size
+        self.fitness_cache = FitnessCache(fitness_cache_size) if fitness_cache_size > 0 else None
+
+        if connect_db:
+            self.db = Tournament_DB()
+            self.game_db = Game(db_name=settings.DATABASE_NAME)
+            self.player_db = Player(db_name=settings.DATABASE_NAME)
+        else:
+            self.db = self.game_db = self.player_db = None
         self.tier_order = {"challenger": 1, "grandmaster": 2, "master": 3, "diamond": 4, "emerald": 5, "platinum": 6, 
                           "gold": 7, "silver": 8, "bronze": 9, "iron": 10, "default": 11}
         self.rank_order = {"I": 1, "II": 2, "III": 3, "IV": 4, "V": 5}
         self.skill_factor_set = {"default": 0.0, "iron": 1.0, "bronze": 1.05, "silver": 1.10, "gold": 1.15, 
                                 "platinum": 1.20, "emerald": 1.25, "diamond": 1.30, "master": 1.35, 
                                 "grandmaster": 1.40, "challenger": 1.45}
+        # Map ranks to numeric values for role matchup comparison
+        self.tier_values = {"challenger": 9, "grandmaster": 8, "master": 7, "diamond": 6, "emerald": 5,
+                            "platinum": 4, "gold": 3, "silver": 2, "bronze": 1, "iron": 0, "default": 0}
+        self.rank_values = {"I": 4, "II": 3, "III": 2, "IV": 1, "V": 0}
 
     async def fetch_player_data(self):
         """Fetch player data from database or combined_player_data.json"""
         try:
             # First, try to get data from database
             players = []
-            player_records = self.player_db.get_all_player()
-            
-            if player_records:
-                for player_record in player_records:
-                    user_id, game_name, tag_id = player_record
-                    
-                    # Query the Game table to get game-specific data
-                    query = """
-                        SELECT tier, rank, role, wins, losses, wr 
-                        FROM game 
-                        WHERE user_id = ? 
-                        ORDER BY game_date DESC 
-                        LIMIT 1
-                    """
-                    try:
-                        self.game_db.cursor.execute(query, (user_id,))
-                        game_data = self.game_db.cursor.fetchone()
-                        
-                        if game_data:
-                            tier, rank, role_json, wins, losses, wr = game_data
-                            
-                            # Parse the role JSON string
-                            try:
-                                role = json.loads(role_json) if role_json else []
-                            except json.JSONDecodeError:
-                                logger.error(f"Invalid JSON for role: {role_json}")
-                                role = []
-                                
-                            player = {
-                                'user_id': user_id,
-                                'game_name': game_name,
-                                'tier': tier.lower() if tier else 'default',
-                                'rank': rank if rank else 'V',
-                                'role': role,
-                                'wr': float(wr) * 100 if wr is not None else 50.0  # Convert to percentage
-                            }
-                            players.append(player)
-                    except Exception as ex:
-                        logger.error(f"Error fetching game data for user {user_id}: {ex}")
-            
+            # One scan of the newest game row per player
+            player_records = Player_current.fetch_current_players(self.game_db)
+
+            for player_record in player_records:
+                user_id, game_name, tag_id, tier, rank, role_json, wins, losses, wr, manual_tier = player_record
+
+                # Parse the role JSON string
+                try:
+                    role = json.loads(role_json) if role_json else []
+                except json.JSONDecodeError:
+                    logger.error(f"Invalid JSON for role: {role_json}")
+                    role = []
+
+                player = {
+                    'user_id': user_id,
+                    'game_name': game_name,
+                    'tier': tier.lower() if tier else 'default',
+                    'rank': rank if rank else 'V',
+                    'role': role,
+                    'wr': float(wr) * 100 if wr is not None else 50.0  # Convert to percentage
+                }
+                players.append(player)
+
             # If database is empty or had errors, use the JSON file
             if not players:
                 logger.info("No players found in database, using combined_player_data.json")
@@ -184,6 +301,9 @@ class GeneticMatchMaking:
     def assign_team_roles(self, team):
         """
         Assign optimal roles to team members ensuring each role is assigned exactly once
+
+        Solves the player x role assignment exactly (see optimal_role_assignment),
+        so the total role performance of the team is maximized.
         
         Args:
             team: List of player dictionaries with roleBasedPerformance data
@@ -191,103 +311,7 @@ class GeneticMatchMaking:
         Returns:
             Team with assigned_role added to each player
         """
-        # Standard roles in League of Legends
-        standard_roles = ["top", "jungle", "mid", "bottom", "support"]
-        
-        # Create a performance matrix for all player-role combinations
-        performance_matrix = {}
-        for player_idx, player in enumerate(team):
-            performance_matrix[player_idx] = {}
-            for role in standard_roles:
-                # Get player's performance for this role, or a very low value if not in preferences
-                performance = player.get("roleBasedPerformance", {}).get(role, -100.0)
-                performance_matrix[player_idx][role] = performance
-        
-        # Find optimal role assignment using a greedy algorithm
-        assigned_roles = {}
-        assigned_players = set()
-        available_roles = set(standard_roles)
-        
-        # Make a copy of the team to avoid modifying the input parameter
-        updated_team = []
-        for player in team:
-            updated_team.append(player.copy())
-        
-        # Sort roles by maximum performance difference between players
-        role_priority = []
-        for role in standard_roles:
-            # Calculate performance spread for this role
-            performances = [performance_matrix[player_idx][role] for player_idx in range(len(team))]
-            performances = [p for p in performances if p > -100.0]  # Filter out unavailable roles
-            if performances:
-                spread = max(performances) - min(performances)
-                role_priority.append((role, spread))
-            else:
-                role_priority.append((role, 0))
-        
-        # Sort roles by performance spread (highest first)
-        role_priority.sort(key=lambda x: x[1], reverse=True)
-        
-        # Assign roles in priority order
-        for role, _ in role_priority:
-            if role not in available_roles:
-                continue
-                
-            # Find best player for this role who hasn't been assigned yet
-            best_perf = -float('inf')
-            best_player = None
-            
-            for player_idx in range(len(team)):
-                if player_idx in assigned_players:
-                    continue
-                    
-                performance = performance_matrix[player_idx][role]
-                if performance > best_perf and performance > -100.0:
-                    best_perf = performance
-                    best_player = player_idx
-            
-            # If we found a suitable player, assign them this role
-            if best_player is not None:
-                assigned_roles[best_player] = role
-                assigned_players.add(best_player)
-                available_roles.remove(role)
-        
-        # Handle any unassigned roles or players with "forced" role
-        if len(assigned_roles) < len(team) or len(available_roles) > 0:
-            # Assign remaining players to remaining roles
-            unassigned_players = [i for i in range(len(team)) if i not in assigned_players]
-            for player_idx in unassigned_players:
-                if available_roles:
-                    # Find best available role for this player
-                    best_role = None
-                    best_perf = -float('inf')
-                    
-                    for role in available_roles:
-                        perf = performance_matrix[player_idx][role]
-                        if perf > best_perf:
-                            best_perf = perf
-                            best_role = role
-                    
-                    # Assign this player to the best available role
-                    if best_role:
-                        assigned_roles[player_idx] = best_role
-                        available_roles.remove(best_role)
-                        assigned_players.add(player_idx)
-                    else:
-                        # Fall back to "forced" role if no suitable role found
-                        assigned_roles[player_idx] = "forced"
-        
-        # Update team with assigned roles
-        for player_idx, role in assigned_roles.items():
-            updated_team[player_idx]["assigned_role"] = role
-        
-        # Ensure every player has an assigned role (should not happen, but as a fallback)
-        for player_idx, player in enumerate(updated_team):
-            if "assigned_role" not in player:
-                logger.warning(f"Player {player.get('game_name', 'Unknown')} had no assigned role after team assignment")
-                player["assigned_role"] = "forced"
-        
-        return updated_team
+        return assign_optimal_team_roles(team)
 
     def calculate_fitness(self, chromosome, players, team_size=5):
         """
@@ -330,29 +354,8 @@ class GeneticMatchMaking:
         """
         standard_roles = ["top", "jungle", "mid", "bottom", "support"]
         role_diffs = []
-        
-        # Map ranks to numeric values for comparison
-        tier_values = {
-            "challenger": 9,
-            "grandmaster": 8,
-            "master": 7,
-            "diamond": 6,
-            "emerald": 5,
-            "platinum": 4,
-            "gold": 3,
-            "silver": 2,
-            "bronze": 1,
-            "iron": 0,
-            "default": 0
-        }
-        
-        rank_values = {
-            "I": 4, 
-            "II": 3, 
-            "III": 2, 
-            "IV": 1, 
-            "V": 0
-        }
+        tier_values = self.tier_values
+        rank_values = self.rank_values
         
         # Find players assigned to each role on each team
         for role in standard_roles:
@@ -390,6 +393,103 @@ class GeneticMatchMaking:
         # Normalize to 0-1 range and invert (so higher is better)
         return 1 - (avg_diff / max_diff)
 
+    def build_fitness_engine(self, players, team_size=5):
+        """Precompute the batch fitness engine for a player pool, or None for the python backend"""
+        if self.fitness_backend != "numpy":
+            return None
+        return VectorizedFitnessEngine(players, self.tier_values, self.rank_values, team_size=team_size)
+
+    def evaluate_population(self, population, players, team_size=5, engine=None):
+        """
+        Score every chromosome in a population
+
+        Args:
+            population: List of chromosomes
+            players: List of player dictionaries with performance metrics
+            team_size: Number of players per team
+            engine: Optional VectorizedFitnessEngine built for the same players
+
+        Returns:
+            List of fitness scores in population order
+        """
+        if self.fitness_cache is None:
+            return self.score_chromosomes(population, players, team_size, engine)
+
+        fitnesses = [None] * len(population)
+        pending = {}
+        for idx, chrom in enumerate(population):
+            key = FitnessCache.key(chrom, team_size)
+            if key in pending:
+                # Duplicate split within this population, scored once below
+                self.fitness_cache.hits += 1
+                pending[key].append(idx)
+                continue
+            cached = self.fitness_cache.get(key)
+            if cached is None:
+                pending[key] = [idx]
+            else:
+                fitnesses[idx] = cached
+
+        if pending:
+            # Score the canonical chromosome so a split always gets the same fitness
+            canonical = [self.canonical_chromosome(population[positions[0]], team_size) for positions in pending.values()]
+            scores = self.score_chromosomes(canonical, players, team_size, engine)
+            for (key, positions), fitness in zip(pending.items(), scores):
+                self.fitness_cache.put(key, fitness)
+                for idx in positions:
+                    fitnesses[idx] = fitness
+
+        return fitnesses
+
+    def score_chromosomes(self, population, players, team_size=5, engine=None):
+        """Score chromosomes without the fitness cache"""
+        if engine is not None:
+            return engine.evaluate(population)
+        return [self.calculate_fitness(chrom, players, team_size) for chrom in population]
+
+    @staticmethod
+    def canonical_chromosome(chromosome, team_size=5):
+        """Order the players of each team by index"""
+        return sorted(chromosome[:team_size]) + sorted(chromosome[team_size:])
+
+    def log_fitness_cache_stats(self):
+        """Log the fitness cache hit/miss counters for the current pool"""
+        if self.fitness_cache is not None:
+            logger.info(
+                f"Fitness cache: {self.fitness_cache.hits} hits, {self.fitness_cache.misses} misses "
+                f"({self.fitness_cache.hit_rate():.1%} hit rate)"
+            )
+
+    def exact_team_split(self, players, team_size=5):
+        """
+        Exhaustively score every distinct team split of a single lobby
+
+        Fitness is symmetric in the two teams, so only splits that keep the first
+        player on team 1 are enumerated (126 splits for a 5v5 lobby). Players keep
+        their pool order inside each team, and roles come from the same
+        assign_team_roles pass as calculate_fitness.
+
+        Args:
+            players: List of player dictionaries with performance metrics, exactly team_size * 2
+            team_size: Number of players per team
+
+        Returns:
+            tuple: (best_chromosome, best_fitness)
+        """
+        n = len(players)
+        population = []
+        for rest in itertools.combinations(range(1, n), team_size - 1):
+            team1 = [0, *rest]
+            team2 = [i for i in range(n) if i not in team1]
+            population.append(team1 + team2)
+
+        engine = self.build_fitness_engine(players, team_size)
+        fitnesses = self.evaluate_population(population, players, team_size, engine)
+
+        best_idx = max(range(len(fitnesses)), key=fitnesses.__getitem__)
+        logger.info(f"Exact solver scored {len(population)} team splits: Best Fitness = {fitnesses[best_idx]:.2f}")
+        return population[best_idx], fitnesses[best_idx]
+
     def tournament_selection(self, population, fitnesses, tournament_size=3):
         """Select a chromosome using tournament selection"""
         selected = random.sample(list(zip(population, fitnesses)), tournament_size)
@@ -420,26 +520,219 @@ class GeneticMatchMaking:
             new_chromosome[i], new_chromosome[j] = new_chromosome[j], new_chromosome[i]
         return new_chromosome
 
-    def genetic_algorithm(self, players, population_size=100, generations=200, team_size=5):
+    def breed_population(self, population, fitnesses, elite, population_size):
+        """
+        Build the next generation with elitism, tournament selection, crossover and mutation
+
+        Args:
+            population: Current generation of chromosomes
+            fitnesses: Fitness of each chromosome in population
+            elite: Best chromosome found so far, carried over unchanged
+            population_size: Size of the new generation
+
+        Returns:
+            list: The new generation
+        """
+        # Mutation with adaptive rate (higher for small player pools)
+        mutation_rate = 0.15 if len(elite) <= 15 else 0.1
+
+        # Elitism: Keep best solution in new population
+        new_population = [elite[:]]
+        while len(new_population) < population_size:
+            parent1 = self.tournament_selection(population, fitnesses)
+            parent2 = self.tournament_selection(population, fitnesses)
+            child = self.order_crossover(parent1, parent2)
+            new_population.append(self.swap_mutation(child, mutation_rate))
+        return new_population
+
+    def evolve_island(self, players, population, generations, team_size=5, deadline=None):
+        """
+        Evolve one island of the island-model GA for a migration interval
+
+        Args:
+            players: List of player dictionaries with performance metrics
+            population: Island population, or an int to start from that many random chromosomes
+            generations: Number of generations to run before the next migration
+            team_size: Number of players per team
+            deadline: time.time() value after which the island stops early
+
+        Returns:
+            tuple: (population, best_chromosome, best_fitness, generations_run) with the
+            population sorted from best to worst fitness
+        """
+        if isinstance(population, int):
+            population = [random.sample(range(len(players)), len(players)) for _ in range(population)]
+        population_size = len(population)
+        engine = self.build_fitness_engine(players, team_size)
+        best_chromosome = None
+        best_fitness = float('-inf')
+
+        generations_run = 0
+        while True:
+            fitnesses = self.evaluate_population(population, players, team_size, engine)
+            current_gen_best_idx = max(range(len(fitnesses)), key=fitnesses.__getitem__)
+            if fitnesses[current_gen_best_idx] > best_fitness:
+                best_fitness = fitnesses[current_gen_best_idx]
+                best_chromosome = population[current_gen_best_idx][:]
+
+            if generations_run >= generations or (deadline is not None and time.time() >= deadline):
+                break
+            population = self.breed_population(population, fitnesses, best_chromosome, population_size)
+            generations_run += 1
+
+        ranked = sorted(range(len(population)), key=fitnesses.__getitem__, reverse=True)
+        return [population[idx] for idx in ranked], best_chromosome, best_fitness, generations_run
+
+    async def island_genetic_algorithm(self, players, population_size=100, generations=200, team_size=5,
+                                       islands=None, migration_interval=None, migrants=2, time_budget=None,
+                                       executor=None, return_stats=False):
+        """
+        Island-model genetic algorithm for large player pools
+
+        Each island evolves its own population in the process pool. Every
+        migration_interval generations the islands pause and the best migrants
+        of each island replace the worst chromosomes of the next one (ring
+        topology). The run ends after the given generations, once the wall-clock
+        budget is spent, or when no island improved for 50 generations.
+
+        Args:
+            players: List of player dictionaries with performance metrics
+            population_size: Population size of each island
+            generations: Maximum number of generations per island
+            team_size: Number of players per team
+            islands: Number of islands, defaults to settings.GA_ISLANDS
+            migration_interval: Generations between migrations, defaults to settings.GA_MIGRATION_INTERVAL
+            migrants: Chromosomes sent from each island to the next per migration
+            time_budget: Wall-clock limit in seconds, 0 for none, defaults to settings.GA_TIME_BUDGET
+            executor: Process pool to use, defaults to the shared matchmaking pool
+            return_stats: Also return the run statistics from build_run_stats
+
+        Returns:
+            tuple: (best_chromosome, best_fitness), plus the stats dict if return_stats
+        """
+        started = time.perf_counter()
+        if not players or len(players) < team_size * 2:
+            logger.error(f"Not enough players for matchmaking. Need {team_size * 2}, have {len(players)}")
+            if return_stats:
+                return None, float('-inf'), self.build_run_stats(0, 0, started, [], "not_enough_players")
+            return None, float('-inf')
+
+        islands = islands or settings.GA_ISLANDS
+        migration_interval = migration_interval or settings.GA_MIGRATION_INTERVAL
+        time_budget = settings.GA_TIME_BUDGET if time_budget is None else time_budget
+        migrants = min(migrants, population_size - 1)
+        deadline = time.time() + time_budget if time_budget else None
+
+        loop = asyncio.get_running_loop()
+        executor = executor or get_process_pool()
+        plain_players = self.plain_player_data(players)
+
+        populations = [population_size] * islands
+        best_chromosome = None
+        best_fitness = float('-inf')
+        generation = 0
+        no_improvement_count = 0
+        fitness_history = []
+        evaluations = 0
+        stopped_by = "generations"
+
+        while generation < generations:
+            interval = min(migration_interval, generations - generation)
+            results = await asyncio.gather(*[
+                loop.run_in_executor(
+                    executor,
+                    run_island_worker,
+                    plain_players,
+                    population,
+                    interval,
+                    team_size,
+                    self.fitness_backend,
+                    self.fitness_cache_size,
+                    deadline
+                )
+                for population in populations
+            ])
+            # Islands stop early on the time budget, so count the generations they actually ran
+            epoch_generations = max(result[3] for result in results)
+            generation += epoch_generations
+            # Each island scores its population once per generation plus once to rank it
+            evaluations += sum((result[3] + 1) * len(result[0]) for result in results)
+
+            epoch_best = max(results, key=lambda result: result[2])
+            if epoch_best[2] > best_fitness:
+                best_chromosome, best_fitness = epoch_best[1], epoch_best[2]
+                no_improvement_count = 0
+            else:
+                no_improvement_count += epoch_generations
+            fitness_history.append(best_fitness)
+            logger.info(f"Islands at generation {generation}/{generations}: Best Fitness = {best_fitness:.2f}")
+
+            if deadline is not None and time.time() >= deadline:
+                logger.info(f"Island GA stopped at generation {generation} - time budget of {time_budget}s spent")
+                stopped_by = "time_budget"
+                break
+            if no_improvement_count >= 50:
+                logger.info(f"Early stopping at generation {generation} - no improvement for 50 generations")
+                stopped_by = "early_stop"
+                break
+
+            # Ring migration: the best of island i replace the worst of island i + 1
+            populations = [result[0] for result in results]
+            for island_idx, result in enumerate(results):
+                target = populations[(island_idx + 1) % islands]
+                target[-migrants:] = [chromosome[:] for chromosome in result[0][:migrants]]
+
+        if self.fitness_cache is not None:
+            best_chromosome = self.canonical_chromosome(best_chromosome, team_size)
+        if return_stats:
+            stats = self.build_run_stats(generation, evaluations, started, fitness_history, stopped_by)
+            return best_chromosome, best_fitness, stats
+        return best_chromosome, best_fitness
+
+    def genetic_algorithm(self, players, population_size=100, generations=200, team_size=5, time_budget=None,
+                          return_stats=False):
         """
         Main genetic algorithm loop with adaptive parameters for small player pools
+
+        Pools of exactly team_size * 2 players are handed to exact_team_split instead,
+        as long as they have at most EXACT_SPLIT_LIMIT team splits. With a time budget
+        the search is anytime: it returns the best solution found so far once the
+        budget is spent.
         
         Args:
             players: List of player dictionaries with performance metrics
             population_size: Size of the population (increases for small player pools)
             generations: Number of generations to run (increases for small player pools)
             team_size: Number of players per team (typically 5 for League of Legends)
+            time_budget: Wall-clock limit in seconds, None for no limit
+            return_stats: Also return the run statistics from build_run_stats
             
         Returns:
-            tuple: (best_chromosome, best_fitness)
+            tuple: (best_chromosome, best_fitness), plus the stats dict if return_stats
         """
+        started = time.perf_counter()
         if not players or len(players) < team_size * 2:
             logger.error(f"Not enough players for matchmaking. Need {team_size * 2}, have {len(players)}")
+            if return_stats:
+                return None, float('-inf'), self.build_run_stats(0, 0, started, [], "not_enough_players")
             return None, float('-inf')
             
         n = len(players)
         base = list(range(n))
-        
+
+        # Cached fitness is only valid for the pool it was computed on
+        if self.fitness_cache is not None:
+            self.fitness_cache.reset()
+
+        # A single lobby is small enough to solve exactly, the GA is only needed for larger pools
+        if n == team_size * 2 and math.comb(n - 1, team_size - 1) <= EXACT_SPLIT_LIMIT:
+            best_chromosome, best_fitness = self.exact_team_split(players, team_size)
+            self.log_fitness_cache_stats()
+            if return_stats:
+                evaluations = math.comb(n - 1, team_size - 1)
+                return best_chromosome, best_fitness, self.build_run_stats(0, evaluations, started, [best_fitness], "exact")
+            return best_chromosome, best_fitness
+
         # For small player pools, use larger populations and more generations to find optimal solutions
         if n <= 20:
             population_size = max(population_size, 150)  # Larger population
@@ -452,9 +745,17 @@ class GeneticMatchMaking:
         
         # Track generations without improvement for early stopping
         no_improvement_count = 0
-        
+        deadline = started + time_budget if time_budget else None
+        fitness_history = []
+        evaluations = 0
+        stopped_by = "generations"
+
+        # Precompute per-pool arrays once when the numpy backend is selected
+        engine = self.build_fitness_engine(players, team_size)
+
         for gen in range(generations):
-            fitnesses = [self.calculate_fitness(chrom, players, team_size) for chrom in population]
+            fitnesses = self.evaluate_population(population, players, team_size, engine)
+            evaluations += len(population)
             
             # Find best in current generation
             current_gen_best_idx = max(range(len(fitnesses)), key=fitnesses.__getitem__)
@@ -468,46 +769,125 @@ class GeneticMatchMaking:
                 no_improvement_count = 0
             else:
                 no_improvement_count += 1
+            fitness_history.append(best_fitness)
             
             # Early stopping if no improvement for a while
             if no_improvement_count >= 50:
                 logger.info(f"Early stopping at generation {gen} - no improvement for 50 generations")
+                stopped_by = "early_stop"
+                break
+
+            # Anytime stop: keep the best solution found within the budget
+            if deadline is not None and time.perf_counter() >= deadline:
+                logger.info(f"Stopping at generation {gen} - time budget of {time_budget}s spent")
+                stopped_by = "time_budget"
                 break
                 
-            # Elitism: Keep best solution in new population
-            new_population = [best_chromosome[:]]
-            
-            # Create new population with tournament selection, crossover, and mutation
-            while len(new_population) < population_size:
-                # Tournament selection for parents
-                parent1 = self.tournament_selection(population, fitnesses)
-                parent2 = self.tournament_selection(population, fitnesses)
-                
-                # Crossover to create child
-                child = self.order_crossover(parent1, parent2)
-                
-                # Mutation with adaptive rate (higher for small player pools)
-                mutation_rate = 0.1
-                if n <= 15:
-                    mutation_rate = 0.15  # Increase mutation rate for diversity
-                
-                child = self.swap_mutation(child, mutation_rate)
-                
-                # Add to new population
-                new_population.append(child)
-            
             # Replace old population
-            population = new_population
+            population = self.breed_population(population, fitnesses, best_chromosome, population_size)
             
             # Log progress periodically
             if gen % 10 == 0 or gen == generations - 1:
                 logger.info(f"Generation {gen}/{generations}: Best Fitness = {best_fitness:.2f}")
             
+        # Cached fitness belongs to the canonical form of the split
+        if self.fitness_cache is not None:
+            best_chromosome = self.canonical_chromosome(best_chromosome, team_size)
+        self.log_fitness_cache_stats()
+
         # Final role assignments for best solution
         self.decode_chromosome(best_chromosome, players, team_size)
-            
+
+        if return_stats:
+            stats = self.build_run_stats(len(fitness_history), evaluations, started, fitness_history, stopped_by)
+            return best_chromosome, best_fitness, stats
         return best_chromosome, best_fitness
 
+    @staticmethod
+    def build_run_stats(generations, evaluations, started, fitness_history, stopped_by):
+        """
+        Summarize a matchmaking run
+
+        Args:
+            generations: Generations run
+            evaluations: Chromosomes scored, including fitness cache hits
+            started: time.perf_counter() value when the run started
+            fitness_history: Best fitness after each generation
+            stopped_by: "generations", "early_stop", "time_budget", "exact" or "not_enough_players"
+
+        Returns:
+            dict: Run statistics with elapsed time and evaluations per second
+        """
+        elapsed = time.perf_counter() - started
+        return {
+            "generations": generations,
+            "evaluations": evaluations,
+            "elapsed": elapsed,
+            "evaluations_per_second": evaluations / elapsed if elapsed > 0 else 0.0,
+            "fitness_history": fitness_history,
+            "stopped_by": stopped_by,
+        }
+
+    @staticmethod
+    def plain_player_data(players):
+        """Strip player dicts down to the fields the genetic algorithm reads"""
+        return [
+            {key: player[key] for key in ("tier", "rank", "roleBasedPerformance") if key in player}
+            for player in players
+        ]
+
+    async def genetic_algorithm_async(self, players, population_size=100, generations=200, team_size=5, executor=None,
+                                      islands=None, time_budget=None, return_stats=False):
+        """
+        Run genetic_algorithm in a worker process so the event loop keeps running
+
+        Pools larger than one lobby use island_genetic_algorithm when more than one island is configured.
+
+        Args:
+            players: List of player dictionaries with performance metrics
+            population_size: Size of the population
+            generations: Number of generations to run
+            team_size: Number of players per team
+            executor: Process pool to use, defaults to the shared matchmaking pool
+            islands: Number of islands, defaults to settings.GA_ISLANDS
+            time_budget: Wall-clock limit in seconds, 0 for none, defaults to settings.GA_TIME_BUDGET
+            return_stats: Also return the run statistics from build_run_stats
+
+        Returns:
+            tuple: (best_chromosome, best_fitness), plus the stats dict if return_stats;
+            chromosome indices refer to players
+        """
+        if islands is None:
+            islands = settings.GA_ISLANDS
+        if time_budget is None:
+            time_budget = settings.GA_TIME_BUDGET
+        # Pools of a single lobby are solved exactly, islands only help larger pools
+        if islands > 1 and len(players) > team_size * 2:
+            return await self.island_genetic_algorithm(
+                players,
+                population_size=population_size,
+                generations=generations,
+                team_size=team_size,
+                islands=islands,
+                time_budget=time_budget,
+                executor=executor,
+                return_stats=return_stats
+            )
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor or get_process_pool(),
+            run_genetic_algorithm_worker,
+            self.plain_player_data(players),
+            population_size,
+            generations,
+            team_size,
+            self.fitness_backend,
+            self.fitness_cache_size,
+            time_budget,
+            return_stats
+        )
+
     async def save_matchmaking_results(self, team1, team2):
         """Save the matchmaking results to the database"""
         try:
@@ -543,12 +923,29 @@ class GeneticMatchMaking:
             logger.error(f"Error saving matchmaking results: {ex}")
             return None
 
-    async def run_matchmaking(self, population_size=100, generations=200, team_size=5):
-        """Run the entire matchmaking process"""
+    async def run_matchmaking(self, population_size=100, generations=200, team_size=5, time_budget=None,
+                              return_stats=False):
+        """
+        Run the entire matchmaking process
+
+        Args:
+            population_size: Size of the GA population
+            generations: Number of generations to run
+            team_size: Number of players per team
+            time_budget: Wall-clock limit in seconds for the whole run, None for no limit.
+                The GA gets whatever is left after loading and preparing players.
+            return_stats: Also return the run statistics from build_run_stats
+
+        Returns:
+            tuple: (team1, team2), plus the stats dict if return_stats
+        """
+        started = time.perf_counter()
         # Fetch player data from database or JSON file
         players = await self.fetch_player_data()
         if not players or len(players) < team_size * 2:
             logger.error(f"Not enough players for matchmaking. Need {team_size * 2}, have {len(players)}")
+            if return_stats:
+                return None, None, self.build_run_stats(0, 0, started, [], "not_enough_players")
             return None, None
         
         # Calculate tier for each player if not already present
@@ -559,17 +956,26 @@ class GeneticMatchMaking:
         # Sort and process players
         sorted_players = await self.initial_sorting_player(players)
         processed_players = await self.calculate_performance(sorted_players)
+
+        # The GA always runs at least one generation, even if preparation used up the budget
+        ga_budget = None
+        if time_budget:
+            ga_budget = max(time_budget - (time.perf_counter() - started), 0.001)
         
         # Run the genetic algorithm
-        best_chrom, best_fit = self.genetic_algorithm(
+        result = self.genetic_algorithm(
             processed_players, 
             population_size=population_size, 
             generations=generations, 
-            team_size=team_size
+            team_size=team_size,
+            time_budget=ga_budget,
+            return_stats=return_stats
         )
+        best_chrom, best_fit = result[:2]
+        stats = result[2] if return_stats else None
         
         if best_chrom is None:
-            return None, None
+            return (None, None, stats) if return_stats else (None, None)
             
         # Decode the best chromosome into two teams
         team1, team2 = self.decode_chromosome(best_chrom, processed_players, team_size=team_size)
@@ -582,7 +988,11 @@ class GeneticMatchMaking:
         
         # Save results to database if needed
         # await self.save_matchmaking_results(team1, team2)
-        
+
+        if return_stats:
+            # Report the whole run, not just the GA
+            stats["elapsed"] = time.perf_counter() - started
+            return team1, team2, stats
         return team1, team2
 
 
@@ -0,0 +1,248 @@
+import asyncio
+import itertools
+import random
+import time
+from tournament_bot.bot.services.genetic_matchmaking import GeneticMatchMaking, get_process_pool
+from tournament_bot.bot.services.role_assignment import STANDARD_ROLES
+from tournament_bot.config import settings
+
+logger = settings.logging.getLogger("discord")
+
+# Fitness subtracted per role slot a lobby cannot fill on both teams
+ROLE_COVERAGE_PENALTY = 5.0
+
+
+def run_partition_worker(players, players_per_game, objective, fitness_backend, time_budget):
+    """Process pool entry point: partitions plain player data and returns the lobbies as player indices"""
+    matchmaker = GeneticMatchMaking(fitness_backend=fitness_backend, fitness_cache_size=0, connect_db=False)
+    partitioner = LobbyPartitioner(matchmaker, players, players_per_game, objective)
+    partitioner.optimize(time_budget=time_budget)
+    return partitioner.lobbies
+
+
+class LobbyPartitioner:
+    """
+    Assigns a pool of players to several lobbies at once
+
+    Lobbies start as contiguous slices of the given player order and are then
+    improved by swapping players between lobbies. Each lobby is scored with the
+    best team split of its players (the same exhaustive search as
+    GeneticMatchMaking.exact_team_split), minus a penalty for every standard
+    role that cannot be covered on both teams. Lobby scores are cached by
+    player set, so adding a late check-in only rescores the lobbies it touches.
+    """
+    OBJECTIVES = ("sum", "min")
+
+    def __init__(self, matchmaker, players, players_per_game=10, objective="sum"):
+        """
+        Args:
+            matchmaker: GeneticMatchMaking used to score team splits
+            players: List of player dictionaries with performance metrics
+            players_per_game: Number of players per lobby
+            objective: "sum" maximizes the total lobby score, "min" the worst lobby
+        """
+        if objective not in self.OBJECTIVES:
+            raise ValueError(f"Unknown partition objective: {objective}")
+        self.matchmaker = matchmaker
+        self.players = list(players)
+        self.players_per_game = players_per_game
+        self.team_size = players_per_game // 2
+        self.objective = objective
+        self.engine = matchmaker.build_fitness_engine(self.players, self.team_size)
+        # frozenset of player indices -> (lobby score, best chromosome)
+        self.lobby_scores = {}
+
+        lobby_count = len(self.players) // players_per_game
+        self.lobbies = [
+            list(range(lobby_idx * players_per_game, (lobby_idx + 1) * players_per_game))
+            for lobby_idx in range(lobby_count)
+        ]
+        # Players left over once every lobby is full
+        self.bench = list(range(lobby_count * players_per_game, len(self.players)))
+
+    def role_coverage_gap(self, lobby):
+        """Count the role slots the lobby cannot fill with a player who listed the role"""
+        gap = 0
+        for role in STANDARD_ROLES:
+            listed = sum(1 for idx in lobby if role in self.players[idx].get("roleBasedPerformance", {}))
+            gap += max(0, 2 - listed)
+        return gap
+
+    def score_lobby(self, lobby):
+        """
+        Score a lobby by its best team split
+
+        Args:
+            lobby: Player indices of the lobby
+
+        Returns:
+            tuple: (score, best_chromosome) with the chromosome in player indices
+        """
+        key = frozenset(lobby)
+        if key in self.lobby_scores:
+            return self.lobby_scores[key]
+
+        # Fitness is symmetric in the two teams, so the first player stays on team 1
+        ordered = sorted(lobby)
+        splits = []
+        for rest in itertools.combinations(ordered[1:], self.team_size - 1):
+            team1 = [ordered[0], *rest]
+            splits.append(team1 + [idx for idx in ordered if idx not in team1])
+        fitnesses = self.matchmaker.score_chromosomes(splits, self.players, self.team_size, self.engine)
+
+        best_idx = max(range(len(fitnesses)), key=fitnesses.__getitem__)
+        score = fitnesses[best_idx] - ROLE_COVERAGE_PENALTY * self.role_coverage_gap(lobby)
+        self.lobby_scores[key] = (score, splits[best_idx])
+        return self.lobby_scores[key]
+
+    def objective_value(self, scores):
+        """Objective of a list of lobby scores, compared lexicographically"""
+        if self.objective == "min":
+            # Ties on the worst lobby are broken by the total
+            return min(scores), sum(scores)
+        return (sum(scores),)
+
+    def total_objective(self):
+        return self.objective_value([self.score_lobby(lobby)[0] for lobby in self.lobbies])
+
+    def try_swap(self, scores, lobby_a, lobby_b, player_a, player_b):
+        """
+        Swap two players between lobbies if it improves the objective
+
+        Returns:
+            bool: True if the swap was applied
+        """
+        new_a = [player_b if idx == player_a else idx for idx in self.lobbies[lobby_a]]
+        new_b = [player_a if idx == player_b else idx for idx in self.lobbies[lobby_b]]
+        new_scores = list(scores)
+        new_scores[lobby_a] = self.score_lobby(new_a)[0]
+        new_scores[lobby_b] = self.score_lobby(new_b)[0]
+
+        if self.objective_value(new_scores) <= self.objective_value(scores):
+            return False
+        self.lobbies[lobby_a] = new_a
+        self.lobbies[lobby_b] = new_b
+        scores[lobby_a] = new_scores[lobby_a]
+        scores[lobby_b] = new_scores[lobby_b]
+        return True
+
+    def optimize(self, lobby_indices=None, time_budget=None):
+        """
+        Improve the partition by pairwise swaps until no swap helps
+
+        Args:
+            lobby_indices: Only try swaps involving these lobbies, all lobbies if None
+            time_budget: Wall-clock limit in seconds, None or 0 for no limit
+
+        Returns:
+            set: Indices of lobbies whose players changed
+        """
+        deadline = time.time() + time_budget if time_budget else None
+        focus = set(range(len(self.lobbies)) if lobby_indices is None else lobby_indices)
+        pairs = [
+            (lobby_a, lobby_b)
+            for lobby_a, lobby_b in itertools.combinations(range(len(self.lobbies)), 2)
+            if lobby_a in focus or lobby_b in focus
+        ]
+        scores = [self.score_lobby(lobby)[0] for lobby in self.lobbies]
+        changed = set()
+        swaps = 0
+
+        improved = True
+        while improved:
+            improved = False
+            random.shuffle(pairs)
+            for lobby_a, lobby_b in pairs:
+                for player_a, player_b in itertools.product(list(self.lobbies[lobby_a]), list(self.lobbies[lobby_b])):
+                    if player_a not in self.lobbies[lobby_a] or player_b not in self.lobbies[lobby_b]:
+                        continue
+                    if self.try_swap(scores, lobby_a, lobby_b, player_a, player_b):
+                        changed.update((lobby_a, lobby_b))
+                        swaps += 1
+                        improved = True
+                    if deadline is not None and time.time() >= deadline:
+                        logger.info(f"Lobby partition stopped after {swaps} swaps - time budget of {time_budget}s spent")
+                        return changed
+
+        logger.info(f"Lobby partition converged after {swaps} swaps: objective = {self.objective_value(scores)[0]:.2f}")
+        return changed
+
+    def add_player(self, player, time_budget=None):
+        """
+        Add a late check-in without rebuilding the other lobbies
+
+        The player joins the bench. Once the bench can fill a lobby, a new lobby
+        is opened and only swaps involving it are tried. Otherwise the player
+        replaces a lobby member if that improves the objective, and the replaced
+        player moves to the bench.
+
+        Args:
+            player: Player dictionary with performance metrics
+            time_budget: Wall-clock limit in seconds for the swap search
+
+        Returns:
+            set: Indices of lobbies whose players changed
+        """
+        new_idx = len(self.players)
+        self.players.append(player)
+        # Cached lobby scores stay valid, only the arrays need the new player
+        self.engine = self.matchmaker.build_fitness_engine(self.players, self.team_size)
+        self.bench.append(new_idx)
+
+        if len(self.bench) >= self.players_per_game:
+            self.lobbies.append(self.bench[:self.players_per_game])
+            self.bench = self.bench[self.players_per_game:]
+            new_lobby = len(self.lobbies) - 1
+            return {new_lobby} | self.optimize(lobby_indices=[new_lobby], time_budget=time_budget)
+
+        scores = [self.score_lobby(lobby)[0] for lobby in self.lobbies]
+        best_objective = self.objective_value(scores)
+        best_move = None
+        for lobby_idx, lobby in enumerate(self.lobbies):
+            for member in lobby:
+                new_scores = list(scores)
+                new_scores[lobby_idx] = self.score_lobby([new_idx if idx == member else idx for idx in lobby])[0]
+                objective = self.objective_value(new_scores)
+                if objective > best_objective:
+                    best_objective, best_move = objective, (lobby_idx, member)
+
+        if best_move is None:
+            return set()
+        lobby_idx, member = best_move
+        self.lobbies[lobby_idx] = [new_idx if idx == member else idx for idx in self.lobbies[lobby_idx]]
+        self.bench = [member if idx == new_idx else idx for idx in self.bench]
+        return {lobby_idx}
+
+    def lobby_players(self):
+        """Return the player dictionaries of every lobby"""
+        return [[self.players[idx] for idx in lobby] for lobby in self.lobbies]
+
+
+async def partition_lobbies_async(matchmaker, players, players_per_game=10, objective="sum", time_budget=None,
+                                  executor=None):
+    """
+    Partition players into lobbies in the process pool
+
+    Args:
+        matchmaker: GeneticMatchMaking whose fitness backend is used
+        players: List of player dictionaries with performance metrics, in skill order
+        players_per_game: Number of players per lobby
+        objective: "sum" or "min", see LobbyPartitioner
+        time_budget: Wall-clock limit in seconds, defaults to settings.GA_TIME_BUDGET
+        executor: Process pool to use, defaults to the shared matchmaking pool
+
+    Returns:
+        list: Lobbies as lists of the given player dictionaries
+    """
+    time_budget = settings.GA_TIME_BUDGET if time_budget is None else time_budget
+    loop = asyncio.get_running_loop()
+    lobbies = await loop.run_in_executor(
+        executor or get_process_pool(),
+        run_partition_worker,
+        matchmaker.plain_player_data(players),
+        players_per_game,
+        objective,
+        matchmaker.fitness_backend,
+        time_budget
+    )
+    return [[players[idx] for idx in lobby] for lobby in lobbies]
@@ -241,8 +241,7 @@ def buildTeams(players):
     team1_roles, team2_roles = set(), set()
     t1_performance = 0
     t2_performance = 0
-    for player in players:
-        player_index = players.index(player)
+    for player_index, player in enumerate(players):
         next_player = players[player_index + 1] if player_index + 1 < len(players) else None
 
         role_assigned_to = {}
@@ -308,6 +307,87 @@ def buildTeams(players):
     return team1, team2
 
 
+""" Precompute each player's roles in preference order as (role id, performance) pairs
+    Role names are mapped to small integer ids so a team's taken roles fit in one
+    bitmask, and each player also gets the mask of every role they can play.
+"""
+def index_role_performance(players):
+    role_ids = {}
+    role_choices = []
+    role_masks = []
+    for player in players:
+        choices = []
+        mask = 0
+        for role, performance in player["roleBasedPerformance"].items():
+            role_id = role_ids.setdefault(role, len(role_ids))
+            choices.append((role_id, performance))
+            mask |= 1 << role_id
+        role_choices.append(choices)
+        role_masks.append(mask)
+    return role_choices, role_masks, list(role_ids)
+
+""" Indexed version of possible_assighn_role: first preferred role not taken in the team mask """
+def first_free_role(role_choices, taken_roles):
+    for role_id, performance in role_choices:
+        if not taken_roles >> role_id & 1:
+            return role_id, performance
+    return None, None
+
+""" Linear-time greedy engine with the same decisions and output as buildTeams
+    Works over the indexed role performances from index_role_performance, with
+    team roles kept as bitmasks and the next player read by position. The index
+    can be computed once and passed in when the same pool is built repeatedly.
+
+    Which team a player is tried on only changes when someone is placed, so
+    players whose roles are all taken in that team are skipped with a single
+    mask test instead of a role lookup.
+"""
+def build_teams_indexed(players, indexed=None):
+    role_choices, role_masks, role_names = indexed or index_role_performance(players)
+    player_count = len(players)
+    teams = ([], [])
+    team_roles = [0, 0]
+    team_performance = [0, 0]
+
+    def place(team, player, role_id, performance=None):
+        teams[team].append({"team_role": role_names[role_id], "assigned_to": player})
+        team_roles[team] |= 1 << role_id
+        if performance is not None:
+            team_performance[team] += performance
+
+    player_index = 0
+    while player_index < player_count:
+        if len(teams[0]) != 0 and len(teams[1]) <= len(teams[0]):
+            # Team 2 is not ahead in size: fill it first while it trails in performance
+            preferred, other = 1, 0
+        else:
+            preferred, other = 0, 1
+        tried = preferred if team_performance[preferred] <= team_performance[other] else other
+
+        # buildTeams looks these players up but never places them
+        taken = team_roles[tried]
+        while player_index < player_count and not role_masks[player_index] & ~taken:
+            player_index += 1
+        if player_index == player_count:
+            break
+
+        player = players[player_index]
+        role_id, performance = first_free_role(role_choices[player_index], taken)
+        if tried == other:
+            place(other, player, role_id, performance)
+        elif player_index + 1 < player_count:
+            next_role_id, next_performance = first_free_role(role_choices[player_index + 1], taken)
+            if next_role_id is not None and performance >= next_performance:
+                place(preferred, player, role_id, performance)
+            else:
+                place(other, player, role_id, performance)
+        else:
+            place(preferred, player, role_id)
+        player_index += 1
+
+    return teams[0], teams[1]
+
+
 """this is to makes sure same player not teamup for tournamantes
     method: verify_swap_teams
         grouping each team based on their respective game history based on (gameid/customid)
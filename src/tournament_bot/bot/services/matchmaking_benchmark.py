@@ -0,0 +1,378 @@
+"""
+Reproducible matchmaking benchmark and quality-regression suite
+
+Runs every registered solver on seeded synthetic player pools and records
+wall time, fitness evaluations per second, peak memory and team balance.
+Results are written as JSON so runs can be compared across commits:
+
+    python -m tournament_bot.bot.services.matchmaking_benchmark --output bench.json
+    python -m tournament_bot.bot.services.matchmaking_benchmark --baseline bench.json --threshold 0.2
+
+The second form exits with status 1 if any solver got slower, used more
+memory or produced worse balanced games than the baseline beyond the threshold.
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from tournament_bot.bot.services import matchmaking as match_making
+from tournament_bot.bot.services.genetic_matchmaking import GeneticMatchMaking
+from tournament_bot.bot.services.lobby_partitioner import LobbyPartitioner
+from tournament_bot.config import settings
+
+logger = settings.logging.getLogger("discord")
+
+POOL_SIZES = (10, 20, 50, 200)
+PLAYERS_PER_GAME = 10
+TIERS = ["iron", "bronze", "silver", "gold", "platinum", "emerald", "diamond", "master", "grandmaster", "challenger"]
+RANKS = ["I", "II", "III", "IV", "V"]
+ROLES = ["top", "jungle", "mid", "bottom", "support"]
+
+
+def synthetic_players(count, seed=0):
+    """
+    Build a seeded pool of synthetic players
+
+    calculated_tier is set explicitly so calculate_player_tier's random
+    variation does not make runs differ.
+
+    Args:
+        count: Number of players
+        seed: Random seed, the same seed always gives the same pool
+
+    Returns:
+        list: Player dictionaries in the shape returned by fetch_player_data
+    """
+    rng = random.Random(f"{seed}-{count}")
+    return [
+        {
+            "user_id": f"player{i + 1}",
+            "game_name": f"Player{i + 1}",
+            "tier": rng.choice(TIERS),
+            "rank": rng.choice(RANKS),
+            "wr": rng.randint(40, 95),
+            "role": rng.sample(ROLES, rng.randint(1, 5)),
+            "calculated_tier": round(rng.uniform(1, 6), 3),
+        }
+        for i in range(count)
+    ]
+
+
+def skill_slices(players):
+    """Sort players by skill and cut them into contiguous lobbies, as /run_matchmaking used to"""
+    matchmaker = GeneticMatchMaking(connect_db=False)
+    ordered = sorted(players, key=lambda pl: (
+        matchmaker.tier_order.get(pl["tier"], 11),
+        matchmaker.rank_order.get(pl["rank"], 5),
+        -pl.get("wr", 0)
+    ))
+    return [ordered[start:start + PLAYERS_PER_GAME] for start in range(0, len(ordered) - PLAYERS_PER_GAME + 1, PLAYERS_PER_GAME)]
+
+
+async def solve_greedy(players, time_budget):
+    """Greedy buildTeams on every contiguous skill slice"""
+    games = []
+    for lobby in skill_slices(players):
+        lobby = await match_making.performance([dict(player) for player in lobby])
+        team1, team2 = match_making.buildTeams(lobby)
+        games.append((
+            [entry["assigned_to"] for entry in team1],
+            [entry["assigned_to"] for entry in team2]
+        ))
+    return games, 0
+
+
+async def solve_greedy_indexed(players, time_budget):
+    """build_teams_indexed on every contiguous skill slice"""
+    games = []
+    for lobby in skill_slices(players):
+        lobby = await match_making.performance([dict(player) for player in lobby])
+        team1, team2 = match_making.build_teams_indexed(lobby)
+        games.append((
+            [entry["assigned_to"] for entry in team1],
+            [entry["assigned_to"] for entry in team2]
+        ))
+    return games, 0
+
+
+async def solve_genetic(players, time_budget):
+    """genetic_algorithm on every contiguous skill slice, as /run_matchmaking balances each game"""
+    matchmaker = GeneticMatchMaking(fitness_backend="numpy", connect_db=False)
+    games = []
+    evaluations = 0
+    for lobby in skill_slices(players):
+        lobby = await matchmaker.calculate_performance([dict(player) for player in lobby])
+        best_chromosome, _, stats = matchmaker.genetic_algorithm(
+            lobby, team_size=PLAYERS_PER_GAME // 2, time_budget=time_budget, return_stats=True
+        )
+        evaluations += stats["evaluations"]
+        games.append(matchmaker.decode_chromosome(best_chromosome, lobby, PLAYERS_PER_GAME // 2))
+    return games, evaluations
+
+
+async def solve_genetic_pool(players, time_budget):
+    """genetic_algorithm on the whole pool split into two halves, exercising the GA loop at scale"""
+    matchmaker = GeneticMatchMaking(fitness_backend="numpy", connect_db=False)
+    pool = await matchmaker.calculate_performance([dict(player) for player in players])
+    team_size = len(pool) // 2
+    best_chromosome, _, stats = matchmaker.genetic_algorithm(
+        pool, team_size=team_size, time_budget=time_budget, return_stats=True
+    )
+    return [matchmaker.decode_chromosome(best_chromosome, pool, team_size)], stats["evaluations"]
+
+
+async def solve_partitioned(players, time_budget):
+    """LobbyPartitioner across all lobbies, then the best split of each lobby"""
+    matchmaker = GeneticMatchMaking(fitness_backend="numpy", connect_db=False)
+    ordered = [player for lobby in skill_slices(players) for player in lobby]
+    pool = await matchmaker.calculate_performance([dict(player) for player in ordered])
+    partitioner = LobbyPartitioner(matchmaker, pool, PLAYERS_PER_GAME)
+    partitioner.optimize(time_budget=time_budget)
+
+    games = []
+    for lobby in partitioner.lobbies:
+        _, best_chromosome = partitioner.score_lobby(lobby)
+        games.append(matchmaker.decode_chromosome(best_chromosome, partitioner.players, PLAYERS_PER_GAME // 2))
+    # Every lobby the search looked at was scored over all of its team splits
+    evaluations = len(partitioner.lobby_scores) * math.comb(PLAYERS_PER_GAME - 1, PLAYERS_PER_GAME // 2 - 1)
+    return games, evaluations
+
+
+# Solvers compared by the benchmark, add new solvers here
+SOLVERS = {
+    "greedy": solve_greedy,
+    "greedy_indexed": solve_greedy_indexed,
+    "genetic": solve_genetic,
+    "genetic_pool": solve_genetic_pool,
+    "partitioned": solve_partitioned,
+}
+
+
+def game_quality(games):
+    """
+    Score games with the GA fitness function so every solver is judged the same way
+
+    Returns:
+        tuple: (mean fitness, mean team performance difference)
+    """
+    matchmaker = GeneticMatchMaking(connect_db=False)
+    fitnesses = []
+    differences = []
+    for team1, team2 in games:
+        game_players = list(team1) + list(team2)
+        chromosome = list(range(len(game_players)))
+        fitnesses.append(matchmaker.calculate_fitness(chromosome, game_players, len(team1)))
+        differences.append(abs(matchmaker.team_performance(team1) - matchmaker.team_performance(team2)))
+    if not games:
+        return 0.0, 0.0
+    return sum(fitnesses) / len(fitnesses), sum(differences) / len(differences)
+
+
+async def benchmark_solver(name, players, seed=0, time_budget=2.0):
+    """
+    Run one solver on one pool
+
+    The timed run and the memory run are separate so tracemalloc overhead does
+    not inflate the wall time.
+
+    Returns:
+        dict: Benchmark record for the solver and pool size
+    """
+    solver = SOLVERS[name]
+
+    random.seed(seed)
+    started = time.perf_counter()
+    games, evaluations = await solver(players, time_budget)
+    wall_time = time.perf_counter() - started
+
+    random.seed(seed)
+    tracemalloc.start()
+    try:
+        await solver(players, time_budget)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    mean_fitness, mean_difference = game_quality(games)
+    return {
+        "solver": name,
+        "players": len(players),
+        "games": len(games),
+        "wall_time": wall_time,
+        "evaluations": evaluations,
+        "evaluations_per_second": evaluations / wall_time if wall_time > 0 else 0.0,
+        "peak_memory_kb": peak_memory / 1024,
+        "mean_fitness": mean_fitness,
+        "mean_performance_difference": mean_difference,
+    }
+
+
+async def compare_greedy_engines(pool_sizes=(1000, 10000, 50000), seed=0, repeat=3):
+    """
+    Time buildTeams against build_teams_indexed on large single pools
+
+    Args:
+        pool_sizes: Player counts of the synthetic pools
+        seed: Seed for the pools
+        repeat: Runs per engine, the fastest is kept
+
+    Returns:
+        list: One record per pool size with the best times in seconds and whether the teams match
+    """
+    records = []
+    for size in pool_sizes:
+        players = await match_making.performance(synthetic_players(size, seed))
+
+        def best_time(function):
+            times = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                result = function()
+                times.append(time.perf_counter() - started)
+            return min(times), result
+
+        build_time, teams = best_time(lambda: match_making.buildTeams(players))
+        index_time, indexed = best_time(lambda: match_making.index_role_performance(players))
+        indexed_time, indexed_teams = best_time(lambda: match_making.build_teams_indexed(players, indexed))
+        records.append({
+            "players": size,
+            "buildTeams": build_time,
+            "index_role_performance": index_time,
+            "build_teams_indexed": indexed_time,
+            "same_teams": teams == indexed_teams,
+        })
+    return records
+
+
+def current_commit():
+    """Return the current git commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=settings.Base_Dir
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(pool_sizes=POOL_SIZES, solvers=None, seed=0, time_budget=2.0):
+    """
+    Run every solver on every pool size
+
+    Args:
+        pool_sizes: Player counts of the synthetic pools
+        solvers: Solver names from SOLVERS, all of them if None
+        seed: Seed for the pools and the solvers' random choices
+        time_budget: Time budget in seconds passed to solvers that support one
+
+    Returns:
+        dict: {"meta": run information, "results": list of benchmark records}
+    """
+    results = []
+    for size in pool_sizes:
+        players = synthetic_players(size, seed)
+        for name in solvers or SOLVERS:
+            record = await benchmark_solver(name, players, seed, time_budget)
+            logger.info(
+                f"Benchmark {name} with {size} players: {record['wall_time']:.3f}s, "
+                f"{record['evaluations_per_second']:.0f} evaluations/s, fitness {record['mean_fitness']:.2f}"
+            )
+            results.append(record)
+
+    return {
+        "meta": {
+            "commit": current_commit(),
+            "python": platform.python_version(),
+            "seed": seed,
+            "time_budget": time_budget,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare_results(current, baseline, threshold=0.2, quality_threshold=0.02, min_time_delta=0.05):
+    """
+    Compare a benchmark run against a baseline run
+
+    Args:
+        current: Output of run_benchmark
+        baseline: Output of an earlier run_benchmark
+        threshold: Allowed relative increase of wall time and peak memory
+        quality_threshold: Allowed relative drop of mean fitness
+        min_time_delta: Wall time differences below this many seconds are treated as noise
+
+    Returns:
+        list: One message per regression, empty if there are none
+    """
+    baseline_records = {(record["solver"], record["players"]): record for record in baseline["results"]}
+    regressions = []
+    for record in current["results"]:
+        before = baseline_records.get((record["solver"], record["players"]))
+        if before is None:
+            continue
+        label = f"{record['solver']} with {record['players']} players"
+
+        if (record["wall_time"] > before["wall_time"] * (1 + threshold)
+                and record["wall_time"] - before["wall_time"] > min_time_delta):
+            regressions.append(f"{label}: wall time {before['wall_time']:.3f}s -> {record['wall_time']:.3f}s")
+        if record["peak_memory_kb"] > before["peak_memory_kb"] * (1 + threshold):
+            regressions.append(
+                f"{label}: peak memory {before['peak_memory_kb']:.0f}KB -> {record['peak_memory_kb']:.0f}KB"
+            )
+        if record["mean_fitness"] < before["mean_fitness"] * (1 - quality_threshold):
+            regressions.append(f"{label}: mean fitness {before['mean_fitness']:.2f} -> {record['mean_fitness']:.2f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the matchmaking solvers on seeded synthetic pools")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(POOL_SIZES), help="Pool sizes to run")
+    parser.add_argument("--solvers", nargs="+", choices=list(SOLVERS), help="Solvers to run, all by default")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-budget", type=float, default=2.0, help="Seconds per solver run")
+    parser.add_argument("--output", default="matchmaking_benchmark.json", help="Where to write the results")
+    parser.add_argument("--baseline", help="Earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown or memory growth")
+    parser.add_argument("--quality-threshold", type=float, default=0.02, help="Allowed relative fitness drop")
+    parser.add_argument("--greedy-sizes", type=int, nargs="+",
+                        help="Also time buildTeams against build_teams_indexed on single pools of these sizes")
+    args = parser.parse_args(argv)
+
+    if args.greedy_sizes:
+        print(f"{'players':>8}{'buildTeams ms':>15}{'index ms':>10}{'indexed ms':>12}  same")
+        for record in asyncio.run(compare_greedy_engines(args.greedy_sizes, args.seed)):
+            print(
+                f"{record['players']:>8}{record['buildTeams'] * 1000:>15.2f}{record['index_role_performance'] * 1000:>10.2f}"
+                f"{record['build_teams_indexed'] * 1000:>12.2f}  {record['same_teams']}"
+            )
+
+    results = asyncio.run(run_benchmark(args.sizes, args.solvers, args.seed, args.time_budget))
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+
+    print(f"{'solver':<14}{'players':>8}{'wall s':>10}{'evals/s':>12}{'peak KB':>10}{'fitness':>9}")
+    for record in results["results"]:
+        print(
+            f"{record['solver']:<14}{record['players']:>8}{record['wall_time']:>10.3f}"
+            f"{record['evaluations_per_second']:>12.0f}{record['peak_memory_kb']:>10.0f}{record['mean_fitness']:>9.2f}"
+        )
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare_results(results, baseline, args.threshold, args.quality_threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,8 @@
 import json
-import requests
 from google import genai
 
 from tournament_bot.config import settings
+from tournament_bot.integrations.overfast import fetch_hero_roles, fetch_player_stats, get_overfast_cache
 
 
 client = genai.Client(api_key=settings.GEMINI_API_KEY)
@@ -38,28 +38,12 @@ def get_time_played(categories):
 
 class OverwatchPlayerAnalysisService:
     def get_hero_roles(self):
-        roles = {}
-
-        response = requests.get(
-            "https://overfast-api.tekrop.fr/heroes",
-            timeout=15
-        )
-
-        if response.status_code != 200:
-            raise ValueError("Could not fetch Overwatch hero role data.")
-
-        for hero in response.json():
-            roles[hero["key"]] = hero["role"]
-
-        return roles
+        return fetch_hero_roles()
 
     def analyze_player_sync(self, battletag: str, mode: str = "quickplay") -> str:
-        formatted_tag = battletag.replace("#", "-")
-
         hero_roles = self.get_hero_roles()
 
-        summary_url = f"https://overfast-api.tekrop.fr/players/{formatted_tag}/summary"
-        summary_response = requests.get(summary_url, timeout=15)
+        summary_response, pc_response, console_response = fetch_player_stats(battletag, mode)
 
         if summary_response.status_code != 200:
             raise ValueError(
@@ -73,19 +57,7 @@ class OverwatchPlayerAnalysisService:
                 "This player profile is private. The Overwatch profile must be public."
             )
 
-        stats_url = f"https://overfast-api.tekrop.fr/players/{formatted_tag}/stats"
-
-        pc_response = requests.get(
-            stats_url,
-            params={"platform": "pc", "gamemode": mode},
-            timeout=20
-        )
-
-        console_response = requests.get(
-            stats_url,
-            params={"platform": "console", "gamemode": mode},
-            timeout=20
-        )
+        get_overfast_cache().log_stats("OverFast")
 
         stats_pc = pc_response.json() if pc_response.status_code == 200 else {}
         stats_console = console_response.json() if console_response.status_code == 200 else {}
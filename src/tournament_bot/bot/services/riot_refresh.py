@@ -0,0 +1,362 @@
+import asyncio
+import collections
+import time
+from urllib.parse import quote
+from tournament_bot.config import settings
+from tournament_bot.integrations.riot_client import ACCOUNT_URL, PLATFORM_URL, RiotNotFound, RiotRequestFailed, get_riot_client
+from tournament_bot.models.dbc_model import AsyncDAO, Game, Player, Riot_identity, run_in_db_thread
+
+logger = settings.logging.getLogger("discord")
+
+
+def identity_key(game_name, tag_id):
+    """Riot IDs are case-insensitive, so the in-memory cache keys on lower case"""
+    return str(game_name).strip().lower(), str(tag_id).strip().lower()
+
+
+class RiotRefreshPipeline:
+    """
+    Refreshes ranked data of many players concurrently
+
+    Requests go through the shared RiotClient. At most concurrency players
+    are in flight, and results are written to the database in batches on
+    the DB thread pool.
+    """
+
+    def __init__(self, client=None, concurrency=None, batch_size=None,
+                 db_name=settings.DATABASE_NAME, account_url=ACCOUNT_URL, platform_url=PLATFORM_URL):
+        """
+        Args:
+            client: RiotClient sending the requests, defaults to the bot's shared client
+            concurrency: Players refreshed at the same time, defaults to settings.RIOT_CONCURRENCY
+            batch_size: Players written per DB transaction, defaults to settings.RIOT_BATCH_SIZE
+            db_name: Database to write to
+            account_url: Regional host of the account API
+            platform_url: Platform host of the summoner and league APIs
+        """
+        self.client = client or get_riot_client()
+        self.concurrency = concurrency or settings.RIOT_CONCURRENCY
+        self.batch_size = batch_size or settings.RIOT_BATCH_SIZE
+        self.db_name = db_name
+        self.account_url = account_url
+        self.platform_url = platform_url
+        self.stats = collections.Counter()
+        self.dao = AsyncDAO(db_name)
+        # Riot ID resolutions of this process, reloaded from riot_identity by every refresh
+        self.identities = {}
+
+    async def request_json(self, url, cache=True):
+        """
+        GET a Riot endpoint through the client, telling failures apart from answers
+
+        Raises:
+            RiotNotFound: Riot answered 404
+            RiotRequestFailed: Riot gave no answer
+        """
+        body = await self.client.request_json(url, cache=cache)
+        if body is None:
+            raise RiotRequestFailed(url)
+        return body
+
+    async def resolve_identity(self, game_name, tag_id, refresh=False):
+        """
+        Resolve a Riot ID to its puuid and summoner ID
+
+        Cached resolutions are reused, new ones are saved to riot_identity.
+
+        Args:
+            game_name: Riot ID name
+            tag_id: Riot ID tag
+            refresh: Ignore cached resolutions
+
+        Returns:
+            tuple: (puuid, summoner_id), or None when the Riot ID does not exist
+
+        Raises:
+            RiotRequestFailed: Riot gave no answer, nothing is cached or invalidated
+        """
+        key = identity_key(game_name, tag_id)
+        if not refresh:
+            identity = self.identities.get(key)
+            if identity is None:
+                identity = await self.dao.transaction(Riot_identity.fetch, game_name, tag_id)
+            if identity is not None:
+                self.identities[key] = identity
+                self.stats["identity_hits"] += 1
+                return identity
+
+        try:
+            # A forced refresh must not be answered from the response cache
+            account = await self.request_json(
+                f"{self.account_url}/riot/account/v1/accounts/by-riot-id/{quote(str(game_name))}/{quote(str(tag_id))}",
+                cache=not refresh
+            )
+            if not account.get("puuid"):
+                return None
+            summoner = await self.request_json(
+                f"{self.platform_url}/lol/summoner/v4/summoners/by-puuid/{account['puuid']}", cache=not refresh
+            )
+        except RiotNotFound:
+            await self.invalidate_identity(game_name, tag_id)
+            return None
+        if not summoner.get("id"):
+            return None
+
+        identity = (account["puuid"], summoner["id"])
+        self.identities[key] = identity
+        self.stats["identity_lookups"] += 1
+        await self.dao.transaction(Riot_identity.store, game_name, tag_id, *identity)
+        return identity
+
+    async def invalidate_identity(self, game_name, tag_id):
+        self.identities.pop(identity_key(game_name, tag_id), None)
+        await self.dao.transaction(Riot_identity.invalidate, game_name, tag_id)
+
+    async def fetch_league_entries(self, game_name, tag_id):
+        """
+        League entries of a Riot ID, resolving it only when it is not cached
+
+        Returns:
+            list: League entries, empty when unranked, or None when the player does not exist
+
+        Raises:
+            RiotRequestFailed: Riot gave no answer
+        """
+        identity = await self.resolve_identity(game_name, tag_id)
+        if identity is None:
+            return None
+        try:
+            return await self.request_json(f"{self.platform_url}/lol/league/v4/entries/by-summoner/{identity[1]}")
+        except RiotNotFound:
+            # The cached summoner ID went stale, resolve the Riot ID once more
+            logger.info(f"Summoner ID of {game_name}#{tag_id} not found, resolving it again")
+            await self.invalidate_identity(game_name, tag_id)
+
+        identity = await self.resolve_identity(game_name, tag_id, refresh=True)
+        if identity is None:
+            return None
+        try:
+            return await self.request_json(f"{self.platform_url}/lol/league/v4/entries/by-summoner/{identity[1]}")
+        except RiotNotFound:
+            return None
+
+    async def fetch_ranked_entry(self, game_name, tag_id):
+        """
+        Resolve a Riot ID to its solo queue league entry
+
+        Returns:
+            dict: League entry with tier, rank, wins and losses, or None when the player is unranked or missing
+
+        Raises:
+            RiotRequestFailed: Riot gave no answer
+        """
+        entries = await self.fetch_league_entries(game_name, tag_id)
+        if not entries:
+            return None
+        for entry in entries:
+            if entry.get("queueType") == "RANKED_SOLO_5x5":
+                return entry
+        return entries[0]
+
+    def _write_batch(self, updates, refreshed_ids):
+        game_db = Game(db_name=self.db_name)
+        try:
+            return game_db.update_players_API_info(updates, refreshed_ids)
+        finally:
+            game_db.close_db()
+
+    async def write_batch(self, updates, refreshed_ids=()):
+        if not updates and not refreshed_ids:
+            return
+        written = await run_in_db_thread(self._write_batch, updates, refreshed_ids)
+        self.stats["batches"] += 1
+        self.stats["players_updated"] += written
+
+    async def refresh_players(self, players):
+        """
+        Refresh and store the ranked data of players
+
+        Every player Riot answered for, ranked, unranked or missing, gets a new
+        riot_refreshed_at. Failed lookups are not stamped, so the scheduler
+        retries them on its next tick.
+
+        Args:
+            players: Iterable of (user_id, game_name, tag_id)
+
+        Returns:
+            Counter: requests, retries, cache_hits, identity_hits, identity_lookups, failed, batches and players_updated of this refresh
+        """
+        self.stats = collections.Counter()
+        client_stats = self.client.stats.copy()
+        started = time.perf_counter()
+        # One query loads every cached resolution, expired ones drop out here
+        self.identities = await self.dao.transaction(Riot_identity.fetch_all)
+        queue = asyncio.Queue()
+        for player in players:
+            queue.put_nowait(player)
+        pending = []
+        refreshed = []
+        write_lock = asyncio.Lock()
+
+        async def flush(force=False):
+            async with write_lock:
+                if refreshed and (force or len(refreshed) >= self.batch_size):
+                    batch, batch_ids = pending[:], refreshed[:]
+                    pending.clear()
+                    refreshed.clear()
+                    await self.write_batch(batch, batch_ids)
+
+        async def worker():
+            while True:
+                try:
+                    user_id, game_name, tag_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    entry = await self.fetch_ranked_entry(game_name, tag_id)
+                except RiotRequestFailed as ex:
+                    logger.warning(f"Riot did not answer for player {user_id}, keeping it due: {ex}")
+                    self.stats["failed"] += 1
+                    continue
+                except Exception as ex:
+                    logger.error(f"Error refreshing player {user_id}: {ex}")
+                    continue
+                if entry and entry.get("rank"):
+                    pending.append((user_id, entry["tier"], entry["rank"], entry["wins"], entry["losses"]))
+                refreshed.append(user_id)
+                await flush()
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        await flush(force=True)
+        # requests, retries and cache_hits of this refresh
+        self.stats.update(self.client.stats - client_stats)
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Riot refresh finished in {elapsed:.1f}s: {self.stats['players_updated']} players updated, "
+            f"{self.stats['requests']} requests, {self.stats['retries']} retries, {self.stats['failed']} failed lookups, {self.stats['batches']} DB batches, "
+            f"{self.stats['identity_hits']} cached and {self.stats['identity_lookups']} resolved Riot IDs"
+        )
+        return self.stats
+
+
+class RiotRefreshScheduler:
+    """
+    Decides which players to refresh and when
+
+    Players checked in for the next game come first, then the ones refreshed
+    longest ago. Fresh players are skipped. Each tick spends at most
+    background_share of the requests the rate limits allow in one tick, so
+    background refreshes are spread over the window instead of bursting every
+    few minutes, and the rest stays free for on-demand refreshes from
+    matchmaking.
+    """
+
+    def __init__(self, pipeline, tick_seconds=None, stale_minutes=None, checkin_stale_minutes=None,
+                 background_share=None):
+        """
+        Args:
+            pipeline: RiotRefreshPipeline doing the requests and writes
+            tick_seconds: Seconds between background ticks, defaults to settings.RIOT_REFRESH_TICK_SECONDS
+            stale_minutes: Age after which ranked data is refreshed, defaults to settings.RIOT_STALE_MINUTES
+            checkin_stale_minutes: Same for checked-in players, defaults to settings.RIOT_CHECKIN_STALE_MINUTES
+            background_share: Share of the tightest rate limit ticks may use, defaults to settings.RIOT_BACKGROUND_SHARE
+        """
+        self.pipeline = pipeline
+        self.tick_seconds = tick_seconds or settings.RIOT_REFRESH_TICK_SECONDS
+        self.stale_minutes = stale_minutes or settings.RIOT_STALE_MINUTES
+        self.checkin_stale_minutes = checkin_stale_minutes or settings.RIOT_CHECKIN_STALE_MINUTES
+        self.background_share = settings.RIOT_BACKGROUND_SHARE if background_share is None else background_share
+        # One refresh at a time, so a tick and an on-demand refresh never look up the same player twice
+        self._lock = asyncio.Lock()
+
+    def tick_budget(self):
+        """Requests one tick may spend: background_share of the tightest limit scaled to the tick length"""
+        return max(1, int(self.background_share * min(
+            bucket.capacity * self.tick_seconds / bucket.period for bucket in self.pipeline.client.limiter.buckets
+        )))
+
+    def is_stale(self, checked_in, age):
+        if age is None:
+            return True
+        return age >= (self.checkin_stale_minutes if checked_in else self.stale_minutes)
+
+    async def _due_players(self, user_ids=None):
+        queue = await self.pipeline.dao.transaction(Player.fetch_refresh_queue, user_ids)
+        return [player for player in queue if self.is_stale(player[3], player[4])]
+
+    async def _refresh(self, players):
+        if not players:
+            return 0
+        stats = await self.pipeline.refresh_players([(player[0], player[1], player[2]) for player in players])
+        return stats["players_updated"]
+
+    async def run_tick(self):
+        """
+        Refresh the most urgent stale players that fit in one tick's budget
+
+        Returns:
+            int: Players whose ranked data changed
+        """
+        if not self.pipeline.client.api_key:
+            return 0
+        async with self._lock:
+            due = await self._due_players()
+            budget = self.tick_budget()
+            selected = []
+            for player in due:
+                # A cached Riot ID costs one league request, a new one also the account and summoner lookups
+                cost = 1 if player[5] else 3
+                if cost > budget:
+                    break
+                budget -= cost
+                selected.append(player)
+            if due:
+                logger.info(f"Riot refresh tick: {len(selected)} of {len(due)} stale players")
+            return await self._refresh(selected)
+
+    async def refresh_now(self, user_ids, timeout=None):
+        """
+        Refresh the stale ones among some players right away, ignoring the tick budget
+
+        Args:
+            user_ids: Players about to be used, e.g. by matchmaking
+            timeout: Seconds to wait, the refresh keeps running in the background afterwards
+
+        Returns:
+            int: Players whose ranked data changed, 0 when the timeout expired
+        """
+        if not self.pipeline.client.api_key:
+            return 0
+
+        async def refresh():
+            async with self._lock:
+                return await self._refresh(await self._due_players(user_ids))
+
+        task = asyncio.ensure_future(refresh())
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"On-demand Riot refresh did not finish within {timeout}s, using stored ranks")
+            return 0
+
+
+_pipeline = None
+
+
+def get_refresh_pipeline():
+    """Pipeline shared by the refresh task, registration and one-off lookups, created on first use"""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = RiotRefreshPipeline()
+    return _pipeline
+
+
+_scheduler = None
+
+
+def get_refresh_scheduler():
+    """Scheduler shared by the refresh task and matchmaking, created on first use"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RiotRefreshScheduler(get_refresh_pipeline())
+    return _scheduler
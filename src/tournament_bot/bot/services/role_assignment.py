@@ -0,0 +1,110 @@
+from functools import lru_cache
+
+# Standard roles in League of Legends
+STANDARD_ROLES = ["top", "jungle", "mid", "bottom", "support"]
+
+# Performance used for a role the player did not list
+UNLISTED_ROLE_PERFORMANCE = -100.0
+
+
+@lru_cache(maxsize=None)
+def assignment_transitions(width, role_count=len(STANDARD_ROLES)):
+    """
+    Build the state transitions of the role assignment search for a team size
+
+    The search walks the players in team order. A state is the bitmask of roles
+    already taken; each player either takes a free role or, once there are more
+    players than roles left to fill, is forced.
+
+    Args:
+        width: Number of players in the team
+        role_count: Number of roles to fill
+
+    Returns:
+        tuple: (steps, final_masks) where steps[slot] is an ordered tuple of
+        (mask, role, new_mask) with role None for a forced player, and
+        final_masks are the complete states in ascending order
+    """
+    target = min(width, role_count)
+    reachable = [0]
+    steps = []
+
+    for slot in range(width):
+        remaining_players = width - slot - 1
+        transitions = []
+        for mask in reachable:
+            for role in range(role_count):
+                if not mask & (1 << role):
+                    transitions.append((mask, role, mask | (1 << role)))
+            if remaining_players >= target - bin(mask).count("1"):
+                transitions.append((mask, None, mask))
+        steps.append(tuple(transitions))
+        reachable = sorted({new_mask for _, _, new_mask in transitions})
+
+    final_masks = tuple(mask for mask in reachable if bin(mask).count("1") == target)
+    return tuple(steps), final_masks
+
+
+def optimal_role_assignment(performance_matrix):
+    """
+    Find the role assignment with the highest total performance
+
+    Exact dynamic program over the subsets of taken roles. Ties are broken by
+    the fixed order of assignment_transitions so VectorizedFitnessEngine can
+    reproduce the same assignment.
+
+    Args:
+        performance_matrix: One row per player with a performance value per standard role
+
+    Returns:
+        List with a role index per player, or None for a forced player
+    """
+    width = len(performance_matrix)
+    steps, final_masks = assignment_transitions(width)
+
+    best = {0: 0.0}
+    choices = []
+    for slot, transitions in enumerate(steps):
+        row = performance_matrix[slot]
+        step_best = {}
+        step_choice = {}
+        for mask, role, new_mask in transitions:
+            candidate = best[mask] + row[role] if role is not None else best[mask]
+            if new_mask not in step_best or candidate > step_best[new_mask]:
+                step_best[new_mask] = candidate
+                step_choice[new_mask] = (mask, role)
+        best = step_best
+        choices.append(step_choice)
+
+    mask = None
+    for final_mask in final_masks:
+        if mask is None or best[final_mask] > best[mask]:
+            mask = final_mask
+
+    assignment = [None] * width
+    for slot in range(width - 1, -1, -1):
+        mask, assignment[slot] = choices[slot][mask]
+    return assignment
+
+
+def assign_optimal_team_roles(team):
+    """
+    Assign roles to team members maximizing total role performance
+
+    Args:
+        team: List of player dictionaries with roleBasedPerformance data
+
+    Returns:
+        Copied players with assigned_role added, "forced" once no roles remain
+    """
+    performance_matrix = [
+        [player.get("roleBasedPerformance", {}).get(role, UNLISTED_ROLE_PERFORMANCE) for role in STANDARD_ROLES]
+        for player in team
+    ]
+
+    updated_team = []
+    for player, role in zip(team, optimal_role_assignment(performance_matrix)):
+        updated_player = player.copy()
+        updated_player["assigned_role"] = STANDARD_ROLES[role] if role is not None else "forced"
+        updated_team.append(updated_player)
+    return updated_team
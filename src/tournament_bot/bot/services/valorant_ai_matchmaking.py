@@ -1,10 +1,10 @@
 import asyncio
 import json
-import requests
 from openai import OpenAI
 
 from tournament_bot.config import settings
-from tournament_bot.models.dbc_model import Tournament_DB, Game
+from tournament_bot.models.dbc_model import Player_current
+from tournament_bot.bot.services.riot_refresh import get_refresh_scheduler
 
 
 class ValorantAIMatchmakingService:
@@ -15,7 +15,7 @@ class ValorantAIMatchmakingService:
         self.client = OpenAI(api_key=settings.OPEN_AI_KEY)
 
     async def run_matchmaking(self, players_per_game: int = 10) -> dict:
-        db = Tournament_DB()
+        db = Player_current()
 
         try:
             players = await self._get_registered_players_with_riot_data(db)
@@ -40,54 +40,26 @@ class ValorantAIMatchmakingService:
         finally:
             db.close_db()
 
-    async def _get_registered_players_with_riot_data(self, db: Tournament_DB) -> list[dict]:
+    async def _get_registered_players_with_riot_data(self, db: Player_current) -> list[dict]:
         """
         Uses the same registered-player source as run_matchmaking:
-        player table joined with latest game table row.
-        Also refreshes Riot API data using game_name + tag_id.
+        player table joined with the player_current table.
+        Stale Riot API data is refreshed first through the shared refresh scheduler.
+        Queries run on the DB thread pool, so a locked database never blocks the event loop.
         """
 
-        db.cursor.execute("""
-            SELECT 
-                p.user_id,
-                p.game_name,
-                p.tag_id,
-                g.tier,
-                g.rank,
-                g.role,
-                g.wins,
-                g.losses,
-                g.wr,
-                g.manual_tier
-            FROM player p
-            LEFT JOIN game g ON p.user_id = g.user_id
-            WHERE g.game_date IS NULL OR g.game_date = (
-                SELECT MAX(g2.game_date)
-                FROM game g2
-                WHERE g2.user_id = p.user_id
-            )
-            GROUP BY p.user_id
-        """)
-
-        records = db.cursor.fetchall()
+        records = await db.fetch_current_players_async(include_without_game=True)
+        # Stale ranks are refreshed through the shared scheduler, fresh ones are not fetched again
+        refreshed = await get_refresh_scheduler().refresh_now(
+            [record[0] for record in records], timeout=settings.RIOT_ON_DEMAND_TIMEOUT
+        )
+        if refreshed:
+            records = await db.fetch_current_players_async(include_without_game=True)
         players = []
 
         for record in records:
             user_id, game_name, tag_id, tier, rank, role_json, wins, losses, wr, manual_tier = record
 
-            riot_rank_data = await self._fetch_riot_rank_data(game_name, tag_id)
-
-            if riot_rank_data:
-                tier = riot_rank_data.get("tier", tier)
-                rank = riot_rank_data.get("rank", rank)
-                wins = riot_rank_data.get("wins", wins)
-                losses = riot_rank_data.get("losses", losses)
-
-                game_db = Game(db_name=settings.DATABASE_NAME)
-                game_db.connection = db.connection
-                game_db.cursor = db.cursor
-                game_db.update_player_API_info(user_id, tier, rank, wins, losses)
-
             roles = self._parse_roles(role_json)
 
             players.append({
@@ -106,73 +78,6 @@ class ValorantAIMatchmakingService:
         players.sort(key=self._sort_key)
         return players
 
-    async def _fetch_riot_rank_data(self, game_name: str, tag_id: str) -> dict | None:
-        """
-        Refreshes Riot data using the same Riot ID pattern already used by your project.
-
-        Note:
-        This returns League ranked data from Riot's public API flow.
-        Riot does not expose normal Valorant ranked stats through this same public endpoint.
-        """
-
-        if not settings.API_KEY:
-            return None
-
-        if not game_name or not tag_id:
-            return None
-
-        return await asyncio.to_thread(self._fetch_riot_rank_data_sync, game_name, tag_id)
-
-    def _fetch_riot_rank_data_sync(self, game_name: str, tag_id: str) -> dict | None:
-        headers = {"X-Riot-Token": settings.API_KEY}
-
-        account_url = (
-            f"https://americas.api.riotgames.com/riot/account/v1/accounts/by-riot-id/"
-            f"{game_name}/{tag_id}"
-        )
-
-        account_response = requests.get(account_url, headers=headers, timeout=10)
-
-        if account_response.status_code != 200:
-            return None
-
-        account_info = account_response.json()
-        puuid = account_info.get("puuid")
-
-        if not puuid:
-            return None
-
-        summoner_url = f"https://na1.api.riotgames.com/lol/summoner/v4/summoners/by-puuid/{puuid}"
-        summoner_response = requests.get(summoner_url, headers=headers, timeout=10)
-
-        if summoner_response.status_code != 200:
-            return None
-
-        summoner_info = summoner_response.json()
-        summoner_id = summoner_info.get("id")
-
-        if not summoner_id:
-            return None
-
-        ranked_url = f"https://na1.api.riotgames.com/lol/league/v4/entries/by-summoner/{summoner_id}"
-        ranked_response = requests.get(ranked_url, headers=headers, timeout=10)
-
-        if ranked_response.status_code != 200:
-            return None
-
-        ranked_entries = ranked_response.json()
-
-        for entry in ranked_entries:
-            if entry.get("queueType") == "RANKED_SOLO_5x5":
-                return {
-                    "tier": entry.get("tier", "default").lower(),
-                    "rank": entry.get("rank", "V"),
-                    "wins": entry.get("wins", 0),
-                    "losses": entry.get("losses", 0),
-                }
-
-        return None
-
     def _ask_chatgpt_to_balance_teams(self, players: list[dict]) -> str:
         player_lines = []
 
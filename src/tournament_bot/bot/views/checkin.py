@@ -42,6 +42,8 @@ class CheckinView(discord.ui.View):
 
         db = Tournament_DB()
         isAcountExist: bool = Player.isAcountExist(db, interaction)
+        if isAcountExist:
+            Player.check_in(db, user.id)
         db.close_db()
 
         if isAcountExist:
@@ -5,6 +5,7 @@ import traceback
 import asyncio
 import time
 from tournament_bot.models import dbc_model
+from tournament_bot.bot.services.riot_refresh import get_refresh_pipeline
 from colorama import Fore, Style, init
 
 # Initialize colorama
@@ -13,6 +14,27 @@ init(autoreset=True)
 logger = settings.logging.getLogger("discord")
 
 
+async def resolve_riot_id(game_name, tag_id):
+    """Resolve a new registration's puuid and summoner ID once, so refreshes only call the league endpoint"""
+    try:
+        if await get_refresh_pipeline().resolve_identity(game_name, tag_id) is None:
+            logger.info(f"Riot ID {Fore.RED}{game_name}#{tag_id}{Style.RESET_ALL} could not be resolved")
+    except Exception as ex:
+        logger.error(f"Resolving Riot ID {game_name}#{tag_id} has failed with error {ex}")
+
+
+# The event loop only keeps weak references to tasks, so pending resolutions are held here
+_resolve_tasks = set()
+
+
+def schedule_riot_id_resolution(game_name, tag_id):
+    """Resolve a Riot ID in the background, so a slow Riot API never holds up the registration replies"""
+    task = asyncio.create_task(resolve_riot_id(game_name, tag_id))
+    _resolve_tasks.add(task)
+    task.add_done_callback(_resolve_tasks.discard)
+    return task
+
+
 class RegisterModal(Modal, title="Registration"):
     def __init__(self, timeout: int = 550):
         super().__init__()
@@ -53,6 +75,7 @@ class RegisterModal(Modal, title="Registration"):
                                   color=discord.Color.yellow())
             embed.set_author(name=self.user)
             await interaction.response.send_message(f"{self.user}, you have completed registration", embed=embed)
+            schedule_riot_id_resolution(self.game_name.value.strip(), self.Tag_id.value.strip())
 
         except Exception as ex:
             print(f"it faild on {ex}")
@@ -182,6 +205,7 @@ class Checkin_RegisterModal(Modal, title="Registration"):
             db = dbc_model.Tournament_DB()
             dbc_model.Player.register(db, interaction=interaction, gamename=self.game_name.value.strip(),
                                       tagid=self.Tag_id.value.strip())
+            dbc_model.Player.check_in(db, interaction.user.id)
             db.close_db()
             embed = discord.Embed(title="Checkin Summary",
                                   description=f"Game Name: {self.game_name.value}\n Tag ID:{self.Tag_id.value}",
@@ -189,6 +213,7 @@ class Checkin_RegisterModal(Modal, title="Registration"):
             embed.set_author(name=self.user)
 
             await interaction.response.send_message(f"{self.user}, you have completed registration", ephemeral=True)
+            schedule_riot_id_resolution(self.game_name.value.strip(), self.Tag_id.value.strip())
 
             role_pref_view = PlayerPrefRole()
             # await interaction.response.send_message(f"{self.user}, you have completed registration", embed=embed, ephemeral=True)
@@ -4,6 +4,10 @@ from tournament_bot.config import settings
 
 logger = settings.logging.getLogger("discord")
 
+# Discord allows 25 options per select menu and 25 buttons per view,
+# enough for a whole night's bracket in one recording session
+MAX_MATCHES = 25
+
 class MatchResultView(discord.ui.View):
     """Discord UI view for recording match results"""
     def __init__(self, match_results, timeout=300):
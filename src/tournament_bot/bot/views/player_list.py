@@ -0,0 +1,124 @@
+import discord
+import json
+from tournament_bot.config import settings
+
+logger = settings.logging.getLogger("discord")
+
+# Discord allows 25 fields per embed, 15 keeps the three-column layout readable
+PLAYERS_PER_PAGE = 15
+
+# Role color mapping (using League of Legends colors)
+ROLE_COLORS = {
+    "top": "🟥",      # Red
+    "jungle": "🟩",   # Green
+    "mid": "🟨",      # Yellow
+    "bottom": "🟦",   # Blue
+    "support": "🟪",  # Purple
+    "tbd": "⬜",      # White/empty
+    "forced": "⬛"     # Black/forced
+}
+
+
+def format_player_field(record):
+    """
+    Build the embed field of one player
+
+    Args:
+        record: Tuple of (user_id, game_name, tag_id, tier, rank, role, wins, losses, wr, manual_tier[, has_game])
+
+    Returns:
+        tuple: (field name, field value)
+    """
+    user_id, game_name, tag_id, tier, rank, role_data, wins, losses, win_rate, manual_tier = record[:10]
+    # Only a missing game row means no game data, a row with empty columns is still shown
+    if len(record) > 10 and not record[10]:
+        return f"{game_name}", f"**ID:** {tag_id}\nNo game data available"
+
+    # Parse role preferences
+    role_str = "None"
+    if role_data:
+        try:
+            roles = json.loads(role_data)
+            if isinstance(roles, list):
+                colored_roles = []
+                for role in roles:
+                    role_emoji = ROLE_COLORS.get(role.lower(), "⬜")
+                    colored_roles.append(f"{role_emoji} {role.capitalize()}")
+                role_str = "  ".join(colored_roles)
+            else:
+                role_str = str(roles)
+        except Exception:
+            role_str = str(role_data)
+
+    # Format tier and rank
+    tier_str = tier.capitalize() if tier else "Unranked"
+    rank_str = rank if rank else ""
+    stats = f"**Rank:** {tier_str} {rank_str}\n"
+
+    # Add manual tier if available
+    if manual_tier is not None:
+        stats += f"**Manual Tier:** {manual_tier:.1f}/10\n"
+
+    if wins is not None and losses is not None:
+        total_games = wins + losses
+        # Calculate win rate if not already provided, players without games show 0%
+        if win_rate is None:
+            win_rate = (wins / total_games) * 100 if total_games > 0 else 0
+
+        win_rate_str = f" ({win_rate:.1f}%)" if win_rate is not None else ""
+        stats += f"**Record:** {wins}W {losses}L{win_rate_str}"
+
+    return f"{game_name}", f"**ID:** {tag_id}\n{stats}\n**Roles:** {role_str}"
+
+
+class PlayerListView(discord.ui.View):
+    """Pages through registered players, building only the embed of the page shown"""
+
+    def __init__(self, players, page_size=PLAYERS_PER_PAGE, timeout=300):
+        """
+        Args:
+            players: Player records as returned by Player_current.fetch_current_players
+            page_size: Players per embed
+            timeout: Seconds before the buttons stop responding
+        """
+        super().__init__(timeout=timeout)
+        self.players = players
+        self.page_size = page_size
+        self.page = 0
+        self.page_count = max(1, -(-len(players) // page_size))
+        self._update_buttons()
+
+    def render_page(self):
+        """Build the embed of the current page"""
+        embed = discord.Embed(
+            title="League of Legends Players",
+            color=discord.Color.blue(),
+            description=f"Total Players: {len(self.players)}"
+        )
+        start = self.page * self.page_size
+        for record in self.players[start:start + self.page_size]:
+            try:
+                name, value = format_player_field(record)
+            except Exception as ex:
+                logger.error(f"Error formatting data for player {record[0]}: {ex}")
+                name, value = f"{record[1]}", f"**ID:** {record[2]}\nError retrieving player data"
+            embed.add_field(name=name, value=value, inline=True)
+        embed.set_footer(text=f"Page {self.page + 1}/{self.page_count}")
+        return embed
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.page_count - 1
+
+    async def _show_page(self, interaction, page):
+        self.page = page
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.render_page(), view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction, button):
+        await self._show_page(interaction, max(self.page - 1, 0))
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction, button):
+        await self._show_page(interaction, min(self.page + 1, self.page_count - 1))
@@ -1,5 +1,6 @@
 import os
 import logging
+import multiprocessing
 from logging.config import dictConfig
 import pathlib
 import discord
@@ -21,6 +22,14 @@ controller_dir = Base_Dir / "controller"
 DISCORD_API_SECRET = os.getenv("DISCORD_APITOKEN")
 GUILD_ID = int(os.getenv("DISCORD_GUILD"))
 DATABASE_NAME = os.getenv("DATABASE_NAME")
+# Connections kept open per database file, and how long sqlite waits on a locked database
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+# WAL lets readers and a writer work at the same time, NORMAL sync is safe with WAL
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL").upper()
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL").upper()
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(64 * 1024 * 1024)))
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
 # FEEDBACK_CH = int(os.getenv("FEEDBACK_CH"))
 FEEDBACK_CH = os.getenv("FEEDBACK_CH")
 WEBHOOK_URL = os.getenv("WEBHOOK_URL")
@@ -30,18 +39,48 @@ TOURNAMENT_CH = os.getenv("TOURNAMENT_CH")
 PRIVATE_CH = os.getenv("PRIVATE_CH")
 API_KEY = os.getenv("API_KEY")
 API_URL = os.getenv("API_URL")
+RIOT_API_KEY = os.getenv("RIOT_API_KEY")
 STOP_API_TASK = os.getenv("STOP_API_TASK")
 START_API_TASK = os.getenv("START_API_TASK")
+# Riot refresh: parallel requests, "count:seconds" rate limits of the key and players written per DB batch
+RIOT_CONCURRENCY = int(os.getenv("RIOT_CONCURRENCY", "8"))
+RIOT_RATE_LIMITS = os.getenv("RIOT_RATE_LIMITS", "20:1,100:120")
+RIOT_BATCH_SIZE = int(os.getenv("RIOT_BATCH_SIZE", "25"))
+# Seconds a Riot API response is reused by the shared client
+RIOT_CACHE_SECONDS = float(os.getenv("RIOT_CACHE_SECONDS", "60"))
+# Days a resolved puuid/summoner ID is trusted before it is looked up again
+RIOT_ID_TTL_DAYS = int(os.getenv("RIOT_ID_TTL_DAYS", "30"))
+# Refresh scheduler: tick length, share of the tightest rate limit ticks may use (the rest is left for
+# on-demand refreshes), minutes before ranked data counts as stale (sooner for checked-in players),
+# hours a check-in keeps a player at the front and seconds /run_matchmaking waits for an on-demand refresh
+RIOT_REFRESH_TICK_SECONDS = int(os.getenv("RIOT_REFRESH_TICK_SECONDS", "60"))
+RIOT_BACKGROUND_SHARE = float(os.getenv("RIOT_BACKGROUND_SHARE", "0.5"))
+RIOT_STALE_MINUTES = int(os.getenv("RIOT_STALE_MINUTES", "360"))
+RIOT_CHECKIN_STALE_MINUTES = int(os.getenv("RIOT_CHECKIN_STALE_MINUTES", "30"))
+RIOT_CHECKIN_HOURS = int(os.getenv("RIOT_CHECKIN_HOURS", "12"))
+RIOT_ON_DEMAND_TIMEOUT = float(os.getenv("RIOT_ON_DEMAND_TIMEOUT", "20"))
 
 #for openAi matchmaking
 OPEN_AI_KEY = os.getenv("OPEN_AI_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Disk cache of third-party stat API responses (OverFast) and their freshness in seconds
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "http_cache.db")
+HTTP_CACHE_TTL = int(os.getenv("HTTP_CACHE_TTL", "300"))
 PROMPT = os.getenv("prompt")
 
+# Island-model genetic algorithm for pools larger than one lobby (0 islands = one per CPU)
+GA_ISLANDS = int(os.getenv("GA_ISLANDS", "0")) or os.cpu_count() or 1
+GA_MIGRATION_INTERVAL = int(os.getenv("GA_MIGRATION_INTERVAL", "20"))
+# Wall-clock seconds /run_matchmaking may spend building teams before returning its best teams so far (0 = no limit).
+# Only partitioning and balancing count, the Riot refresh before and the match insights after come on top
+GA_TIME_BUDGET = float(os.getenv("GA_TIME_BUDGET", "2"))
+
 # Google Sheets and API settings for export_import
 GOOGLE_SHEET_ID = os.getenv("GOOGLE_SHEET_ID", "default_sheet_id")
 CELL_RANGE = os.getenv("CELL_RANGE", "Sheet1")  # Default sheet name if not specified
 LOL_service_path = os.getenv("LOL_SERVICE_PATH", str(Base_Dir / "service_account.json"))
+# Rows written per Sheets batchUpdate request, keeps export payloads bounded
+SHEETS_BATCH_ROWS = int(os.getenv("SHEETS_BATCH_ROWS", "500"))
 
 
 LOGGING_CONFIG = {
@@ -76,7 +115,8 @@ LOGGING_CONFIG = {
             "formatter": "standard",
             "class": "logging.FileHandler",
             "filename": LOG_DIR / "info.log",
-            "mode": "w",
+            # Worker processes (e.g. matchmaking) append so they don't wipe the bot's log
+            "mode": "w" if multiprocessing.parent_process() is None else "a",
         },
     },
     "loggers": {
@@ -1,3 +1,5 @@
+import sqlite3
+from tournament_bot.config import settings
 from tournament_bot.models.dbc_model import (
     Tournament_DB,
     Player,
@@ -6,15 +8,94 @@ from tournament_bot.models.dbc_model import (
     MVP_Votes,
     Player_game_info,
     Match_Insights,
+    Player_current,
+    Riot_identity,
+    CONNECTION_PRAGMAS,
+    configure_journal_mode,
 )
 
+logger = settings.logging.getLogger("discord")
 
-def initialize_database() -> Tournament_DB:
-    db = Tournament_DB()
+# Schema changes applied after the tables exist, in version order.
+# PRAGMA user_version stores the last applied version, so every migration runs once per database.
+MIGRATIONS = (
+    (1, "index hot query paths", (
+        # Latest game row per player: WHERE user_id = ? ORDER BY game_date DESC LIMIT 1
+        "CREATE INDEX IF NOT EXISTS idx_game_user_date ON game (user_id, game_date)",
+        # Team rosters and result updates: WHERE teamId = ? AND teamUp = ?
+        "CREATE INDEX IF NOT EXISTS idx_matches_team ON Matches (teamId, teamUp)",
+        # Duplicate vote checks: WHERE match_id = ? AND voter_id = ?
+        "CREATE INDEX IF NOT EXISTS idx_mvp_votes_match_voter ON MVP_Votes (match_id, voter_id)",
+        # Case-insensitive name lookups: WHERE LOWER(game_name) = ?
+        "CREATE INDEX IF NOT EXISTS idx_player_game_name_lower ON player (lower(game_name))",
+    )),
+    (2, "materialize the newest game row per player", Player_current.SCHEMA),
+    (3, "cache Riot ID resolutions", Riot_identity.SCHEMA),
+    (4, "track check-ins and Riot refreshes for the refresh scheduler", (
+        "ALTER TABLE player ADD COLUMN checked_in_at text",
+        "ALTER TABLE player ADD COLUMN riot_refreshed_at text",
+        "CREATE INDEX IF NOT EXISTS idx_player_riot_refreshed ON player (riot_refreshed_at)",
+    )),
+)
+
+
+def get_schema_version(connection):
+    """Return the last migration version applied to the database"""
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(connection, migrations=MIGRATIONS):
+    """
+    Apply pending migrations in version order
+
+    Each migration and its version bump run in one transaction, so a failed
+    migration leaves the database at the previous version and is retried on
+    the next boot.
+
+    Args:
+        connection: sqlite3 connection to the database
+        migrations: Tuples of (version, description, statements)
+
+    Returns:
+        list: Versions applied by this call
+    """
+    current = get_schema_version(connection)
+    applied = []
+    # Finish any implicit transaction, BEGIN cannot be nested
+    connection.commit()
+
+    for version, description, statements in sorted(migrations, key=lambda migration: migration[0]):
+        if version <= current:
+            continue
+        try:
+            connection.execute("BEGIN")
+            for statement in statements:
+                connection.execute(statement)
+            # PRAGMA values cannot be bound as parameters
+            connection.execute(f"PRAGMA user_version = {int(version)}")
+            connection.commit()
+        except sqlite3.Error as ex:
+            connection.rollback()
+            logger.error(f"Migration {version} ({description}) failed: {ex}")
+            raise
+        logger.info(f"Applied migration {version}: {description}")
+        applied.append(version)
+        current = version
+
+    return applied
+
+
+def initialize_database(db_name=settings.DATABASE_NAME) -> Tournament_DB:
+    db = Tournament_DB(db_name)
+    journal_mode = configure_journal_mode(db.connection)
+    logger.info(f"Database {db_name} uses journal mode {journal_mode} with {', '.join(CONNECTION_PRAGMAS)}")
     Player.createTable(db)
     Game.createTable(db)
     Matches.createTable(db)
     MVP_Votes.createTable(db)
     Player_game_info.createTable(db)
     Match_Insights.createTable(db)
+    run_migrations(db.connection)
+    Matches.reconcile_match_counter(db)
+    logger.info(f"Database schema at version {get_schema_version(db.connection)}")
     return db
@@ -0,0 +1,190 @@
+import collections
+import json
+import re
+import sqlite3
+import threading
+import time
+import requests
+from urllib.parse import urlencode
+from tournament_bot.config import settings
+
+logger = settings.logging.getLogger("discord")
+
+# Rows not stored again for this long are dropped when the cache opens
+PRUNE_AFTER_SECONDS = 7 * 24 * 3600
+
+
+class CachedResponse:
+    """The parts of a requests.Response the stat lookups use"""
+
+    def __init__(self, status_code, content, from_cache=False):
+        self.status_code = status_code
+        self.content = content
+        self.from_cache = from_cache
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def cache_key(url, params=None):
+    """URL plus its query parameters in a stable order"""
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+def max_age(headers, default):
+    """
+    Seconds a response stays fresh according to its Cache-Control header
+
+    Returns:
+        int: None for no-store, which must not be stored, 0 for no-cache, which
+            is revalidated on every use, else max-age or the default
+    """
+    cache_control = headers.get("Cache-Control", "").lower()
+    if "no-store" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return 0
+    match = re.search(r"max-age=(\d+)", cache_control)
+    return int(match.group(1)) if match else default
+
+
+class HttpCache:
+    """
+    Disk-backed cache of GET responses for third-party APIs
+
+    A response younger than its TTL is served from disk without a request.
+    An older one is revalidated with the validators the server sent,
+    If-None-Match and If-Modified-Since, and a 304 answer reuses the stored
+    body. Without validators it is simply downloaded again. Only 200
+    responses are stored, never no-store ones, and no-cache ones are
+    revalidated on every use. The cache is a separate sqlite file, so
+    deleting it only costs requests.
+    """
+
+    def __init__(self, path=None, ttl=None, session=None):
+        """
+        Args:
+            path: sqlite file of the cache, defaults to settings.HTTP_CACHE_PATH
+            ttl: Seconds a response is fresh when the server sends no max-age, defaults to settings.HTTP_CACHE_TTL
+            session: requests.Session sending the requests, a keep-alive session by default
+        """
+        self.path = path or settings.HTTP_CACHE_PATH
+        self.ttl = settings.HTTP_CACHE_TTL if ttl is None else ttl
+        self.session = session or requests.Session()
+        self.stats = collections.Counter()
+        # Lookups run in worker threads, one connection guarded by a lock is enough for their rate
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                key text PRIMARY KEY,
+                body blob not null,
+                etag text,
+                last_modified text,
+                expires_at real not null,
+                stored_at real not null
+            )
+        """)
+        self.connection.execute("DELETE FROM http_cache WHERE stored_at < ?", (time.time() - PRUNE_AFTER_SECONDS,))
+        self.connection.commit()
+
+    def _load(self, key):
+        with self._lock:
+            return self.connection.execute(
+                "SELECT body, etag, last_modified, expires_at FROM http_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+    def _store(self, key, body, etag, last_modified, ttl):
+        now = time.time()
+        with self._lock, self.connection:
+            self.connection.execute(
+                """
+                INSERT INTO http_cache (key, body, etag, last_modified, expires_at, stored_at) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    body = excluded.body, etag = excluded.etag, last_modified = excluded.last_modified,
+                    expires_at = excluded.expires_at, stored_at = excluded.stored_at
+                """,
+                (key, body, etag, last_modified, now + ttl, now)
+            )
+
+    def _delete(self, key):
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM http_cache WHERE key = ?", (key,))
+
+    def get(self, url, params=None, ttl=None, timeout=15):
+        """
+        GET a URL through the cache
+
+        Args:
+            url: Endpoint URL
+            params: Query parameters, part of the cache key
+            ttl: Freshness in seconds when the server sends no max-age, defaults to the cache's ttl
+            timeout: Request timeout in seconds
+
+        Returns:
+            CachedResponse: Status code and body, from_cache is True when no body was downloaded
+        """
+        ttl = self.ttl if ttl is None else ttl
+        key = cache_key(url, params)
+        self.stats["requests"] += 1
+        cached = self._load(key)
+
+        if cached is not None and cached[3] > time.time():
+            self.stats["hits"] += 1
+            self.stats["bytes_saved"] += len(cached[0])
+            return CachedResponse(200, cached[0], from_cache=True)
+
+        headers = {}
+        if cached is not None:
+            if cached[1]:
+                headers["If-None-Match"] = cached[1]
+            if cached[2]:
+                headers["If-Modified-Since"] = cached[2]
+
+        response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and cached is not None:
+            self.stats["revalidated"] += 1
+            self.stats["bytes_saved"] += len(cached[0])
+            fresh_for = max_age(response.headers, ttl)
+            if fresh_for is None:
+                self._delete(key)
+            else:
+                self._store(
+                    key, cached[0], response.headers.get("ETag", cached[1]),
+                    response.headers.get("Last-Modified", cached[2]), fresh_for
+                )
+            return CachedResponse(200, cached[0], from_cache=True)
+
+        self.stats["misses"] += 1
+        if response.status_code == 200:
+            self.stats["bytes_downloaded"] += len(response.content)
+            fresh_for = max_age(response.headers, ttl)
+            if fresh_for is None:
+                # A no-store response replaces nothing and leaves nothing behind
+                self._delete(key)
+            else:
+                self._store(
+                    key, response.content, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                    fresh_for
+                )
+        return CachedResponse(response.status_code, response.content)
+
+    def hit_ratio(self):
+        """Share of requests answered without downloading a body"""
+        if not self.stats["requests"]:
+            return 0.0
+        return (self.stats["hits"] + self.stats["revalidated"]) / self.stats["requests"]
+
+    def log_stats(self, label):
+        logger.info(
+            f"{label} HTTP cache: {self.hit_ratio():.0%} hit ratio over {self.stats['requests']} requests "
+            f"({self.stats['hits']} fresh, {self.stats['revalidated']} revalidated, {self.stats['misses']} downloaded), "
+            f"{self.stats['bytes_saved']} bytes saved"
+        )
+
+    def close(self):
+        self.session.close()
+        self.connection.close()
@@ -0,0 +1,73 @@
+import threading
+from tournament_bot.config import settings
+from tournament_bot.integrations.http_cache import HttpCache
+
+logger = settings.logging.getLogger("discord")
+
+OVERFAST_URL = "https://overfast-api.tekrop.fr"
+
+_cache = None
+_hero_roles = None
+_lock = threading.Lock()
+
+
+def get_overfast_cache():
+    """HTTP cache shared by every OverFast lookup, created on first use"""
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = HttpCache()
+        return _cache
+
+
+def fetch_hero_roles():
+    """
+    Hero key to role mapping, fetched once per process
+
+    The hero list only changes with game patches, so it is kept in memory
+    after the first success. Failures are not remembered.
+
+    Returns:
+        dict: Hero key to "tank", "damage" or "support"
+
+    Raises:
+        ValueError: OverFast did not return the hero list
+    """
+    global _hero_roles
+    if _hero_roles is not None:
+        return _hero_roles
+
+    response = get_overfast_cache().get(f"{OVERFAST_URL}/heroes", timeout=15)
+    if response.status_code != 200:
+        raise ValueError("Could not fetch Overwatch hero role data.")
+
+    roles = {hero["key"]: hero["role"] for hero in response.json()}
+    with _lock:
+        _hero_roles = roles
+    return roles
+
+
+def fetch_player_stats(battletag, gamemode, timeout=20):
+    """
+    Summary and per-platform hero stats of a player
+
+    Args:
+        battletag: Name#1234
+        gamemode: "competitive" or "quickplay"
+        timeout: Request timeout in seconds
+
+    Returns:
+        tuple: (summary response, pc stats response, console stats response),
+            the stats are None when the profile is missing or private
+    """
+    cache = get_overfast_cache()
+    formatted_tag = battletag.replace("#", "-")
+    summary = cache.get(f"{OVERFAST_URL}/players/{formatted_tag}/summary", timeout=timeout)
+    # Private or missing profiles have no stats worth requesting
+    if summary.status_code != 200 or summary.json().get("privacy") == "private":
+        return summary, None, None
+
+    stats_url = f"{OVERFAST_URL}/players/{formatted_tag}/stats"
+    pc = cache.get(stats_url, params={"platform": "pc", "gamemode": gamemode}, timeout=timeout)
+    console = cache.get(stats_url, params={"platform": "console", "gamemode": gamemode}, timeout=timeout)
+    return summary, pc, console
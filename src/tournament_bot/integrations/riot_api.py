@@ -1,9 +1,10 @@
-import aiohttp
 import asyncio
 import json
 import logging
 import os
 from tournament_bot.config import settings
+from tournament_bot.integrations.riot_client import RiotNotFound, get_riot_client
+from tournament_bot.models.dbc_model import AsyncDAO, Riot_identity
 
 logger = settings.logging.getLogger("discord")
 
@@ -11,12 +12,11 @@ class RiotAPI:
     """
     A class for interacting with the Riot Games API for League of Legends
     """
-    def __init__(self):
-        self.api_key = os.environ.get('RIOT_API_KEY', '')
+    def __init__(self, client=None):
+        # Requests share the bot's pooled client, its rate limits and response cache
+        self.client = client or get_riot_client()
         self.base_url = os.environ.get('API_URL', 'https://na1.api.riotgames.com/lol')
-        self.headers = {
-            "X-Riot-Token": self.api_key
-        }
+        self.dao = AsyncDAO()
 
     async def fetch_summoner_by_name(self, summoner_name):
         """Fetch a summoner's account information by their summoner name"""
@@ -27,62 +27,97 @@ class RiotAPI:
         logger.info(f"Fetching summoner by name: {summoner_name}")
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self.headers) as response:
-                    if response.status == 200:
-                        logger.info(f"Successfully fetched summoner: {summoner_name}")
-                        return await response.json()
-                    elif response.status == 404:
-                        logger.info(f"Summoner {summoner_name} not found")
-                        return None
-                    else:
-                        logger.error(f"Error fetching summoner {summoner_name}: {response.status}")
-                        return None
+            data = await self.client.request_json(url)
+        except RiotNotFound:
+            logger.info(f"Summoner {summoner_name} not found")
+            return None
         except Exception as e:
             logger.error(f"Exception fetching summoner {summoner_name}: {e}")
             return None
+        if data is None:
+            logger.error(f"Error fetching summoner {summoner_name}")
+            return None
+        logger.info(f"Successfully fetched summoner: {summoner_name}")
+        return data
 
-    async def fetch_ranked_stats(self, summoner_id):
-        """Fetch a summoner's ranked stats by their summoner ID"""
+    async def fetch_league_entries(self, summoner_id):
+        """
+        Fetch every league entry of a summoner ID
+
+        Returns:
+            list: League entries, empty on an error, or None when the summoner ID does not exist
+        """
         url = f"{self.base_url}/league/v4/entries/by-summoner/{summoner_id}"
         
         logger.info(f"Fetching ranked stats for summoner ID: {summoner_id}")
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self.headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.info(f"Successfully fetched ranked stats for summoner ID: {summoner_id}")
-                        # Find solo queue stats
-                        for queue in data:
-                            if queue.get('queueType') == 'RANKED_SOLO_5x5':
-                                return queue
-                        return None
-                    elif response.status == 404:
-                        logger.info(f"No ranked stats found for summoner {summoner_id}")
-                        return None
-                    else:
-                        logger.error(f"Error fetching ranked stats: {response.status}")
-                        return None
+            data = await self.client.request_json(url)
+        except RiotNotFound:
+            logger.info(f"No ranked stats found for summoner {summoner_id}")
+            return None
         except Exception as e:
             logger.error(f"Exception fetching ranked stats: {e}")
-            return None
+            return []
+        if data is None:
+            logger.error(f"Error fetching ranked stats for summoner ID: {summoner_id}")
+            return []
+        logger.info(f"Successfully fetched ranked stats for summoner ID: {summoner_id}")
+        return data
 
-    async def get_player_info(self, summoner_name):
+    async def fetch_ranked_stats(self, summoner_id):
+        """Fetch a summoner's ranked stats by their summoner ID"""
+        # Find solo queue stats
+        for queue in await self.fetch_league_entries(summoner_id) or []:
+            if queue.get('queueType') == 'RANKED_SOLO_5x5':
+                return queue
+        return None
+
+    async def get_player_info(self, summoner_name, tag_id=None):
         """
         Get a player's information from the Riot API, including their rank
         Returns a dictionary with player's information or None if not found
+
+        With a tag_id the summoner ID cached in riot_identity is used, so a known
+        player only costs the ranked request. Profile fields are None in that case.
         """
         logger.info(f"Getting player info for: {summoner_name}")
 
-        # First get summoner data
-        summoner_data = await self.fetch_summoner_by_name(summoner_name)
+        summoner_data = None
+        ranked_entries = None
+        if tag_id:
+            identity = await self.dao.transaction(Riot_identity.fetch, summoner_name, tag_id)
+            if identity:
+                ranked_entries = await self.fetch_league_entries(identity[1])
+                if ranked_entries is None:
+                    # Stale summoner ID, forget it and look the summoner up again
+                    await self.dao.transaction(Riot_identity.invalidate, summoner_name, tag_id)
+                else:
+                    summoner_data = {
+                        'name': summoner_name,
+                        'summonerLevel': None,
+                        'profileIconId': None,
+                        'puuid': identity[0],
+                        'accountId': None,
+                        'id': identity[1],
+                    }
+
         if not summoner_data:
-            return None
-        
-        # Then get their ranked stats
-        ranked_data = await self.fetch_ranked_stats(summoner_data['id'])
+            # First get summoner data
+            summoner_data = await self.fetch_summoner_by_name(summoner_name)
+            if not summoner_data:
+                return None
+            if tag_id:
+                await self.dao.transaction(Riot_identity.store, summoner_name, tag_id, summoner_data['puuid'], summoner_data['id'])
+
+            # Then get their ranked stats
+            ranked_entries = await self.fetch_league_entries(summoner_data['id'])
+
+        ranked_data = None
+        for queue in ranked_entries or []:
+            if queue.get('queueType') == 'RANKED_SOLO_5x5':
+                ranked_data = queue
+                break
         
         # Build player info dictionary
         player_info = {
@@ -124,14 +159,14 @@ class RiotAPI:
         logger.info(f"Fetching champion masteries for summoner ID: {summoner_id}")
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self.headers) as response:
-                    if response.status == 200:
-                        logger.info(f"Successfully fetched champion masteries for summoner ID: {summoner_id}")
-                        return await response.json()
-                    else:
-                        logger.error(f"Error fetching champion masteries: {response.status}")
-                        return []
+            data = await self.client.request_json(url)
+        except RiotNotFound:
+            data = None
         except Exception as e:
             logger.error(f"Exception fetching champion masteries: {e}")
-            return []
\ No newline at end of file
+            return []
+        if data is None:
+            logger.error(f"Error fetching champion masteries for summoner ID: {summoner_id}")
+            return []
+        logger.info(f"Successfully fetched champion masteries for summoner ID: {summoner_id}")
+        return data
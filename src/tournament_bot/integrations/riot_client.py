@@ -0,0 +1,219 @@
+import asyncio
+import collections
+import random
+import time
+import aiohttp
+from tournament_bot.config import settings
+
+logger = settings.logging.getLogger("discord")
+
+ACCOUNT_URL = "https://americas.api.riotgames.com"
+PLATFORM_URL = "https://na1.api.riotgames.com"
+
+
+class RiotNotFound(Exception):
+    """Riot answered 404 for a Riot ID, puuid or summoner ID"""
+
+
+class RiotRequestFailed(Exception):
+    """Riot gave no usable answer: a server error, exhausted retries, a timeout or a connection error"""
+
+
+def parse_rate_limits(value):
+    """Parse "20:1,100:120" into ((20, 1.0), (100, 120.0)), the format of Riot's X-App-Rate-Limit header"""
+    limits = []
+    for part in value.split(","):
+        count, seconds = part.strip().split(":")
+        limits.append((int(count), float(seconds)))
+    return tuple(limits)
+
+
+class TokenBucket:
+    """
+    Allows at most capacity requests in any window of period seconds
+
+    Each request spends a token that comes back period seconds later. Unlike
+    a bucket that refills continuously, this never lets a burst plus refill
+    exceed the limit inside one window, which is how Riot counts requests.
+    """
+
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.period = period
+        self.spent = collections.deque()
+
+    def wait_time(self, now):
+        """Seconds until a token is available"""
+        while self.spent and self.spent[0] <= now - self.period:
+            self.spent.popleft()
+        if len(self.spent) < self.capacity:
+            return 0.0
+        return self.spent[0] + self.period - now
+
+    def take(self, now):
+        self.spent.append(now)
+
+
+class RateLimiter:
+    """Waits until every bucket has a token and no Retry-After pause is active"""
+
+    def __init__(self, limits):
+        self.buckets = [TokenBucket(capacity, period) for capacity, period in limits]
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # One waiter at a time keeps the order fair and the buckets consistent
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                wait = max([self.paused_until - now] + [bucket.wait_time(now) for bucket in self.buckets])
+                if wait <= 0:
+                    for bucket in self.buckets:
+                        bucket.take(now)
+                    return
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every request for seconds, used when Riot answers 429"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class RiotClient:
+    """
+    Long-lived client for every Riot API call of the bot
+
+    One aiohttp session with a keep-alive connector and a DNS cache means
+    lookups reuse open TLS connections. Requests share one rate limiter,
+    429 and 5xx answers are retried with jittered backoff, and successful
+    responses are cached for a short time. Identical requests in flight at
+    the same time are sent once.
+    """
+
+    def __init__(self, api_key=None, rate_limits=None, max_retries=3, cache_seconds=None, connections=None):
+        """
+        Args:
+            api_key: Riot API key, defaults to settings.API_KEY or settings.RIOT_API_KEY
+            rate_limits: ((count, seconds), ...), defaults to settings.RIOT_RATE_LIMITS
+            max_retries: Attempts per request after a 429, a 5xx or a connection error
+            cache_seconds: How long a response is reused, defaults to settings.RIOT_CACHE_SECONDS
+            connections: Open connections kept, defaults to settings.RIOT_CONCURRENCY
+        """
+        self.api_key = api_key if api_key is not None else (settings.API_KEY or settings.RIOT_API_KEY)
+        self.limiter = RateLimiter(rate_limits or parse_rate_limits(settings.RIOT_RATE_LIMITS))
+        self.max_retries = max_retries
+        self.cache_seconds = settings.RIOT_CACHE_SECONDS if cache_seconds is None else cache_seconds
+        self.connections = connections or settings.RIOT_CONCURRENCY
+        self.session = None
+        self._session_loop = None
+        self.stats = collections.Counter()
+        self._cache = {}
+        self._in_flight = {}
+
+    async def get_session(self):
+        loop = asyncio.get_running_loop()
+        if self.session is not None and self._session_loop is not loop:
+            # A session cannot outlive its event loop, e.g. across test cases
+            self.session = None
+            self._in_flight.clear()
+        if self.session is None or self.session.closed:
+            self._session_loop = loop
+            connector = aiohttp.TCPConnector(limit=self.connections, ttl_dns_cache=300, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"X-Riot-Token": self.api_key or ""},
+                timeout=aiohttp.ClientTimeout(total=10, connect=5)
+            )
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+        self._cache.clear()
+
+    def backoff(self, attempt):
+        """Exponential backoff with jitter, so retrying workers do not hit Riot in lockstep"""
+        return random.uniform(0.5, 1.0) * 2 ** attempt
+
+    async def request_json(self, url, cache=True):
+        """
+        GET a Riot endpoint within the rate limits
+
+        Args:
+            url: Full endpoint URL
+            cache: Reuse a response younger than cache_seconds
+
+        Returns:
+            The decoded JSON body, or None on an error
+
+        Raises:
+            RiotNotFound: Riot answered 404
+        """
+        if cache and self.cache_seconds > 0:
+            cached = self._cache.get(url)
+            if cached is not None and cached[0] > time.monotonic():
+                self.stats["cache_hits"] += 1
+                return cached[1]
+            pending = self._in_flight.get(url)
+            if pending is not None:
+                self.stats["cache_hits"] += 1
+                return await asyncio.shield(pending)
+
+        future = asyncio.ensure_future(self._request_json(url))
+        if cache and self.cache_seconds > 0:
+            self._in_flight[url] = future
+        try:
+            body = await future
+        finally:
+            if self._in_flight.get(url) is future:
+                del self._in_flight[url]
+        if body is not None and self.cache_seconds > 0:
+            self._cache[url] = (time.monotonic() + self.cache_seconds, body)
+        return body
+
+    async def _request_json(self, url):
+        session = await self.get_session()
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            self.stats["requests"] += 1
+            try:
+                async with session.get(url) as response:
+                    if response.status == 200:
+                        return await response.json()
+                    if response.status == 404:
+                        raise RiotNotFound(url)
+                    if response.status == 429 or response.status >= 500:
+                        retry_after = response.headers.get("Retry-After")
+                        delay = float(retry_after) if retry_after else self.backoff(attempt)
+                        logger.warning(f"Riot API returned {response.status}, retrying in {delay:.1f}s: {url}")
+                        self.stats["retries"] += 1
+                        self.limiter.pause(delay)
+                        continue
+                    logger.error(f"Riot API returned {response.status} for {url}")
+                    return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+                logger.error(f"Riot API request failed: {ex}")
+                self.stats["retries"] += 1
+                self.limiter.pause(self.backoff(attempt))
+        logger.error(f"Giving up on {url} after {self.max_retries} retries")
+        return None
+
+
+_client = None
+
+
+def get_riot_client():
+    """Client shared by the whole bot, created on first use"""
+    global _client
+    if _client is None:
+        _client = RiotClient()
+    return _client
+
+
+async def close_riot_client():
+    """Close the shared client's connections, called on shutdown"""
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.close()
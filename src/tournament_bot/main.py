@@ -6,6 +6,8 @@ from tournament_bot.bot.bot import create_bot
 from tournament_bot.core.startup import initialize_database
 from tournament_bot.bot.events import register_events
 from tournament_bot.core.database import tournament_dbc
+from tournament_bot.models.dbc_model import close_connection_pools, shutdown_db_executor
+from tournament_bot.integrations.riot_client import close_riot_client
 import warnings
 warnings.filterwarnings("ignore", message="'audioop' is deprecated")
 
@@ -27,6 +29,9 @@ async def main():
         await sys_client.start(settings.DISCORD_API_SECRET, reconnect=True)
     finally:
         await sys_client.close()
+        await close_riot_client()
+        shutdown_db_executor()
+        close_connection_pools()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -1,31 +1,367 @@
 # import peewee
 # from tournament_bot.core.database import tournament_dbc
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from tournament_bot.config import settings
+import asyncio
+import functools
+import queue
 import sqlite3
+import threading
+import time
 import json
 
 logger = settings.logging.getLogger("discord")
 
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+def _checked_setting(name, value, allowed, default):
+    # PRAGMA values cannot be bound as parameters, so only known keywords are used
+    if value in allowed:
+        return value
+    logger.warning(f"Unsupported {name} {value!r}, using {default}")
+    return default
+
+
+DB_JOURNAL_MODE = _checked_setting("DB_JOURNAL_MODE", settings.DB_JOURNAL_MODE, JOURNAL_MODES, "WAL")
+
+# Applied once to every new connection
+CONNECTION_PRAGMAS = (
+    f"PRAGMA busy_timeout = {int(settings.DB_BUSY_TIMEOUT_MS)}",
+    f"PRAGMA synchronous = {_checked_setting('DB_SYNCHRONOUS', settings.DB_SYNCHRONOUS, SYNCHRONOUS_LEVELS, 'NORMAL')}",
+    # Negative cache_size is in KiB instead of pages
+    f"PRAGMA cache_size = {-int(settings.DB_CACHE_SIZE_KB)}",
+    f"PRAGMA mmap_size = {int(settings.DB_MMAP_SIZE)}",
+)
+
+
+def apply_connection_pragmas(connection):
+    """Apply the configured per-connection PRAGMAs and return the connection"""
+    for pragma in CONNECTION_PRAGMAS:
+        connection.execute(pragma)
+    return connection
+
+
+def configure_journal_mode(connection, journal_mode=DB_JOURNAL_MODE):
+    """
+    Switch the database file to a journal mode
+
+    The journal mode is stored in the file, so setting it once at startup
+    covers every later connection, including the web server's.
+
+    Args:
+        connection: Open sqlite3 connection to the database
+        journal_mode: One of JOURNAL_MODES
+
+    Returns:
+        str: The journal mode sqlite reports after the change
+    """
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"Unsupported journal mode: {journal_mode}")
+    active = connection.execute(f"PRAGMA journal_mode = {journal_mode}").fetchone()[0].upper()
+    if active != journal_mode:
+        # In-memory databases always report MEMORY
+        logger.warning(f"Requested journal mode {journal_mode}, database uses {active}")
+    return active
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of sqlite3 connections to one database file
+
+    At most max_size connections are kept. When all of them are borrowed an
+    overflow connection is opened and closed again on release instead of
+    waiting, because the borrowers usually run on the same event loop as the
+    caller and could never give their connection back.
+    """
+
+    def __init__(self, db_name, max_size=5):
+        self.db_name = db_name
+        self.max_size = max_size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._pooled = set()
+
+    def _connect(self):
+        # Connections move between threads when work is offloaded from the event loop
+        return apply_connection_pragmas(sqlite3.connect(self.db_name, check_same_thread=False))
+
+    @staticmethod
+    def _is_healthy(connection):
+        try:
+            connection.execute("select 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self):
+        """Borrow a connection, reusing an idle one when it still works"""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if self._is_healthy(connection):
+                return connection
+            logger.warning(f"Discarding broken pooled connection to {self.db_name}")
+            with self._lock:
+                self._pooled.discard(connection)
+
+        connection = self._connect()
+        with self._lock:
+            if len(self._pooled) < self.max_size:
+                self._pooled.add(connection)
+            else:
+                logger.warning(f"Connection pool for {self.db_name} exhausted ({self.max_size}), opening an overflow connection")
+        return connection
+
+    def release(self, connection, commit=True):
+        """
+        Return a borrowed connection
+
+        Args:
+            connection: Connection from acquire
+            commit: Commit pending changes, otherwise they are rolled back
+        """
+        try:
+            if commit:
+                connection.commit()
+            else:
+                connection.rollback()
+        except sqlite3.Error as ex:
+            logger.error(f"Error resetting pooled connection: {ex}")
+            with self._lock:
+                self._pooled.discard(connection)
+            connection.close()
+            return
+
+        with self._lock:
+            pooled = connection in self._pooled
+        if pooled:
+            self._idle.put(connection)
+        else:
+            connection.close()
+
+    @contextmanager
+    def connection(self, commit=True):
+        """Borrow a connection for the duration of a with block"""
+        connection = self.acquire()
+        try:
+            yield connection
+        except Exception:
+            self.release(connection, commit=False)
+            raise
+        self.release(connection, commit=commit)
+
+    def close_all(self):
+        """Close every idle connection, borrowed ones are closed when released"""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._pooled.discard(connection)
+            connection.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def is_memory_database(db_name):
+    """In-memory databases live and die with their connection, so they are never pooled"""
+    return db_name in (":memory:", "") or str(db_name).startswith("file::memory:")
+
+
+def get_connection_pool(db_name=settings.DATABASE_NAME):
+    """Return the shared pool for a database file, creating it on first use"""
+    with _pools_lock:
+        pool = _pools.get(db_name)
+        if pool is None:
+            pool = _pools[db_name] = ConnectionPool(db_name, max_size=settings.DB_POOL_SIZE)
+        return pool
+
+
+def close_connection_pools():
+    """Close the idle connections of every pool, called on shutdown"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
+
+
+_db_executor = None
+_db_executor_lock = threading.Lock()
+
+
+def get_db_executor():
+    """Thread pool that runs blocking sqlite calls off the event loop, one worker per pooled connection"""
+    global _db_executor
+    with _db_executor_lock:
+        if _db_executor is None:
+            _db_executor = ThreadPoolExecutor(max_workers=settings.DB_POOL_SIZE, thread_name_prefix="tournament-db")
+        return _db_executor
+
+
+def shutdown_db_executor():
+    """Wait for running queries and stop the DB threads, called on shutdown"""
+    global _db_executor
+    with _db_executor_lock:
+        executor, _db_executor = _db_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+async def run_in_db_thread(function, *args, **kwargs):
+    """
+    Run a blocking database function on the DB thread pool
+
+    Args:
+        function: Callable doing sqlite work
+        *args, **kwargs: Passed to the function
+
+    Returns:
+        The function's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(function, *args, **kwargs))
+
+
+class AsyncDAO:
+    """
+    Awaitable queries for coroutines
+
+    Every call borrows a pooled connection on a DB thread, so a slow query or a
+    wait on a locked database never blocks the event loop. Each call is its
+    own transaction: it commits on success and rolls back on error.
+    """
+
+    def __init__(self, db_name=settings.DATABASE_NAME):
+        self.db_name = db_name
+        # In-memory databases cannot be pooled, they share one connection instead
+        self._memory_connection = None
+        self._memory_lock = threading.Lock()
+
+    @contextmanager
+    def _connection(self):
+        if not is_memory_database(self.db_name):
+            with get_connection_pool(self.db_name).connection() as connection:
+                yield connection
+            return
+
+        with self._memory_lock:
+            if self._memory_connection is None:
+                self._memory_connection = apply_connection_pragmas(sqlite3.connect(self.db_name, check_same_thread=False))
+            connection = self._memory_connection
+            try:
+                yield connection
+            except Exception:
+                connection.rollback()
+                raise
+            connection.commit()
+
+    def _run(self, function, *args, **kwargs):
+        with self._connection() as connection:
+            return function(connection, *args, **kwargs)
+
+    async def transaction(self, function, *args, **kwargs):
+        """
+        Run several statements as one unit of work
+
+        Args:
+            function: Callable taking the connection as its first argument
+            *args, **kwargs: Passed to the function
+
+        Returns:
+            The function's return value
+        """
+        return await run_in_db_thread(self._run, function, *args, **kwargs)
+
+    async def fetch_one(self, query, params=()):
+        """Return the first row of a query, or None"""
+        return await self.transaction(lambda connection: connection.execute(query, params).fetchone())
+
+    async def fetch_all(self, query, params=()):
+        """Return every row of a query as a list of tuples"""
+        return await self.transaction(lambda connection: connection.execute(query, params).fetchall())
+
+    async def execute(self, query, params=()):
+        """Run one statement and return the number of rows it changed"""
+        return await self.transaction(lambda connection: connection.execute(query, params).rowcount)
+
+    async def execute_many(self, query, seq_of_params):
+        """Run one statement for every parameter tuple in a single transaction and return the rows changed"""
+        return await self.transaction(lambda connection: connection.executemany(query, seq_of_params).rowcount)
+
+    def close(self):
+        if self._memory_connection is not None:
+            self._memory_connection.close()
+            self._memory_connection = None
+
+
 class Tournament_DB:
     def __init__(self, db_name=settings.DATABASE_NAME):
+        # The *_async methods of one instance share its connection and cursor, so they take turns
+        self._lock = threading.Lock()
         self.db_name = db_name
         self.connection = None
         self.cursor = None
+        self._pool = None
         self.db_connect()
 
     #connection to DB
     #The default out put of sqlit3 is a list of tubles
     #Inorder to get list of dictionary data format, we use row_factory
     def db_connect(self):
-        self.connection = sqlite3.connect(self.db_name)
+        if is_memory_database(self.db_name):
+            self.connection = apply_connection_pragmas(sqlite3.connect(self.db_name, check_same_thread=False))
+        else:
+            self._pool = get_connection_pool(self.db_name)
+            self.connection = self._pool.acquire()
         # self.connection.row_factory = sqlite3.Row
         self.cursor = self.connection.cursor()
 
     def close_db(self):
         if self.connection:
-            self.connection.commit()
-            self.connection.close()
+            if self._pool is not None:
+                self.cursor.close()
+                self._pool.release(self.connection)
+            else:
+                self.connection.commit()
+                self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None and self.connection and self._pool is not None:
+            # Do not commit a half-finished unit of work back into the pool
+            self.cursor.close()
+            self._pool.release(self.connection, commit=False)
+            self.connection = None
+        self.close_db()
+
+    def __del__(self):
+        # Instances that are never closed still hand their connection back to the pool
+        try:
+            if self.connection and self._pool is not None:
+                self._pool.release(self.connection, commit=False)
+                self.connection = None
+        except Exception:
+            pass
+
+    async def _run_locked(self, function, *args, **kwargs):
+        """Run a blocking call that uses this instance's connection on the DB thread pool, one call at a time"""
+        def locked():
+            with self._lock:
+                return function(*args, **kwargs)
+
+        return await run_in_db_thread(locked)
     
     def calculate_manual_tier(self, tier, rank):
         """Calculate a manual tier value (0-10) based on tier and rank"""
@@ -167,6 +503,47 @@ class Player(Tournament_DB):
         except Exception as ex:
             logger.error(f"is account exsit  failed with error {ex}")
 
+    def check_in(self, member_id):
+        """Record that a player checked in, which moves them to the front of the Riot refresh queue"""
+        try:
+            self.cursor.execute("UPDATE player SET checked_in_at = datetime('now') WHERE user_id = ?", (member_id,))
+            self.connection.commit()
+        except Exception as ex:
+            logger.error(f"check_in has failed with error {ex}")
+
+    @staticmethod
+    def fetch_refresh_queue(connection, user_ids=None, checkin_hours=settings.RIOT_CHECKIN_HOURS):
+        """
+        Players in Riot refresh order: checked in first, then least recently refreshed
+
+        Args:
+            connection: sqlite3 connection
+            user_ids: Only these players, all players when None
+            checkin_hours: How long a check-in keeps a player at the front
+
+        Returns:
+            list: Tuples of (user_id, game_name, tag_id, checked_in, minutes since refresh or None, identity cached)
+        """
+        query = """
+            SELECT p.user_id, p.game_name, p.tag_id,
+                   coalesce(p.checked_in_at >= datetime('now', ?), 0) AS checked_in,
+                   (julianday('now') - julianday(p.riot_refreshed_at)) * 1440 AS age,
+                   r.puuid IS NOT NULL
+            FROM player p
+            LEFT JOIN riot_identity r ON r.game_name = p.game_name AND r.tag_id = p.tag_id
+        """
+        params = [f"-{int(checkin_hours)} hours"]
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            query += f" WHERE p.user_id IN ({', '.join('?' * len(user_ids))})" if user_ids else " WHERE 0"
+            params += user_ids
+        query += " ORDER BY checked_in DESC, p.riot_refreshed_at IS NOT NULL, p.riot_refreshed_at"
+        return connection.execute(query, params).fetchall()
+
+    async def fetch_refresh_queue_async(self, user_ids=None, checkin_hours=settings.RIOT_CHECKIN_HOURS):
+        """fetch_refresh_queue on this instance's connection, run on the DB thread pool"""
+        return await self._run_locked(Player.fetch_refresh_queue, self.connection, user_ids, checkin_hours)
+
     def isMemberExist(self, member_id):
         query = "select * from player where user_id = ?"
         try:
@@ -361,42 +738,70 @@ class Game(Tournament_DB):
         except Exception as ex:
             logger.error(f"update_role has failed with error {ex}")
 
-    def update_player_API_info(self, player_id, tier, rank, wins, losses):
+    def _write_player_API_info(self, player_id, tier, rank, wins, losses):
+        """Update the newest game row of a player, or insert one, without committing"""
         # Calculate manual tier value automatically based on tier and rank
         manual_tier = self.calculate_manual_tier(tier, rank)
-        
+
+        # First, fetch the player's game_name from the player table
+        self.cursor.execute("SELECT game_name FROM player WHERE user_id = ?", (player_id,))
+        player_data = self.cursor.fetchone()
+
+        if not (player_data and player_data[0]):
+            logger.error(f"update_player_API_info could not find game_name for user_id {player_id}")
+            return False
+        game_name = player_data[0]
+
+        # Try to update existing entry first
+        update_query = """
+            UPDATE game 
+            SET tier = ?, rank = ?, wins = ?, losses = ?, manual_tier = ?
+            WHERE user_id = ? AND game_date = (
+                SELECT MAX(game_date) FROM game WHERE user_id = ?
+            )
+        """
+        self.cursor.execute(update_query, (tier, rank, wins, losses, manual_tier, player_id, player_id))
+
+        # If no rows were updated, insert a new record
+        if self.cursor.rowcount == 0:
+            register_query = """
+                INSERT INTO Game(user_id, game_name, tier, rank, wins, losses, manual_tier) 
+                VALUES(?, ?, ?, ?, ?, ?, ?)
+            """
+            self.cursor.execute(register_query, (player_id, game_name, tier, rank, wins, losses, manual_tier))
+        return True
+
+    def update_player_API_info(self, player_id, tier, rank, wins, losses):
         try:
-            # First, fetch the player's game_name from the player table
-            self.cursor.execute("SELECT game_name FROM player WHERE user_id = ?", (player_id,))
-            player_data = self.cursor.fetchone()
-            
-            if player_data and player_data[0]:
-                game_name = player_data[0]
-                
-                # Try to update existing entry first
-                update_query = """
-                    UPDATE game 
-                    SET tier = ?, rank = ?, wins = ?, losses = ?, manual_tier = ?
-                    WHERE user_id = ? AND game_date = (
-                        SELECT MAX(game_date) FROM game WHERE user_id = ?
-                    )
-                """
-                self.cursor.execute(update_query, (tier, rank, wins, losses, manual_tier, player_id, player_id))
-                
-                # If no rows were updated, insert a new record
-                if self.cursor.rowcount == 0:
-                    register_query = """
-                        INSERT INTO Game(user_id, game_name, tier, rank, wins, losses, manual_tier) 
-                        VALUES(?, ?, ?, ?, ?, ?, ?)
-                    """
-                    self.cursor.execute(register_query, (player_id, game_name, tier, rank, wins, losses, manual_tier))
-                
-                self.connection.commit()
-            else:
-                logger.error(f"update_player_API_info could not find game_name for user_id {player_id}")
-            
+            self._write_player_API_info(player_id, tier, rank, wins, losses)
+            self.connection.commit()
         except Exception as ex:
             logger.error(f"update_player_API_info has failed with error {ex}")
+
+    def update_players_API_info(self, updates, refreshed_ids=()):
+        """
+        Write ranked data of many players in one transaction
+
+        Args:
+            updates: Iterable of (player_id, tier, rank, wins, losses)
+            refreshed_ids: Players looked up on Riot, ranked or not, stamped with riot_refreshed_at
+
+        Returns:
+            int: Number of players written
+        """
+        written = 0
+        try:
+            with self.connection:
+                for update in updates:
+                    written += self._write_player_API_info(*update)
+                self.cursor.executemany(
+                    "UPDATE player SET riot_refreshed_at = datetime('now') WHERE user_id = ?",
+                    [(player_id,) for player_id in refreshed_ids]
+                )
+            return written
+        except Exception as ex:
+            logger.error(f"update_players_API_info has failed with error {ex}")
+            return 0
     
     # This function is now defined in the Tournament_DB class
     
@@ -496,7 +901,197 @@ class Game(Tournament_DB):
             return self.cursor.fetchall()
         except Exception as ex:
             logger.error(f"fetchGameDetails has failed with error {ex}")
-    
+
+
+def _refresh_player_current(user_id):
+    # Replace one player's row with their newest game row, the later insert wins ties on game_date
+    return f"""
+        DELETE FROM player_current WHERE user_id = {user_id};
+        INSERT INTO player_current (user_id, game_name, tier, rank, role, wins, losses, manual_tier, wr, game_date)
+        SELECT user_id, game_name, tier, rank, role, wins, losses, manual_tier, wr, game_date
+        FROM game WHERE user_id = {user_id}
+        ORDER BY game_date DESC, rowid DESC LIMIT 1;
+    """
+
+
+class Player_current(Tournament_DB):
+    """
+    Newest game row of every player, maintained by triggers on game
+
+    Reading this table replaces MAX(game_date) subqueries and per-player
+    lookups with one scan joined on the player primary key.
+    """
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS player_current (
+            user_id bigint PRIMARY KEY,
+            game_name text,
+            tier text,
+            rank text,
+            role text,
+            wins integer,
+            losses integer,
+            manual_tier float,
+            wr float,
+            game_date text
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS game_current_insert AFTER INSERT ON game
+        BEGIN {_refresh_player_current("NEW.user_id")} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS game_current_update AFTER UPDATE ON game
+        BEGIN {_refresh_player_current("OLD.user_id")} {_refresh_player_current("NEW.user_id")} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS game_current_delete AFTER DELETE ON game
+        BEGIN {_refresh_player_current("OLD.user_id")} END
+        """,
+        # Backfill players whose game rows predate the triggers
+        """
+        INSERT OR REPLACE INTO player_current (user_id, game_name, tier, rank, role, wins, losses, manual_tier, wr, game_date)
+        SELECT g.user_id, g.game_name, g.tier, g.rank, g.role, g.wins, g.losses, g.manual_tier, g.wr, g.game_date
+        FROM game g
+        WHERE g.rowid = (
+            SELECT g2.rowid FROM game g2 WHERE g2.user_id = g.user_id
+            ORDER BY g2.game_date DESC, g2.rowid DESC LIMIT 1
+        )
+        """,
+    )
+
+    def createTable(self):
+        """Create the table and its triggers, the game table must already exist"""
+        for statement in Player_current.SCHEMA:
+            self.cursor.execute(statement)
+        self.connection.commit()
+
+    @staticmethod
+    def fetch_current_players(db, include_without_game=False, flag_game_rows=False):
+        """
+        Registered players with their newest game data
+
+        Args:
+            db: Database connection
+            include_without_game: Also return players without a game row, with None game columns
+            flag_game_rows: Append has_game, telling those players apart from a game row whose columns are all NULL
+
+        Returns:
+            list: Tuples of (user_id, game_name, tag_id, tier, rank, role, wins, losses, wr, manual_tier[, has_game])
+        """
+        join = "LEFT JOIN" if include_without_game else "JOIN"
+        has_game = ", c.user_id IS NOT NULL" if flag_game_rows else ""
+        try:
+            db.cursor.execute(f"""
+                SELECT p.user_id, p.game_name, p.tag_id, c.tier, c.rank, c.role, c.wins, c.losses, c.wr, c.manual_tier{has_game}
+                FROM player p
+                {join} player_current c ON c.user_id = p.user_id
+            """)
+            return db.cursor.fetchall()
+        except Exception as ex:
+            logger.error(f"fetch_current_players has failed with error {ex}")
+            return []
+
+    async def fetch_current_players_async(self, include_without_game=False, flag_game_rows=False):
+        """fetch_current_players on this instance, run on the DB thread pool"""
+        return await self._run_locked(Player_current.fetch_current_players, self, include_without_game, flag_game_rows)
+
+    @staticmethod
+    def fetch_by_id(db, user_id):
+        """Return (tier, rank, role, wins, losses, wr, manual_tier) of a player's newest game row, or None"""
+        try:
+            db.cursor.execute(
+                "SELECT tier, rank, role, wins, losses, wr, manual_tier FROM player_current WHERE user_id = ?",
+                (user_id,)
+            )
+            return db.cursor.fetchone()
+        except Exception as ex:
+            logger.error(f"fetch_by_id for player_current has failed with error {ex}")
+            return None
+
+
+class Riot_identity(Tournament_DB):
+    """
+    Riot ID to puuid and summoner ID resolutions
+
+    These identifiers almost never change, so a refresh can go straight to
+    the league endpoint. Rows expire after settings.RIOT_ID_TTL_DAYS, are
+    dropped when Riot answers 404 and when a player edits their Riot ID.
+    Riot IDs are case-insensitive, so both key columns compare with NOCASE.
+    """
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS riot_identity (
+            game_name text not null COLLATE NOCASE,
+            tag_id text not null COLLATE NOCASE,
+            puuid text not null,
+            summoner_id text,
+            resolved_at text default (datetime('now')),
+            PRIMARY KEY (game_name, tag_id)
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS player_riot_id_update AFTER UPDATE OF game_name, tag_id ON player
+        WHEN OLD.game_name IS NOT NEW.game_name OR OLD.tag_id IS NOT NEW.tag_id
+        BEGIN
+            DELETE FROM riot_identity WHERE game_name = OLD.game_name AND tag_id = OLD.tag_id;
+        END
+        """,
+    )
+
+    def createTable(self):
+        """Create the table and its trigger, the player table must already exist"""
+        for statement in Riot_identity.SCHEMA:
+            self.cursor.execute(statement)
+        self.connection.commit()
+
+    @staticmethod
+    def fetch(connection, game_name, tag_id, ttl_days=settings.RIOT_ID_TTL_DAYS):
+        """Return (puuid, summoner_id) of a Riot ID resolved within ttl_days, or None"""
+        return connection.execute(
+            """
+            SELECT puuid, summoner_id FROM riot_identity
+            WHERE game_name = ? AND tag_id = ? AND resolved_at >= datetime('now', ?)
+            """,
+            (game_name.strip(), tag_id.strip(), f"-{int(ttl_days)} days")
+        ).fetchone()
+
+    @staticmethod
+    def fetch_all(connection, ttl_days=settings.RIOT_ID_TTL_DAYS):
+        """
+        Every resolution younger than ttl_days
+
+        Returns:
+            dict: (lower game_name, lower tag_id) to (puuid, summoner_id)
+        """
+        rows = connection.execute(
+            "SELECT game_name, tag_id, puuid, summoner_id FROM riot_identity WHERE resolved_at >= datetime('now', ?)",
+            (f"-{int(ttl_days)} days",)
+        ).fetchall()
+        return {(game_name.lower(), tag_id.lower()): (puuid, summoner_id) for game_name, tag_id, puuid, summoner_id in rows}
+
+    @staticmethod
+    def store(connection, game_name, tag_id, puuid, summoner_id):
+        """Save a resolution, replacing an older one of the same Riot ID"""
+        connection.execute(
+            """
+            INSERT INTO riot_identity (game_name, tag_id, puuid, summoner_id) VALUES (?, ?, ?, ?)
+            ON CONFLICT (game_name, tag_id) DO UPDATE SET
+                puuid = excluded.puuid, summoner_id = excluded.summoner_id, resolved_at = datetime('now')
+            """,
+            (game_name.strip(), tag_id.strip(), puuid, summoner_id)
+        )
+
+    @staticmethod
+    def invalidate(connection, game_name, tag_id):
+        """Forget the resolution of a Riot ID"""
+        connection.execute(
+            "DELETE FROM riot_identity WHERE game_name = ? AND tag_id = ?",
+            (game_name.strip(), tag_id.strip())
+        )
+
 class Matches(Tournament_DB):
     
     def createTable(self):
@@ -532,76 +1127,145 @@ class Matches(Tournament_DB):
         self.cursor.execute("INSERT OR IGNORE INTO Counters (name, value) VALUES ('match_counter', 0)")
         self.connection.commit()
         
+    def reserve_match_ids(self, count=1):
+        """
+        Atomically reserve a block of consecutive match IDs
+
+        The counter is bumped in a single statement, so concurrent callers
+        always get disjoint blocks without scanning Matches.
+
+        Args:
+            count: Number of IDs to reserve
+
+        Returns:
+            int: First ID of the block, the block is first .. first + count - 1
+        """
+        if count < 1:
+            raise ValueError(f"Cannot reserve {count} match IDs")
+        try:
+            with self.connection:
+                self.cursor.execute(
+                    """
+                    INSERT INTO Counters (name, value) VALUES ('match_counter', ?)
+                    ON CONFLICT(name) DO UPDATE SET value = value + excluded.value
+                    RETURNING value
+                    """,
+                    (count,)
+                )
+                last_id = self.cursor.fetchone()[0]
+        except Exception as ex:
+            logger.error(f"reserve_match_ids failed with error {ex}")
+            raise
+        first_id = last_id - count + 1
+        logger.info(f"Reserved match IDs match_{first_id} to match_{last_id}")
+        return first_id
+
     def get_next_match_id(self):
         """Get the next sequential match ID (1, 2, 3, etc.) for match_1, match_2, match_3"""
-        # First try to get it from the database properly
+        return self.reserve_match_ids(1)
+
+    async def reserve_match_ids_async(self, count=1):
+        """reserve_match_ids run on the DB thread pool"""
+        return await self._run_locked(self.reserve_match_ids, count)
+
+    async def get_next_match_id_async(self):
+        """get_next_match_id run on the DB thread pool"""
+        return await self._run_locked(self.get_next_match_id)
+
+    @staticmethod
+    def apply_match_results(connection, match_results):
+        """
+        Record the results of many matches with set-based statements
+
+        Runs a fixed number of statements however many matches and players
+        the batch holds, and does not commit, so the caller decides the
+        transaction. Winners and losers are marked in Matches, every other
+        pending row of those matches is marked 'n/a', and each player's
+        newest game row gains the wins and losses of the batch.
+
+        Args:
+            connection: sqlite3 connection, e.g. from AsyncDAO.transaction
+            match_results: Dictionary mapping match_id to winning_team (1 or 2)
+
+        Returns:
+            int: Number of match players with game stats, counted once per match
+        """
+        if not match_results:
+            return 0
+        connection.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS match_result_batch (
+                teamId text PRIMARY KEY,
+                winner text NOT NULL,
+                loser text NOT NULL
+            )
+        """)
+        connection.execute("DELETE FROM match_result_batch")
+        connection.executemany(
+            "INSERT INTO match_result_batch (teamId, winner, loser) VALUES (?, ?, ?)",
+            [(match_id, f"team{team}", f"team{3 - team}") for match_id, team in match_results.items()]
+        )
+
+        # Players on a team always get the result, others only if still pending
+        connection.execute("""
+            UPDATE Matches SET
+                win = CASE WHEN Matches.teamUp = b.winner THEN 'yes' WHEN Matches.teamUp = b.loser THEN 'no' ELSE 'n/a' END,
+                loss = CASE WHEN Matches.teamUp = b.winner THEN 'no' WHEN Matches.teamUp = b.loser THEN 'yes' ELSE 'n/a' END
+            FROM match_result_batch b
+            WHERE Matches.teamId = b.teamId
+              AND (Matches.teamUp IN (b.winner, b.loser) OR (Matches.win IS NULL AND Matches.loss IS NULL))
+        """)
+
+        connection.execute("""
+            UPDATE game SET
+                wins = CASE WHEN d.wins > 0 THEN COALESCE(game.wins, 0) + d.wins ELSE game.wins END,
+                losses = CASE WHEN d.losses > 0 THEN COALESCE(game.losses, 0) + d.losses ELSE game.losses END
+            FROM (
+                SELECT m.user_id, SUM(m.teamUp = b.winner) AS wins, SUM(m.teamUp = b.loser) AS losses
+                FROM Matches m JOIN match_result_batch b ON m.teamId = b.teamId
+                GROUP BY m.user_id
+                HAVING wins > 0 OR losses > 0
+            ) d
+            WHERE game.user_id = d.user_id
+              AND game.game_date = (SELECT MAX(g2.game_date) FROM game g2 WHERE g2.user_id = game.user_id)
+        """)
+
+        players_updated = connection.execute("""
+            SELECT COUNT(*) FROM Matches m JOIN match_result_batch b ON m.teamId = b.teamId
+            WHERE EXISTS (SELECT 1 FROM game g WHERE g.user_id = m.user_id)
+        """).fetchone()[0]
+        connection.execute("DELETE FROM match_result_batch")
+        logger.info(f"Applied results of {len(match_results)} matches, updated {players_updated} player stats")
+        return players_updated
+
+    def reconcile_match_counter(self):
+        """
+        Move the match counter past every match ID already stored in Matches
+
+        Run once at startup, so databases written before the counter existed,
+        or edited by hand, never hand out an ID twice.
+
+        Returns:
+            int: The counter value after reconciliation
+        """
         try:
-            # Separate the operations to reduce time inside transaction
-            # First get the highest ID currently in use
-            highest_match = 0
-            try:
-                self.cursor.execute("SELECT MAX(CAST(REPLACE(teamId, 'match_', '') AS INTEGER)) FROM Matches WHERE teamId LIKE 'match_%'")
-                result = self.cursor.fetchone()
-                if result and result[0] is not None:
-                    highest_match = result[0]
-            except Exception as ex:
-                logger.error(f"Error getting highest match ID: {ex}")
-                # Continue with highest_match = 0
-            
-            # Then get the current counter value
-            counter_value = 0
-            try:
-                self.cursor.execute("SELECT value FROM Counters WHERE name = 'match_counter'")
-                result = self.cursor.fetchone()
-                if result and result[0] is not None:
-                    counter_value = result[0]
-            except Exception as ex:
-                logger.error(f"Error getting counter value: {ex}")
-                # Continue with counter_value = 0
-            
-            # Use the higher of the two values plus 1
-            next_id = max(counter_value, highest_match) + 1
-            
-            # Now update the counter in a short, specific transaction
-            try:
-                with self.connection:
-                    self.cursor.execute("UPDATE Counters SET value = ? WHERE name = 'match_counter'", (next_id,))
-            except Exception as ex:
-                logger.error(f"Error updating counter: {ex}")
-                # We'll still use the calculated next_id even if update fails
-            
-            logger.info(f"Generated match ID: match_{next_id}")
-            return next_id
-                
+            with self.connection:
+                self.cursor.execute("INSERT OR IGNORE INTO Counters (name, value) VALUES ('match_counter', 0)")
+                self.cursor.execute(
+                    """
+                    UPDATE Counters SET value = MAX(value, COALESCE((
+                        SELECT MAX(CAST(REPLACE(teamId, 'match_', '') AS INTEGER))
+                        FROM Matches WHERE teamId LIKE 'match_%'
+                    ), 0))
+                    WHERE name = 'match_counter'
+                    RETURNING value
+                    """
+                )
+                value = self.cursor.fetchone()[0]
+            logger.info(f"Match counter reconciled at {value}")
+            return value
         except Exception as ex:
-            logger.error(f"get_next_match_id failed with error {ex}")
-            
-            # As a fallback, calculate next ID manually by checking existing match IDs
-            # This is more reliable than returning a random number
-            try:
-                self.cursor.execute("SELECT teamId FROM Matches WHERE teamId LIKE 'match_%'")
-                matches = self.cursor.fetchall()
-                if matches:
-                    # Extract numbers from match_X format and find max
-                    existing_ids = []
-                    for match in matches:
-                        if match and match[0]:
-                            try:
-                                id_str = match[0].replace('match_', '')
-                                if id_str.isdigit():
-                                    existing_ids.append(int(id_str))
-                            except:
-                                pass
-                    
-                    next_id = max(existing_ids) + 1 if existing_ids else 1
-                    logger.info(f"Fallback generated match ID: match_{next_id}")
-                    return next_id
-            except Exception as inner_ex:
-                logger.error(f"Fallback match ID calculation failed: {inner_ex}")
-            
-            # If all else fails, start from 1
-            logger.info("Using default match ID: match_1")
-            return 1
+            logger.error(f"reconcile_match_counter failed with error {ex}")
+            raise
         
 class Player_game_info(Tournament_DB):
     """
@@ -640,11 +1304,7 @@ class Player_game_info(Tournament_DB):
                 SELECT p.user_id as player_id, p.game_name, p.tag_id, g.tier, g.rank, g.role, 
                        g.wins, g.losses, g.manual_tier, g.wr, p.toxicity_points, p.mvp_count
                 FROM player p
-                LEFT JOIN (
-                    SELECT user_id, tier, rank, role, manual_tier, wins, losses, wr, MAX(game_date) as max_date
-                    FROM game
-                    GROUP BY user_id
-                ) g ON p.user_id = g.user_id
+                LEFT JOIN player_current g ON p.user_id = g.user_id
                 ORDER BY p.game_name
             """)
             
@@ -714,6 +1374,135 @@ class Player_game_info(Tournament_DB):
             logger.error(f"Error importing player data: {ex}")
             return False
 
+    @staticmethod
+    def bulk_import(db, headers, rows):
+        """
+        Validate and upsert sheet rows into playerGameDetail and player in one transaction
+
+        Rows are staged in a temporary table that has the same column types as
+        playerGameDetail, so the diff against stored rows compares values the
+        way sqlite stores them. The upserts then run as one statement per
+        table. Sheet columns that are not table columns are ignored, and
+        player_id maps to player.user_id. New players need game_name and
+        tag_id to get a player row. Empty cells in NOT NULL columns take the
+        column default, rows that still miss a value are reported as invalid.
+
+        Args:
+            db: Database connection
+            headers: Sheet header row
+            rows: Sheet data rows, shorter rows are padded with empty cells
+
+        Returns:
+            dict: inserted, updated and unchanged player_id lists, invalid
+                (sheet row number, reason) pairs, rows, elapsed seconds and rows_per_second
+        """
+        started = time.perf_counter()
+        detail_info = Player_game_info.metadata(db)
+        detail_columns = [column[1] for column in detail_info]
+        # Empty cells in NOT NULL columns take the column default, or make the row invalid without one
+        not_null = {column[1]: column[4] for column in detail_info if column[3]}
+        player_columns = {column[1] for column in Player.metadata(db)}
+
+        headers = [header.strip() for header in headers]
+        columns = [column for column in detail_columns if column in headers]
+        summary = {"inserted": [], "updated": [], "unchanged": [], "invalid": [], "rows": len(rows)}
+        if "player_id" not in columns:
+            summary["invalid"] = [(row_number, "missing player_id column") for row_number in range(2, len(rows) + 2)]
+            return Player_game_info._finish_import(summary, started)
+
+        # Validate every row before touching the tables, the last row wins for a repeated player_id
+        staged = {}
+        for row_number, row in enumerate(rows, start=2):
+            row_data = dict(zip(headers, list(row) + [None] * (len(headers) - len(row))))
+            # Exported sheets write empty cells as "None"
+            values = {column: None if row_data.get(column) in (None, "", "None") else row_data[column] for column in columns}
+            try:
+                values["player_id"] = int(values["player_id"])
+            except (TypeError, ValueError):
+                summary["invalid"].append((row_number, f"invalid player_id {values['player_id']!r}"))
+                continue
+            for column in columns:
+                if values[column] is None and not_null.get(column) is not None:
+                    values[column] = not_null[column].strip("'")
+            missing = [column for column in columns if column in not_null and values[column] is None]
+            if missing:
+                summary["invalid"].append((row_number, f"empty {', '.join(missing)}"))
+                continue
+            staged[values["player_id"]] = [values[column] for column in columns]
+
+        if not staged:
+            return Player_game_info._finish_import(summary, started)
+
+        column_list = ", ".join(columns)
+        update_columns = [column for column in columns if column != "player_id"]
+        shared_columns = [column for column in update_columns if column in player_columns]
+        connection = db.connection
+        try:
+            connection.execute("DROP TABLE IF EXISTS temp.import_stage")
+            connection.execute("CREATE TEMP TABLE import_stage AS SELECT * FROM playerGameDetail WHERE 0")
+            with connection:
+                connection.executemany(
+                    f"INSERT INTO import_stage ({column_list}) VALUES ({', '.join('?' for _ in columns)})",
+                    staged.values()
+                )
+                summary["inserted"] = [row[0] for row in connection.execute(
+                    "SELECT player_id FROM import_stage WHERE player_id NOT IN (SELECT player_id FROM playerGameDetail)"
+                )]
+                if update_columns:
+                    stage_row = ", ".join(f"s.{column}" for column in update_columns)
+                    stored_row = ", ".join(f"d.{column}" for column in update_columns)
+                    summary["updated"] = [row[0] for row in connection.execute(f"""
+                        SELECT s.player_id FROM import_stage s JOIN playerGameDetail d ON d.player_id = s.player_id
+                        WHERE ({stage_row}) IS NOT ({stored_row})
+                    """)]
+
+                upsert = f"INSERT INTO playerGameDetail ({column_list}) SELECT {column_list} FROM import_stage WHERE true"
+                if update_columns:
+                    upsert += f" ON CONFLICT(player_id) DO UPDATE SET {', '.join(f'{column} = excluded.{column}' for column in update_columns)}"
+                else:
+                    upsert += " ON CONFLICT(player_id) DO NOTHING"
+                connection.execute(upsert)
+
+                if {"game_name", "tag_id"} <= set(shared_columns):
+                    player_select = ", ".join(["player_id"] + shared_columns)
+                    connection.execute(f"""
+                        INSERT INTO player (user_id, {', '.join(shared_columns)})
+                        SELECT {player_select} FROM import_stage
+                        WHERE game_name IS NOT NULL AND tag_id IS NOT NULL
+                        ON CONFLICT(user_id) DO UPDATE SET {', '.join(f'{column} = excluded.{column}' for column in shared_columns)}
+                    """)
+                elif shared_columns:
+                    # Without names new players cannot be created, existing ones are still updated
+                    connection.execute(f"""
+                        UPDATE player SET {', '.join(f'{column} = s.{column}' for column in shared_columns)}
+                        FROM import_stage s WHERE player.user_id = s.player_id
+                    """)
+        finally:
+            connection.execute("DROP TABLE IF EXISTS temp.import_stage")
+
+        changed = set(summary["inserted"]) | set(summary["updated"])
+        summary["unchanged"] = [player_id for player_id in staged if player_id not in changed]
+        return Player_game_info._finish_import(summary, started)
+
+    @staticmethod
+    def _finish_import(summary, started):
+        summary["elapsed"] = time.perf_counter() - started
+        summary["rows_per_second"] = summary["rows"] / summary["elapsed"] if summary["elapsed"] > 0 else 0.0
+        logger.info(
+            f"Imported {summary['rows']} rows in {summary['elapsed']:.3f}s ({summary['rows_per_second']:.0f} rows/s): "
+            f"{len(summary['inserted'])} inserted, {len(summary['updated'])} updated, "
+            f"{len(summary['unchanged'])} unchanged, {len(summary['invalid'])} invalid"
+        )
+        return summary
+
+    async def exportToGoogleSheet_async(self):
+        """exportToGoogleSheet on this instance, run on the DB thread pool"""
+        return await self._run_locked(Player_game_info.exportToGoogleSheet, self)
+
+    async def bulk_import_async(self, headers, rows):
+        """bulk_import on this instance, run on the DB thread pool"""
+        return await self._run_locked(Player_game_info.bulk_import, self, headers, rows)
+
 class MVP_Votes(Tournament_DB):
     
     def createTable(self):
@@ -1,6 +1,7 @@
 from flask import Flask, render_template_string
 import sqlite3
 from tournament_bot.config import settings  # Assumes your settings include DATABASE_NAME
+from tournament_bot.models.dbc_model import apply_connection_pragmas
 
 app = Flask(__name__)
 DATABASE = settings.DATABASE_NAME
@@ -8,7 +9,7 @@ DATABASE = settings.DATABASE_NAME
 
 def get_db_connection():
     """Create a new database connection with row_factory set for dictionary-like access."""
-    conn = sqlite3.connect(DATABASE)
+    conn = apply_connection_pragmas(sqlite3.connect(DATABASE))
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -250,4 +250,70 @@ async def test_get_toxicity_player_not_found(test_bot, mock_interaction):
         # Check the response
         mock_interaction.response.send_message.assert_called_once_with(
             "unknown_player, this username could not be found.", ephemeral=True
-        )
\ No newline at end of file
+        )
+
+
+def player_records(count):
+    """Rows in the shape returned by Player_current.fetch_current_players with flag_game_rows"""
+    return [
+        (i, f"player{i}", "NA1", "gold", "II", '["mid"]', 3, 1, None, None, 1) if i % 2 else
+        (i, f"player{i}", "NA1", None, None, None, None, None, None, None, 0)
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_list_players_single_query_first_page(test_bot, mock_interaction):
+    """Test /list_players loads every player in one query and sends only the first page"""
+    cog = PlayerManagement(test_bot)
+
+    with patch("tournament_bot.bot.commands.player_management.Player_current.db_connect"), \
+         patch("tournament_bot.bot.commands.player_management.Player_current.fetch_current_players",
+               return_value=player_records(40)) as mock_fetch:
+        await cog.list_players.callback(cog, mock_interaction)
+
+    mock_fetch.assert_called_once()
+    mock_interaction.followup.send.assert_not_called()
+    kwargs = mock_interaction.response.send_message.call_args.kwargs
+    assert len(kwargs["embed"].fields) == 15
+    assert kwargs["embed"].footer.text == "Page 1/3"
+    assert kwargs["view"].page_count == 3
+
+
+@pytest.mark.asyncio
+async def test_player_list_view_renders_requested_page():
+    """Test the page buttons move through the players and stop at the ends"""
+    from tournament_bot.bot.views.player_list import PlayerListView
+
+    view = PlayerListView(player_records(20), page_size=15)
+    interaction = MagicMock()
+    interaction.response.edit_message = AsyncMock()
+
+    assert view.previous_page.disabled
+    await view._show_page(interaction, 1)
+
+    embed = interaction.response.edit_message.call_args.kwargs["embed"]
+    assert [field.name for field in embed.fields] == [f"player{i}" for i in range(15, 20)]
+    assert "**Roles:** 🟨 Mid" in embed.fields[0].value
+    assert "No game data available" in embed.fields[1].value
+    assert view.next_page.disabled and not view.previous_page.disabled
+
+
+def test_player_field_matches_previous_list_players_formatting():
+    """Test the player fields read exactly as the per-player list_players embeds did"""
+    from tournament_bot.bot.views.player_list import format_player_field
+
+    # Players without games showed a 0.0% win rate
+    assert format_player_field((1, "Zero", "NA1", "gold", "II", '["mid"]', 0, 0, None, None, 1)) == (
+        "Zero", "**ID:** NA1\n**Rank:** Gold II\n**Record:** 0W 0L (0.0%)\n**Roles:** 🟨 Mid"
+    )
+    assert format_player_field((2, "Vet", "NA1", "gold", "II", '["mid"]', 3, 1, None, 7.5, 1)) == (
+        "Vet", "**ID:** NA1\n**Rank:** Gold II\n**Manual Tier:** 7.5/10\n**Record:** 3W 1L (75.0%)\n**Roles:** 🟨 Mid"
+    )
+    # A game row with only NULL stats is still game data
+    assert format_player_field((3, "Blank", "NA1", None, None, None, None, None, None, None, 1)) == (
+        "Blank", "**ID:** NA1\n**Rank:** Unranked \n\n**Roles:** None"
+    )
+    assert format_player_field((4, "New", "NA1", None, None, None, None, None, None, None, 0)) == (
+        "New", "**ID:** NA1\nNo game data available"
+    )
@@ -1,7 +1,12 @@
+import asyncio
 import json
+import sqlite3
+import threading
+import time
 
 import pytest
-from tournament_bot.models.dbc_model import Tournament_DB, Player, Game, MVP_Votes, Matches, Player_game_info
+from tournament_bot.models.dbc_model import Tournament_DB, Player, Game, MVP_Votes, Matches, Player_game_info, ConnectionPool, get_connection_pool, AsyncDAO, configure_journal_mode, Player_current, Riot_identity
+from tournament_bot.core.startup import initialize_database, run_migrations, get_schema_version, MIGRATIONS
 
 
 @pytest.fixture()
@@ -441,6 +446,491 @@ def test_matches_get_next_match_id(db_instance):
     )
     matches.connection.commit()
     
-    # Next match ID should be 6 (max + 1)
+    # Startup reconciliation moves the counter past stored IDs, next ID is 6 (max + 1)
+    assert matches.reconcile_match_counter() == 5
     match_id = matches.get_next_match_id()
     assert match_id == 6
+
+
+def test_matches_reserve_match_ids_in_blocks(db_instance):
+    matches = Matches(db_name=":memory:")
+    matches.connection = db_instance.connection
+    matches.cursor = db_instance.cursor
+    matches.createTable()
+
+    assert matches.reserve_match_ids(3) == 1
+    assert matches.get_next_match_id() == 4
+    assert matches.reserve_match_ids(2) == 5
+    with pytest.raises(ValueError):
+        matches.reserve_match_ids(0)
+
+
+def test_concurrent_match_id_blocks_do_not_overlap(tmp_path):
+    db_name = str(tmp_path / "ids.db")
+    initialize_database(db_name).close_db()
+    blocks = []
+    lock = threading.Lock()
+
+    def reserve():
+        for _ in range(20):
+            with Matches(db_name=db_name) as matches:
+                first = matches.reserve_match_ids(4)
+            with lock:
+                blocks.append(first)
+
+    threads = [threading.Thread(target=reserve) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reserved = sorted(first + offset for first in blocks for offset in range(4))
+    assert reserved == list(range(1, 321))
+
+
+def test_connection_pool_reuses_connections(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), max_size=2)
+
+    first = pool.acquire()
+    pool.release(first)
+
+    assert pool.acquire() is first
+
+
+def test_connection_pool_overflow_is_closed_on_release(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), max_size=1)
+
+    pooled = pool.acquire()
+    overflow = pool.acquire()
+    pool.release(overflow)
+    pool.release(pooled)
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        overflow.execute("select 1")
+    assert pool.acquire() is pooled
+
+
+def test_connection_pool_replaces_broken_connections(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), max_size=1)
+
+    broken = pool.acquire()
+    pool.release(broken)
+    broken.close()
+
+    replacement = pool.acquire()
+    assert replacement is not broken
+    assert replacement.execute("select 1").fetchone() == (1,)
+
+
+def test_connection_pool_rolls_back_failed_work(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), max_size=1)
+    with pool.connection() as connection:
+        connection.execute("create table item (name text)")
+
+    with pytest.raises(RuntimeError):
+        with pool.connection() as connection:
+            connection.execute("insert into item values ('lost')")
+            raise RuntimeError("interrupted")
+    with pool.connection() as connection:
+        connection.execute("insert into item values ('kept')")
+
+    with pool.connection() as connection:
+        assert connection.execute("select name from item").fetchall() == [("kept",)]
+
+
+def test_tournament_db_borrows_from_pool(tmp_path):
+    db_name = str(tmp_path / "tournament.db")
+
+    with Player(db_name=db_name) as player:
+        player.createTable()
+        connection = player.connection
+    assert player.connection is None
+
+    # Any model on the same file gets the released connection back
+    game = Game(db_name=db_name)
+    assert game.connection is connection
+    game.close_db()
+    assert get_connection_pool(db_name).acquire() is connection
+
+
+def test_memory_database_is_not_pooled(db_instance):
+    other = Tournament_DB(db_name=":memory:")
+
+    assert other.connection is not db_instance.connection
+    other.close_db()
+
+
+@pytest.mark.asyncio
+async def test_async_dao_queries(tmp_path):
+    dao = AsyncDAO(str(tmp_path / "async.db"))
+    await dao.execute("create table item (name text, amount integer)")
+
+    changed = await dao.execute_many("insert into item values (?, ?)", [("a", 1), ("b", 2), ("c", 3)])
+
+    assert changed == 3
+    assert await dao.fetch_one("select amount from item where name = ?", ("b",)) == (2,)
+    assert await dao.fetch_all("select name from item order by name") == [("a",), ("b",), ("c",)]
+    assert await dao.fetch_one("select amount from item where name = ?", ("z",)) is None
+
+
+@pytest.mark.asyncio
+async def test_async_dao_rolls_back_failed_transaction(tmp_path):
+    dao = AsyncDAO(str(tmp_path / "async.db"))
+    await dao.execute("create table item (name text)")
+
+    def insert_then_fail(connection):
+        connection.execute("insert into item values ('lost')")
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        await dao.transaction(insert_then_fail)
+
+    assert await dao.fetch_all("select name from item") == []
+
+
+@pytest.mark.asyncio
+async def test_model_async_methods_share_the_instance_one_call_at_a_time(tmp_path):
+    db_name = str(tmp_path / "async_models.db")
+    initialize_database(db_name).close_db()
+    matches = Matches(db_name=db_name)
+    threads = []
+    active = []
+    original = matches.reserve_match_ids
+
+    def tracked_reserve(count=1):
+        threads.append(threading.current_thread())
+        active.append(1)
+        # Another call on the same cursor would show up here
+        assert len(active) == 1
+        try:
+            time.sleep(0.01)
+            return original(count)
+        finally:
+            active.pop()
+
+    matches.reserve_match_ids = tracked_reserve
+    firsts = await asyncio.gather(*(matches.reserve_match_ids_async(3) for _ in range(5)))
+    next_id = await matches.get_next_match_id_async()
+    matches.close_db()
+
+    assert sorted(firsts) == [1, 4, 7, 10, 13]
+    assert next_id == 16
+    assert all(thread is not threading.current_thread() for thread in threads)
+    assert threads[0].name.startswith("tournament-db")
+
+    player = Player_current(db_name=db_name)
+    player.cursor.execute("INSERT INTO player (user_id, game_name, tag_id) VALUES (1, 'One', 'NA1')")
+    player.connection.commit()
+    assert await player.fetch_current_players_async(include_without_game=True) == [
+        (1, "One", "NA1", None, None, None, None, None, None, None)
+    ]
+    player.close_db()
+
+
+def test_initialize_database_enables_wal(tmp_path):
+    db = initialize_database(str(tmp_path / "startup.db"))
+
+    assert db.connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    # synchronous NORMAL is reported as 1
+    assert db.connection.execute("PRAGMA synchronous").fetchone() == (1,)
+    assert db.connection.execute("PRAGMA busy_timeout").fetchone()[0] > 0
+    db.close_db()
+
+
+def test_wal_reader_does_not_block_writer(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "wal.db"), max_size=2)
+    with pool.connection() as connection:
+        configure_journal_mode(connection, "WAL")
+        connection.execute("create table item (name text)")
+        connection.execute("insert into item values ('first')")
+
+    reader = pool.acquire()
+    writer = pool.acquire()
+    writer.execute("PRAGMA busy_timeout = 0")
+    try:
+        # An open read transaction keeps its snapshot while the writer commits
+        reader.execute("begin")
+        assert reader.execute("select count(*) from item").fetchone() == (1,)
+        writer.execute("insert into item values ('second')")
+        writer.commit()
+        assert reader.execute("select count(*) from item").fetchone() == (1,)
+        reader.rollback()
+        assert reader.execute("select count(*) from item").fetchone() == (2,)
+    finally:
+        pool.release(reader)
+        pool.release(writer)
+
+
+def test_concurrent_readers_and_writers(tmp_path):
+    db_name = str(tmp_path / "busy.db")
+    initialize_database(db_name).close_db()
+    pool = get_connection_pool(db_name)
+    errors = []
+
+    def write(worker):
+        try:
+            for game in range(50):
+                with pool.connection() as connection:
+                    connection.execute(
+                        "insert into Matches (match_num, user_id, teamUp, teamId) values (?, ?, ?, ?)",
+                        (game, worker, "team1", game)
+                    )
+        except sqlite3.Error as ex:
+            errors.append(ex)
+
+    def read():
+        try:
+            for _ in range(50):
+                with pool.connection() as connection:
+                    connection.execute("select count(*) from Matches").fetchone()
+        except sqlite3.Error as ex:
+            errors.append(ex)
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(3)]
+    threads += [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with pool.connection() as connection:
+        assert connection.execute("select count(*) from Matches").fetchone() == (150,)
+
+
+def query_plan(connection, query, params):
+    return " ".join(row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {query}", params))
+
+
+def test_migrations_index_hot_queries(tmp_path):
+    db = initialize_database(str(tmp_path / "migrated.db"))
+    connection = db.connection
+
+    assert get_schema_version(connection) == MIGRATIONS[-1][0]
+    assert "idx_game_user_date" in query_plan(
+        connection, "SELECT wins FROM game WHERE user_id = ? ORDER BY game_date DESC LIMIT 1", (1,))
+    assert "idx_matches_team" in query_plan(
+        connection, "SELECT user_id FROM Matches WHERE teamId = ? AND teamUp = ?", ("1", "team1"))
+    assert "idx_mvp_votes_match_voter" in query_plan(
+        connection, "SELECT COUNT(*) FROM MVP_Votes WHERE match_id = ? AND voter_id = ?", ("1", 1))
+    assert "idx_player_game_name_lower" in query_plan(
+        connection, "SELECT user_id FROM player WHERE LOWER(game_name) = ?", ("name",))
+
+    # Booting again finds nothing pending
+    assert run_migrations(connection) == []
+    db.close_db()
+
+
+def test_failed_migration_keeps_previous_version(db_instance):
+    connection = db_instance.connection
+    migrations = (
+        (1, "create table", ("CREATE TABLE item (name text)",)),
+        (2, "broken", ("CREATE INDEX idx_item_name ON item (name)", "CREATE INDEX broken ON missing (name)")),
+    )
+
+    with pytest.raises(sqlite3.Error):
+        run_migrations(connection, migrations)
+
+    assert get_schema_version(connection) == 1
+    assert connection.execute("SELECT name FROM sqlite_master WHERE name = 'idx_item_name'").fetchone() is None
+    fixed = (migrations[0], (2, "fixed", ("CREATE INDEX idx_item_name ON item (name)",)))
+    assert run_migrations(connection, fixed) == [2]
+
+
+def test_player_current_follows_game_rows(db_instance):
+    Player.createTable(db_instance)
+    Game.createTable(db_instance)
+    Player_current.createTable(db_instance)
+    cursor = db_instance.cursor
+    cursor.executemany(
+        "INSERT INTO player (user_id, game_name, tag_id) VALUES (?, ?, ?)",
+        [(1, "First", "NA1"), (2, "Second", "NA1"), (3, "NoGames", "NA1")]
+    )
+    cursor.executemany(
+        "INSERT INTO game (user_id, game_name, tier, rank, wins, losses, game_date) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (1, "First", "silver", "II", 1, 1, "2025-01-01 10:00:00"),
+            (1, "First", "gold", "IV", 2, 1, "2025-02-01 10:00:00"),
+            (2, "Second", "iron", "I", 0, 2, "2025-01-01 10:00:00"),
+        ]
+    )
+
+    assert Player_current.fetch_by_id(db_instance, 1)[:2] == ("gold", "IV")
+
+    # Updating the newest row and deleting rows keep the table in sync
+    cursor.execute("UPDATE game SET wins = 5 WHERE user_id = 1 AND game_date = '2025-02-01 10:00:00'")
+    assert Player_current.fetch_by_id(db_instance, 1)[3] == 5
+    cursor.execute("DELETE FROM game WHERE user_id = 1 AND tier = 'gold'")
+    assert Player_current.fetch_by_id(db_instance, 1)[:2] == ("silver", "II")
+    cursor.execute("DELETE FROM game WHERE user_id = 2")
+    assert Player_current.fetch_by_id(db_instance, 2) is None
+
+    rows = Player_current.fetch_current_players(db_instance, include_without_game=True)
+    assert sorted((row[0], row[3]) for row in rows) == [(1, "silver"), (2, None), (3, None)]
+    assert [row[0] for row in Player_current.fetch_current_players(db_instance)] == [1]
+    flagged = Player_current.fetch_current_players(db_instance, include_without_game=True, flag_game_rows=True)
+    assert sorted((row[0], row[10]) for row in flagged) == [(1, 1), (2, 0), (3, 0)]
+
+
+def test_player_current_migration_backfills_existing_rows(tmp_path):
+    db = Tournament_DB(str(tmp_path / "old.db"))
+    Player.createTable(db)
+    Game.createTable(db)
+    db.cursor.executemany(
+        "INSERT INTO game (user_id, game_name, tier, game_date) VALUES (?, ?, ?, ?)",
+        [(1, "First", "silver", "2025-01-01"), (1, "First", "gold", "2025-02-01")]
+    )
+    db.connection.commit()
+    db.close_db()
+
+    db = initialize_database(str(tmp_path / "old.db"))
+    assert Player_current.fetch_by_id(db, 1)[0] == "gold"
+    db.close_db()
+
+
+class CountingConnection:
+    """Connection proxy counting the calls made into sqlite"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.calls = 0
+
+    def execute(self, *args):
+        self.calls += 1
+        return self.connection.execute(*args)
+
+    def executemany(self, *args):
+        self.calls += 1
+        return self.connection.executemany(*args)
+
+
+def setup_bracket(db, match_count, team_size):
+    """Create match_count pending matches with their players' game rows"""
+    for table in (Player, Game, Matches):
+        table.createTable(db)
+    connection = db.connection
+    user_id = 0
+    for match_num in range(1, match_count + 1):
+        for team in ("team1", "team2", "participation"):
+            for _ in range(team_size if team != "participation" else 1):
+                user_id += 1
+                connection.execute(
+                    "INSERT INTO Matches (match_num, user_id, teamUp, teamId) VALUES (?, ?, ?, ?)",
+                    (match_num, user_id, team, f"match_{match_num}")
+                )
+                connection.execute(
+                    "INSERT INTO game (user_id, game_name, tier, wins, losses, game_date) VALUES (?, ?, ?, ?, ?, ?)",
+                    (user_id, f"player{user_id}", "gold", 1, None, "2025-01-01")
+                )
+    connection.commit()
+
+
+def test_apply_match_results_updates_matches_and_stats(db_instance):
+    connection = db_instance.connection
+    setup_bracket(db_instance, match_count=2, team_size=2)
+
+    updated = Matches.apply_match_results(connection, {"match_1": 1, "match_2": 2})
+
+    # 2 matches x (2 + 2 team players + 1 participation player)
+    assert updated == 10
+    rows = dict(((team_id, team), (win, loss)) for team_id, team, win, loss in connection.execute(
+        "SELECT teamId, teamUp, win, loss FROM Matches"))
+    assert rows[("match_1", "team1")] == ("yes", "no")
+    assert rows[("match_1", "team2")] == ("no", "yes")
+    assert rows[("match_2", "team2")] == ("yes", "no")
+    assert rows[("match_1", "participation")] == ("n/a", "n/a")
+    stats = dict((user_id, (wins, losses)) for user_id, wins, losses in connection.execute(
+        "SELECT user_id, wins, losses FROM game"))
+    # match_1: users 1-2 won, 3-4 lost, 5 took part
+    assert stats[1] == (2, None)
+    assert stats[3] == (1, 1)
+    assert stats[5] == (1, None)
+    # match_2: users 6-7 lost, 8-9 won
+    assert stats[6] == (1, 1)
+    assert stats[8] == (2, None)
+
+
+def test_apply_match_results_constant_round_trips():
+    calls = []
+    for match_count, team_size in ((1, 1), (12, 5)):
+        db = Tournament_DB(db_name=":memory:")
+        setup_bracket(db, match_count, team_size)
+        counting = CountingConnection(db.connection)
+
+        Matches.apply_match_results(counting, {f"match_{num}": 1 for num in range(1, match_count + 1)})
+        calls.append(counting.calls)
+        db.close_db()
+
+    assert calls[0] == calls[1]
+
+
+SHEET_HEADERS = ["player_id", "game_name", "tag_id", "tier", "rank", "role", "wins", "losses",
+                 "manual_tier", "wr", "toxicity_points", "mvp_count"]
+
+
+def test_bulk_import_reports_diff(db_instance):
+    Player.createTable(db_instance)
+    Player_game_info.createTable(db_instance)
+    first = Player_game_info.bulk_import(db_instance, SHEET_HEADERS, [
+        ["1", "One", "NA1", "gold", "II", "None", "3", "1", "None", "0.75", "0", "1"],
+        ["2", "Two", "NA1", "iron", "IV", "None", "0", "4", "None", "0.0", "2", "0"],
+    ])
+    assert first["inserted"] == [1, 2]
+    assert first["rows"] == 2 and first["rows_per_second"] > 0
+
+    # Re-importing an exported sheet: one change, one unchanged, one new, two invalid rows
+    second = Player_game_info.bulk_import(db_instance, SHEET_HEADERS, [
+        ["1", "One", "NA1", "gold", "I", "None", "3", "1", "None", "0.75", "0", "1"],
+        ["2", "Two", "NA1", "iron", "IV", "None", "0", "4", "None", "0.0", "2", "0"],
+        ["3", "Three", "EUW"],
+        ["abc", "Bad", "NA1"],
+        ["", "Four", "NA1", "gold", "II", "None", "1", "1", "None", "0.5", "0", "0"],
+    ])
+
+    assert second["inserted"] == [3]
+    assert second["updated"] == [1]
+    assert second["unchanged"] == [2]
+    assert [row_number for row_number, _ in second["invalid"]] == [5, 6]
+    # Empty NOT NULL cells take the column default
+    assert db_instance.cursor.execute(
+        "SELECT mvp_count FROM playerGameDetail WHERE player_id = 3").fetchone() == (0,)
+    assert db_instance.cursor.execute(
+        "SELECT rank FROM playerGameDetail WHERE player_id = 1").fetchone() == ("I",)
+    # playerGameDetail rows also create or update the player
+    assert db_instance.cursor.execute(
+        "SELECT user_id, game_name, tag_id FROM player ORDER BY user_id").fetchall() == [
+        (1, "One", "NA1"), (2, "Two", "NA1"), (3, "Three", "EUW")]
+
+
+def test_bulk_import_single_transaction(db_instance):
+    Player.createTable(db_instance)
+    Player_game_info.createTable(db_instance)
+    commits = []
+    db_instance.connection.set_trace_callback(
+        lambda statement: commits.append(statement) if statement.upper().startswith("COMMIT") else None)
+
+    rows = [[str(i), f"p{i}", "NA1", "gold", "II", "None", "1", "1", "None", "0.5", "0", "0"] for i in range(500)]
+    summary = Player_game_info.bulk_import(db_instance, SHEET_HEADERS, rows)
+
+    assert len(summary["inserted"]) == 500
+    assert len(commits) == 1
+
+
+def test_riot_identity_cache_expires_and_follows_riot_id_edits(tmp_path):
+    db = initialize_database(str(tmp_path / "identity.db"))
+    db.cursor.execute("INSERT INTO player (user_id, game_name, tag_id) VALUES (1, 'Faker', 'KR1')")
+    Riot_identity.store(db.connection, "Faker", "KR1", "puuid-1", "summoner-1")
+    Riot_identity.store(db.connection, "Old", "NA1", "puuid-2", "summoner-2")
+    db.cursor.execute("UPDATE riot_identity SET resolved_at = datetime('now', '-40 days') WHERE game_name = 'Old'")
+
+    # Lookups ignore case and expired rows
+    assert Riot_identity.fetch(db.connection, "faker", "kr1", ttl_days=30) == ("puuid-1", "summoner-1")
+    assert Riot_identity.fetch(db.connection, "Old", "NA1", ttl_days=30) is None
+    assert Riot_identity.fetch_all(db.connection, ttl_days=30) == {("faker", "kr1"): ("puuid-1", "summoner-1")}
+
+    # Editing a Riot ID drops the old resolution, other edits keep it
+    db.cursor.execute("UPDATE player SET mvp_count = 2 WHERE user_id = 1")
+    assert Riot_identity.fetch(db.connection, "Faker", "KR1") is not None
+    db.cursor.execute("UPDATE player SET game_name = 'Hide on bush' WHERE user_id = 1")
+    assert Riot_identity.fetch(db.connection, "Faker", "KR1") is None
+    db.close_db()
@@ -0,0 +1,111 @@
+import threading
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from discord import Interaction, Permissions
+from tournament_bot.bot.commands.export_import import Import_Export
+
+
+class StubRequest:
+    """Prepared request whose execute records the calling thread"""
+
+    def __init__(self, client, kind, kwargs, result):
+        self.client = client
+        self.kind = kind
+        self.kwargs = kwargs
+        self.result = result
+
+    def execute(self):
+        self.client.calls.append((self.kind, self.kwargs, threading.current_thread()))
+        return self.result(self.kwargs) if callable(self.result) else self.result
+
+
+class StubSpreadsheets:
+    """Offline stand-in for the googleapiclient spreadsheets() resource"""
+
+    def __init__(self, sheets=None, values=None):
+        self.sheets = dict(sheets or {"Sheet1": 0})
+        self.values_data = values or []
+        self.calls = []
+
+    def get(self, **kwargs):
+        return StubRequest(self, "get", kwargs, lambda _: {
+            "sheets": [{"properties": {"title": title, "sheetId": sheet_id}} for title, sheet_id in self.sheets.items()]
+        })
+
+    def batchUpdate(self, **kwargs):
+        def apply(request_kwargs):
+            for request in request_kwargs["body"]["requests"]:
+                if "addSheet" in request:
+                    properties = request["addSheet"]["properties"]
+                    self.sheets[properties["title"]] = properties["sheetId"]
+            return {"replies": []}
+        return StubRequest(self, "batchUpdate", kwargs, apply)
+
+    def values(self):
+        stub = MagicMock()
+        stub.get = lambda **kwargs: StubRequest(self, "values.get", kwargs, {"values": self.values_data})
+        return stub
+
+
+@pytest.fixture
+def cog():
+    with patch("tournament_bot.bot.commands.export_import.os.path.exists", return_value=False):
+        cog = Import_Export(MagicMock())
+    cog.google_apis_enabled = True
+    cog.googleSheetId = "spreadsheet"
+    cog.spreadsheets_service = StubSpreadsheets()
+    return cog
+
+
+@pytest.fixture
+def interaction():
+    interaction = MagicMock(spec=Interaction)
+    interaction.user = MagicMock()
+    interaction.user.guild_permissions = Permissions(administrator=True)
+    interaction.response.defer = AsyncMock()
+    interaction.followup.send = AsyncMock()
+    return interaction
+
+
+@pytest.mark.asyncio
+async def test_sheets_create_adds_and_writes_in_one_batch(cog):
+    sheet_id = await cog.sheets_create("export", True, [["a", "b"], ["1", "2"]])
+
+    calls = cog.spreadsheets_service.calls
+    assert [kind for kind, _, _ in calls] == ["get", "batchUpdate"]
+    requests = calls[1][1]["body"]["requests"]
+    assert requests[0]["addSheet"]["properties"] == {"sheetId": sheet_id, "title": "export"}
+    assert requests[1]["appendCells"]["sheetId"] == sheet_id
+    assert len(requests[1]["appendCells"]["rows"]) == 2
+    # Requests never run on the event loop thread
+    assert all(thread is not threading.current_thread() for _, _, thread in calls)
+
+
+@pytest.mark.asyncio
+async def test_sheets_create_chunks_large_exports(cog):
+    rows = [[str(i)] for i in range(25)]
+
+    await cog.sheets_create("Sheet1", True, rows, batch_rows=10)
+
+    batches = [kwargs["body"]["requests"] for kind, kwargs, _ in cog.spreadsheets_service.calls if kind == "batchUpdate"]
+    assert len(batches) == 3
+    # The existing sheet is cleared in the first batch together with the first chunk
+    assert "updateCells" in batches[0][0]
+    assert [len(batch[-1]["appendCells"]["rows"]) for batch in batches] == [10, 10, 5]
+
+
+@pytest.mark.asyncio
+async def test_export_players_offloads_sheet_calls(cog, interaction):
+    header = ["player_id", "game_name"]
+    players = [(1, "One"), (2, None)]
+
+    with patch("tournament_bot.bot.commands.export_import.Player_game_info.db_connect"), \
+         patch("tournament_bot.bot.commands.export_import.Player_game_info.exportToGoogleSheet",
+               return_value=(header, players)):
+        await cog.exportToGoogleSheet.callback(cog, interaction, custom_name="night one")
+
+    batch = [kwargs for kind, kwargs, _ in cog.spreadsheets_service.calls if kind == "batchUpdate"]
+    assert len(batch) == 1
+    rows = batch[0]["body"]["requests"][-1]["appendCells"]["rows"]
+    assert [cell["userEnteredValue"]["stringValue"] for cell in rows[2]["values"]] == ["2", "None"]
+    assert "night_one" in interaction.followup.send.call_args.args[0]
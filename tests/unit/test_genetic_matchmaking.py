@@ -8,7 +8,7 @@ from unittest.mock import patch, MagicMock, AsyncMock
 # Add parent directory to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from tournament_bot.bot.services.genetic_matchmaking import GeneticMatchMaking
+from tournament_bot.bot.services.genetic_matchmaking import GeneticMatchMaking, FitnessCache, run_genetic_algorithm_worker, run_island_worker
 
 
 @pytest.fixture
@@ -324,32 +324,234 @@ def test_swap_mutation(matchmaker):
         assert not_mutated == chromosome
 
 
+@pytest.mark.asyncio
+async def test_numpy_fitness_backend_matches_calculate_fitness(matchmaker, sample_players):
+    """Test the vectorized fitness engine scores exactly like calculate_fitness"""
+    pytest.importorskip("numpy")
+    import random
+
+    players = await matchmaker.calculate_performance([{**player, 'calculated_tier': 3.0} for player in sample_players])
+    rng = random.Random(7)
+    population = [rng.sample(range(len(players)), len(players)) for _ in range(50)]
+
+    matchmaker.fitness_backend = "numpy"
+    engine = matchmaker.build_fitness_engine(players, team_size=5)
+    expected = [matchmaker.calculate_fitness(chrom, players, 5) for chrom in population]
+
+    assert engine.evaluate(population) == expected
+    assert matchmaker.score_chromosomes(population, players, 5, engine) == expected
+
+    # The cached path scores the canonical form of every split
+    canonical = [matchmaker.canonical_chromosome(chrom, 5) for chrom in population]
+    matchmaker.fitness_cache.reset()
+    assert matchmaker.evaluate_population(population, players, 5, engine) == engine.evaluate(canonical)
+
+
+@pytest.mark.asyncio
+async def test_genetic_algorithm_solves_single_lobby_exactly(matchmaker, sample_players):
+    """Test a 10 player pool is solved by exhaustive search over every team split"""
+    import itertools
+
+    players = await matchmaker.calculate_performance([{**player, 'calculated_tier': 3.0} for player in sample_players])
+    best_possible = max(
+        matchmaker.calculate_fitness(list(team1) + [i for i in range(10) if i not in team1], players, 5)
+        for team1 in itertools.combinations(range(10), 5)
+    )
+
+    best_chromosome, best_fitness = matchmaker.genetic_algorithm(players, team_size=5)
+
+    assert sorted(best_chromosome) == list(range(10))
+    assert best_fitness == best_possible
+    assert matchmaker.calculate_fitness(best_chromosome, players, 5) == best_fitness
+
+
+@pytest.mark.asyncio
+async def test_fitness_cache_reuses_reordered_splits(matchmaker, sample_players):
+    """Test chromosomes that only reorder players within a team are scored once"""
+    players = await matchmaker.calculate_performance([{**player, 'calculated_tier': 3.0} for player in sample_players])
+    chromosome = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
+    reordered = [4, 3, 2, 1, 0, 9, 8, 7, 6, 5]
+
+    matchmaker.fitness_cache.reset()
+    with patch.object(matchmaker, 'calculate_fitness', wraps=matchmaker.calculate_fitness) as mock_fitness:
+        fitnesses = matchmaker.evaluate_population([chromosome, reordered, chromosome], players, 5)
+
+    assert mock_fitness.call_count == 1
+    assert fitnesses[0] == fitnesses[1] == fitnesses[2]
+    assert matchmaker.fitness_cache.misses == 1
+    assert matchmaker.fitness_cache.hits == 2
+
+
+def test_fitness_cache_evicts_least_recently_used():
+    """Test the fitness cache stays bounded and evicts the oldest split"""
+    cache = FitnessCache(max_size=2)
+    first = FitnessCache.key([0, 1, 2, 3], team_size=2)
+    second = FitnessCache.key([0, 2, 1, 3], team_size=2)
+    third = FitnessCache.key([0, 3, 1, 2], team_size=2)
+
+    cache.put(first, 10.0)
+    cache.put(second, 20.0)
+    assert cache.get(first) == 10.0
+    cache.put(third, 30.0)
+
+    assert len(cache.entries) == 2
+    assert cache.get(second) is None
+    assert cache.get(third) == 30.0
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    cache.reset()
+    assert len(cache.entries) == 0
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_genetic_algorithm_async_passes_plain_data(matchmaker, sample_players):
+    """Test the async GA entry point sends only plain player data to the executor"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    players = await matchmaker.calculate_performance([{**player, 'calculated_tier': 3.0} for player in sample_players])
+
+    with ThreadPoolExecutor(max_workers=1) as executor, \
+         patch('tournament_bot.bot.services.genetic_matchmaking.run_genetic_algorithm_worker',
+               wraps=run_genetic_algorithm_worker) as mock_worker:
+        best_chromosome, best_fitness = await matchmaker.genetic_algorithm_async(players, team_size=5, executor=executor)
+
+    sent_players = mock_worker.call_args[0][0]
+    assert all(set(player) <= {'tier', 'rank', 'roleBasedPerformance'} for player in sent_players)
+    assert sorted(best_chromosome) == list(range(10))
+    assert matchmaker.calculate_fitness(best_chromosome, players, 5) == best_fitness
+
+
+@pytest.mark.asyncio
+async def test_island_genetic_algorithm_migrates_between_islands(matchmaker, sample_players):
+    """Test the island model runs every island per interval and returns a valid split"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = [{**player, 'calculated_tier': 3.0} for player in sample_players * 2]
+    players = await matchmaker.calculate_performance(pool)
+
+    with ThreadPoolExecutor(max_workers=3) as executor, \
+         patch('tournament_bot.bot.services.genetic_matchmaking.run_island_worker',
+               wraps=run_island_worker) as mock_worker:
+        best_chromosome, best_fitness = await matchmaker.island_genetic_algorithm(
+            players, population_size=20, generations=10, team_size=5,
+            islands=3, migration_interval=5, time_budget=0, executor=executor
+        )
+
+    # Two migration intervals of 5 generations with 3 islands each
+    assert mock_worker.call_count == 6
+    second_round = [call.args[1] for call in mock_worker.call_args_list[3:]]
+    assert all(len(population) == 20 for population in second_round)
+    assert sorted(best_chromosome) == list(range(20))
+    assert matchmaker.calculate_fitness(best_chromosome, players, 5) == best_fitness
+
+
+@pytest.mark.asyncio
+async def test_island_stagnation_counts_generations_actually_run(matchmaker, sample_players):
+    """Test epochs cut short by the islands only add the generations they ran to the stagnation count"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = [{**player, 'calculated_tier': 3.0} for player in sample_players * 2]
+    players = await matchmaker.calculate_performance(pool)
+
+    def short_epoch(players, population, generations, team_size, fitness_backend, fitness_cache_size, deadline):
+        # Every island stops after 2 of its 20 generations without finding anything better
+        chromosomes = [list(range(20)) for _ in range(5)]
+        return chromosomes, chromosomes[0], 1.0, 2
+
+    with ThreadPoolExecutor(max_workers=2) as executor, \
+         patch('tournament_bot.bot.services.genetic_matchmaking.run_island_worker', short_epoch):
+        _, _, stats = await matchmaker.island_genetic_algorithm(
+            players, population_size=5, generations=100, team_size=5,
+            islands=2, migration_interval=20, time_budget=0, executor=executor, return_stats=True
+        )
+
+    # 50 generations without improvement after the first epoch, not 50 planned ones
+    assert stats['stopped_by'] == "early_stop"
+    assert stats['generations'] == 52
+
+
+def test_evolve_island_stops_at_deadline(matchmaker, sample_players):
+    """Test an island returns its population ranked by fitness once the deadline passed"""
+    players = [{**player, 'roleBasedPerformance': {'top': 50.0, 'mid': 40.0}} for player in sample_players]
+
+    population, best_chromosome, best_fitness, generations_run = matchmaker.evolve_island(
+        players, 12, generations=100, team_size=5, deadline=0
+    )
+
+    assert generations_run == 0
+    # The fitness cache scores the canonical form of every split
+    fitnesses = [matchmaker.calculate_fitness(matchmaker.canonical_chromosome(chrom, 5), players, 5) for chrom in population]
+    assert fitnesses == sorted(fitnesses, reverse=True)
+    assert best_fitness == fitnesses[0]
+
+
+def test_genetic_algorithm_stops_at_time_budget(matchmaker, sample_players):
+    """Test the GA returns its best solution so far once the time budget is spent"""
+    players = [{**player, 'roleBasedPerformance': {'top': 50.0, 'mid': 40.0}} for player in sample_players * 2]
+
+    best_chromosome, best_fitness, stats = matchmaker.genetic_algorithm(
+        players, generations=10000, team_size=5, time_budget=0.05, return_stats=True
+    )
+
+    assert stats['stopped_by'] in ('time_budget', 'early_stop')
+    assert stats['generations'] < 10000
+    assert stats['generations'] == len(stats['fitness_history'])
+    assert stats['evaluations'] == stats['generations'] * 150
+    assert stats['evaluations_per_second'] > 0
+    assert stats['fitness_history'] == sorted(stats['fitness_history'])
+    assert stats['fitness_history'][-1] == best_fitness
+    assert sorted(best_chromosome) == list(range(20))
+
+
+def test_genetic_algorithm_stats_for_exact_solver(matchmaker, sample_players):
+    """Test a single lobby reports the exhaustive search in its stats"""
+    players = [{**player, 'roleBasedPerformance': {'top': 50.0, 'mid': 40.0}} for player in sample_players]
+
+    _, best_fitness, stats = matchmaker.genetic_algorithm(players, team_size=5, return_stats=True)
+
+    assert stats['stopped_by'] == 'exact'
+    assert stats['evaluations'] == 126
+    assert stats['fitness_history'] == [best_fitness]
+
+
+def test_worker_matchmaker_skips_database():
+    """Test process pool workers do not open database connections"""
+    with patch('tournament_bot.bot.services.genetic_matchmaking.Tournament_DB') as mock_db:
+        worker_matchmaker = GeneticMatchMaking(connect_db=False)
+
+    mock_db.assert_not_called()
+    assert worker_matchmaker.db is None
+
+
+def test_unknown_fitness_backend():
+    """Test an unknown fitness backend is rejected"""
+    with pytest.raises(ValueError):
+        GeneticMatchMaking(fitness_backend="gpu")
+
+
 @pytest.mark.asyncio
 async def test_fetch_player_data(matchmaker):
-    """Test fetching player data from database"""
-    # Mock database queries
-    player_db_mock = matchmaker.player_db
-    game_db_mock = matchmaker.game_db
-    
-    # Mock get_all_player to return sample data
+    """Test fetching player data from the player_current table"""
+    # Rows of player joined with their newest game row
     player_records = [
-        (123, "Player1", "tag1"),
-        (456, "Player2", "tag2")
+        (123, "Player1", "tag1", "gold", "II", '{"top": true, "mid": false}', 10, 5, 0.67, None),
+        (456, "Player2", "tag2", "silver", None, None, 3, 3, None, None)
     ]
-    player_db_mock.get_all_player = MagicMock(return_value=player_records)
-    
-    # Mock the cursor to return game data
-    game_data = ("gold", "II", '{"top": true, "mid": false}', 10, 5, 0.67)
-    game_db_mock.cursor.fetchone = MagicMock(return_value=game_data)
     
     # Call the method
-    result = await matchmaker.fetch_player_data()
+    with patch('tournament_bot.bot.services.genetic_matchmaking.Player_current.fetch_current_players',
+               return_value=player_records) as mock_fetch:
+        result = await matchmaker.fetch_player_data()
     
     # Verify results
+    mock_fetch.assert_called_once_with(matchmaker.game_db)
     assert len(result) == 2
     assert result[0]['user_id'] == 123
     assert result[0]['tier'] == 'gold'
     assert result[0]['rank'] == 'II'
+    assert result[1]['rank'] == 'V'
+    assert result[1]['wr'] == 50.0
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,153 @@
+import json
+import time
+import pytest
+from tournament_bot.integrations import overfast
+from tournament_bot.integrations.http_cache import HttpCache
+
+
+class StubResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode() if body is not None else b""
+        self.headers = headers or {}
+
+
+class StubSession:
+    """Offline stand-in for requests.Session that honours If-None-Match like OverFast"""
+
+    def __init__(self, bodies, last_modified="Sat, 17 Oct 2026 10:00:00 GMT", cache_control=None):
+        self.bodies = bodies
+        self.last_modified = last_modified
+        self.cache_control = cache_control
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append((url, params, dict(headers or {})))
+        body = self.bodies.get(url)
+        if body is None:
+            return StubResponse(404, {"error": "not found"})
+        etag = f'"{len(json.dumps(body))}"'
+        response_headers = {"ETag": etag}
+        if self.cache_control:
+            response_headers["Cache-Control"] = self.cache_control
+        if (headers or {}).get("If-None-Match") == etag:
+            return StubResponse(304, headers=response_headers)
+        if self.last_modified:
+            response_headers["Last-Modified"] = self.last_modified
+        return StubResponse(200, body, response_headers)
+
+    def close(self):
+        pass
+
+
+def test_fresh_responses_are_served_from_disk(tmp_path):
+    session = StubSession({"https://api.test/players/a-1/stats": {"ana": []}})
+    cache = HttpCache(path=str(tmp_path / "http.db"), ttl=60, session=session)
+
+    pc = cache.get("https://api.test/players/a-1/stats", params={"platform": "pc", "gamemode": "competitive"})
+    again = cache.get("https://api.test/players/a-1/stats", params={"gamemode": "competitive", "platform": "pc"})
+    console = cache.get("https://api.test/players/a-1/stats", params={"platform": "console", "gamemode": "competitive"})
+    missing = cache.get("https://api.test/players/b-2/summary")
+    cache.close()
+
+    # Parameter order does not matter, parameter values do
+    assert pc.json() == again.json() == {"ana": []}
+    assert again.from_cache and not console.from_cache
+    assert missing.status_code == 404
+    assert len(session.calls) == 3
+
+    # The cache survives a restart
+    reopened = HttpCache(path=str(tmp_path / "http.db"), ttl=60, session=session)
+    assert reopened.get("https://api.test/players/a-1/stats", params={"platform": "pc", "gamemode": "competitive"}).from_cache
+    assert len(session.calls) == 3
+    reopened.close()
+
+
+def test_expired_responses_are_revalidated(tmp_path):
+    url = "https://api.test/heroes"
+    session = StubSession({url: [{"key": "ana", "role": "support"}]})
+    cache = HttpCache(path=str(tmp_path / "http.db"), ttl=0, session=session)
+
+    first = cache.get(url)
+    time.sleep(0.01)
+    second = cache.get(url)
+
+    # The first request is unconditional, the second sends back the stored validators
+    assert session.calls[0][2] == {}
+    assert session.calls[1][2]["If-None-Match"] == f'"{len(json.dumps([{"key": "ana", "role": "support"}]))}"'
+    assert session.calls[1][2]["If-Modified-Since"] == "Sat, 17 Oct 2026 10:00:00 GMT"
+    assert second.from_cache and second.json() == first.json()
+    assert cache.stats["revalidated"] == 1
+    assert cache.stats["bytes_saved"] == len(first.content)
+    assert cache.hit_ratio() == pytest.approx(0.5)
+    cache.close()
+
+
+def test_only_server_validators_are_sent(tmp_path):
+    url = "https://api.test/heroes"
+    session = StubSession({url: [{"key": "ana", "role": "support"}]}, last_modified=None)
+    cache = HttpCache(path=str(tmp_path / "http.db"), ttl=0, session=session)
+
+    cache.get(url)
+    time.sleep(0.01)
+    second = cache.get(url)
+
+    # No Last-Modified from the server means no If-Modified-Since made up from the local clock
+    assert "If-Modified-Since" not in session.calls[1][2]
+    assert session.calls[1][2]["If-None-Match"]
+    assert second.from_cache
+    cache.close()
+
+
+def test_no_store_responses_are_not_cached(tmp_path):
+    url = "https://api.test/heroes"
+    session = StubSession({url: [{"key": "ana", "role": "support"}]}, cache_control="no-store")
+    cache = HttpCache(path=str(tmp_path / "http.db"), ttl=60, session=session)
+
+    first = cache.get(url)
+    second = cache.get(url)
+
+    assert not first.from_cache and not second.from_cache
+    # Nothing was stored, so there is nothing to revalidate either
+    assert session.calls[1][2] == {}
+    assert cache.connection.execute("SELECT count(*) FROM http_cache").fetchone() == (0,)
+    cache.close()
+
+
+def test_no_cache_responses_are_always_revalidated(tmp_path):
+    url = "https://api.test/heroes"
+    session = StubSession({url: [{"key": "ana", "role": "support"}]}, cache_control="no-cache")
+    cache = HttpCache(path=str(tmp_path / "http.db"), ttl=60, session=session)
+
+    cache.get(url)
+    second = cache.get(url)
+
+    # Within the default TTL, but the server asked for a revalidation on every use
+    assert len(session.calls) == 2
+    assert session.calls[1][2]["If-None-Match"]
+    assert second.from_cache
+    assert cache.stats["revalidated"] == 1
+    cache.close()
+
+
+def test_hero_roles_are_fetched_once_per_process(tmp_path, monkeypatch):
+    session = StubSession({f"{overfast.OVERFAST_URL}/heroes": [{"key": "ana", "role": "support"}]})
+    monkeypatch.setattr(overfast, "_cache", HttpCache(path=str(tmp_path / "http.db"), ttl=0, session=session))
+    monkeypatch.setattr(overfast, "_hero_roles", None)
+
+    assert overfast.fetch_hero_roles() == {"ana": "support"}
+    assert overfast.fetch_hero_roles() == {"ana": "support"}
+    assert len(session.calls) == 1
+    overfast._cache.close()
+
+
+def test_private_profiles_skip_stats_requests(tmp_path, monkeypatch):
+    session = StubSession({f"{overfast.OVERFAST_URL}/players/Ana-1/summary": {"privacy": "private"}})
+    monkeypatch.setattr(overfast, "_cache", HttpCache(path=str(tmp_path / "http.db"), session=session))
+
+    summary, pc, console = overfast.fetch_player_stats("Ana#1", "competitive")
+
+    assert summary.json()["privacy"] == "private"
+    assert pc is None and console is None
+    assert len(session.calls) == 1
+    overfast._cache.close()
@@ -0,0 +1,109 @@
+import pytest
+import random
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tournament_bot.bot.services.genetic_matchmaking import GeneticMatchMaking
+from tournament_bot.bot.services.lobby_partitioner import LobbyPartitioner
+
+
+TIERS = ['iron', 'bronze', 'silver', 'gold', 'platinum', 'emerald', 'diamond', 'master']
+ROLES = ['top', 'jungle', 'mid', 'bottom', 'support']
+
+
+@pytest.fixture
+def matchmaker():
+    """Matchmaker without database connections"""
+    return GeneticMatchMaking(fitness_backend="numpy", connect_db=False)
+
+
+@pytest.fixture
+def players():
+    """31 seeded players with role preferences and a fixed calculated tier"""
+    rng = random.Random(7)
+    return [
+        {
+            'user_id': f'player{i}',
+            'tier': rng.choice(TIERS),
+            'rank': rng.choice(['I', 'II', 'III', 'IV', 'V']),
+            'role': rng.sample(ROLES, rng.randint(1, 3)),
+            'calculated_tier': rng.uniform(1, 6)
+        }
+        for i in range(31)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_optimize_improves_contiguous_slices(matchmaker, players):
+    """Test swapping between lobbies never loses a player and does not lower the objective"""
+    processed = await matchmaker.calculate_performance(players[:20])
+    partitioner = LobbyPartitioner(matchmaker, processed, players_per_game=10)
+    start = partitioner.total_objective()
+
+    partitioner.optimize()
+
+    assert sorted(idx for lobby in partitioner.lobbies for idx in lobby) == list(range(20))
+    assert all(len(lobby) == 10 for lobby in partitioner.lobbies)
+    assert partitioner.total_objective() >= start
+
+
+@pytest.mark.asyncio
+async def test_min_objective_raises_worst_lobby(matchmaker, players):
+    """Test the worst-case objective does not lower the weakest lobby"""
+    processed = await matchmaker.calculate_performance(players[:20])
+    partitioner = LobbyPartitioner(matchmaker, processed, players_per_game=10, objective="min")
+    worst = min(partitioner.score_lobby(lobby)[0] for lobby in partitioner.lobbies)
+
+    partitioner.optimize()
+
+    assert min(partitioner.score_lobby(lobby)[0] for lobby in partitioner.lobbies) >= worst
+
+
+@pytest.mark.asyncio
+async def test_add_player_only_touches_one_lobby(matchmaker, players):
+    """Test a late check-in is placed without reshuffling the other lobbies"""
+    processed = await matchmaker.calculate_performance(players)
+    partitioner = LobbyPartitioner(matchmaker, processed[:30], players_per_game=10)
+    before = [list(lobby) for lobby in partitioner.lobbies]
+
+    changed = partitioner.add_player(processed[30])
+
+    assert len(changed) <= 1
+    for lobby_idx, lobby in enumerate(partitioner.lobbies):
+        if lobby_idx not in changed:
+            assert lobby == before[lobby_idx]
+    assert len(partitioner.bench) == 1
+    assert sorted(partitioner.bench + [idx for lobby in partitioner.lobbies for idx in lobby]) == list(range(31))
+
+
+@pytest.mark.asyncio
+async def test_full_bench_opens_new_lobby(matchmaker, players):
+    """Test the bench becomes a new lobby once it has enough players"""
+    processed = await matchmaker.calculate_performance(players[:20])
+    partitioner = LobbyPartitioner(matchmaker, processed[:19], players_per_game=10)
+    assert len(partitioner.lobbies) == 1
+    assert len(partitioner.bench) == 9
+
+    changed = partitioner.add_player(processed[19])
+
+    assert 1 in changed
+    assert len(partitioner.lobbies) == 2
+    assert partitioner.bench == []
+
+
+def test_role_coverage_gap(matchmaker):
+    """Test every role needs a player on each team"""
+    lobby_players = [{'roleBasedPerformance': {'mid': 1.0, 'forced': 0.8}} for _ in range(10)]
+    partitioner = LobbyPartitioner(matchmaker, lobby_players, players_per_game=10)
+
+    # Only mid is covered, the four other roles miss both slots
+    assert partitioner.role_coverage_gap(list(range(10))) == 8
+
+
+def test_unknown_objective(matchmaker):
+    """Test an unsupported objective is rejected"""
+    with pytest.raises(ValueError):
+        LobbyPartitioner(matchmaker, [], objective="median")
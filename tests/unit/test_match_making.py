@@ -13,7 +13,7 @@ from tournament_bot.bot.services.matchmaking import (
     load_player_data, calculate_player_tier, get_random_players, 
     intialSortingPlayer, performance, relativePerformance, teamPerformance, 
     possible_assighn_role, isPlayerRoleprefered, assignPlayer_toTeam, 
-    buildTeams, verify_swap_teams, set_test_players
+    buildTeams, verify_swap_teams, set_test_players, build_teams_indexed, index_role_performance
 )
 
 
@@ -377,6 +377,35 @@ def test_buildTeams():
         assert "assigned_to" in assignment
 
 
+@pytest.mark.asyncio
+async def test_build_teams_indexed_matches_buildTeams():
+    """Test the indexed greedy engine makes the same decisions as buildTeams"""
+    rng = random.Random(0)
+    roles = ['top', 'jungle', 'mid', 'bottom', 'support']
+
+    for _ in range(200):
+        players = [
+            {'user_id': f'player{i}', 'tier': 'gold', 'role': rng.sample(roles, rng.randint(1, 5)),
+             'calculated_tier': rng.uniform(1, 6)}
+            for i in range(rng.randint(1, 40))
+        ]
+        players = await performance(players)
+
+        assert build_teams_indexed(players) == buildTeams(players)
+        assert build_teams_indexed(players, index_role_performance(players)) == buildTeams(players)
+
+
+def test_buildTeams_with_duplicate_players():
+    """Test equal player dicts are each looked up at their own position"""
+    player = {"user_id": "player1", "roleBasedPerformance": {"top": 1.3, "jungle": 1.2}}
+    players = [dict(player), dict(player), dict(player)]
+
+    team1, team2 = buildTeams(players)
+
+    assert [entry["team_role"] for entry in team1 + team2] == ["top", "top", "jungle"]
+    assert build_teams_indexed(players) == (team1, team2)
+
+
 def test_verify_swap_teams():
     """Test verifying and swapping team members to avoid grouping"""
     # Create sample teams
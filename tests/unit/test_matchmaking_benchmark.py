@@ -0,0 +1,81 @@
+import pytest
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tournament_bot.bot.services import matchmaking_benchmark as benchmark
+
+
+def test_synthetic_players_are_seeded():
+    """Test the same seed always produces the same pool"""
+    assert benchmark.synthetic_players(20, seed=3) == benchmark.synthetic_players(20, seed=3)
+    assert benchmark.synthetic_players(20, seed=3) != benchmark.synthetic_players(20, seed=4)
+
+
+@pytest.mark.asyncio
+async def test_run_benchmark_records_every_solver():
+    """Test a run has one record per solver and pool size with all metrics"""
+    results = await benchmark.run_benchmark(pool_sizes=(10, 20), solvers=["greedy", "genetic"], time_budget=0.1)
+
+    assert [(record['solver'], record['players']) for record in results['results']] == [
+        ('greedy', 10), ('genetic', 10), ('greedy', 20), ('genetic', 20)
+    ]
+    for record in results['results']:
+        assert record['games'] == record['players'] // 10
+        assert record['wall_time'] >= 0
+        assert record['peak_memory_kb'] > 0
+        assert 0 < record['mean_fitness'] <= 100
+    assert results['results'][1]['evaluations'] == 126
+    assert results['meta']['seed'] == 0
+
+
+@pytest.mark.asyncio
+async def test_genetic_solver_is_reproducible():
+    """Test seeded runs produce the same balance"""
+    players = benchmark.synthetic_players(20)
+    first = await benchmark.benchmark_solver('genetic', players, seed=1)
+    second = await benchmark.benchmark_solver('genetic', players, seed=1)
+
+    assert first['mean_fitness'] == second['mean_fitness']
+
+
+def _run(wall_time=1.0, peak_memory_kb=100.0, mean_fitness=90.0):
+    return {'results': [{
+        'solver': 'genetic', 'players': 20, 'wall_time': wall_time,
+        'peak_memory_kb': peak_memory_kb, 'mean_fitness': mean_fitness
+    }]}
+
+
+def test_compare_results_flags_regressions():
+    """Test slowdowns, memory growth and fitness drops beyond the threshold are reported"""
+    baseline = _run()
+
+    assert benchmark.compare_results(_run(wall_time=1.1, peak_memory_kb=110.0, mean_fitness=89.5), baseline) == []
+    assert len(benchmark.compare_results(_run(wall_time=1.5), baseline)) == 1
+    assert len(benchmark.compare_results(_run(peak_memory_kb=200.0), baseline)) == 1
+    assert len(benchmark.compare_results(_run(mean_fitness=80.0), baseline)) == 1
+
+
+def test_compare_results_ignores_timing_noise():
+    """Test tiny absolute slowdowns are not reported"""
+    assert benchmark.compare_results(_run(wall_time=0.002), _run(wall_time=0.001)) == []
+
+
+def test_main_fails_on_regression(tmp_path):
+    """Test the command line exits with status 1 when the baseline is better"""
+    baseline_path = tmp_path / "baseline.json"
+    output_path = tmp_path / "current.json"
+    baseline_path.write_text(json.dumps({'results': [{
+        'solver': 'greedy', 'players': 10, 'wall_time': 10.0, 'peak_memory_kb': 1e9, 'mean_fitness': 100.0
+    }]}))
+
+    status = benchmark.main([
+        "--sizes", "10", "--solvers", "greedy",
+        "--output", str(output_path), "--baseline", str(baseline_path)
+    ])
+
+    assert status == 1
+    assert json.loads(output_path.read_text())['results'][0]['solver'] == 'greedy'
@@ -0,0 +1,424 @@
+import asyncio
+import time
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from tournament_bot.models.dbc_model import AsyncDAO, Game, Riot_identity
+from tournament_bot.core.startup import initialize_database
+from tournament_bot.bot.services.riot_refresh import RiotRefreshPipeline, RiotRefreshScheduler
+from tournament_bot.integrations.riot_api import RiotAPI
+from tournament_bot.integrations.riot_client import RiotClient, RateLimiter, parse_rate_limits
+
+
+class FakeRiot:
+    """Local stand-in for the account, summoner and league endpoints"""
+
+    def __init__(self, throttle_first=0, delay=0.01):
+        self.throttle_first = throttle_first
+        self.delay = delay
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.stale_summoners = set()
+        self.paths = []
+        self.peers = set()
+        self.fail_first = 0
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/riot/account/v1/accounts/by-riot-id/{name}/{tag}", self.account)
+        app.router.add_get("/lol/summoner/v4/summoners/by-puuid/{puuid}", self.summoner)
+        app.router.add_get("/lol/league/v4/entries/by-summoner/{summoner_id}", self.entries)
+        app.router.add_get("/lol/summoner/v4/summoners/by-name/{name}", self.summoner_by_name)
+        return app
+
+    async def respond(self, body):
+        self.requests += 1
+        self.paths.append(self.path)
+        self.peers.add(self.peer)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.requests <= self.throttle_first:
+                return web.json_response({}, status=429, headers={"Retry-After": "0.2"})
+            if self.requests <= self.fail_first:
+                return web.json_response({}, status=503)
+            if body is None:
+                return web.json_response({}, status=404)
+            return web.json_response(body)
+        finally:
+            self.in_flight -= 1
+
+    async def account(self, request):
+        self.path = "account"
+        self.peer = request.transport.get_extra_info("peername")
+        name = request.match_info["name"]
+        return await self.respond(None if name == "missing" else {"puuid": f"puuid-{name}"})
+
+    async def summoner(self, request):
+        self.path = "summoner"
+        self.peer = request.transport.get_extra_info("peername")
+        return await self.respond({"id": request.match_info["puuid"].replace("puuid", "summoner")})
+
+    async def summoner_by_name(self, request):
+        self.path = "summoner_by_name"
+        self.peer = request.transport.get_extra_info("peername")
+        name = request.match_info["name"]
+        return await self.respond({
+            "name": name, "summonerLevel": 30, "profileIconId": 7, "puuid": f"puuid-{name}",
+            "accountId": f"account-{name}", "id": f"summoner-{name}"
+        })
+
+    async def entries(self, request):
+        self.path = "league"
+        self.peer = request.transport.get_extra_info("peername")
+        if request.match_info["summoner_id"] in self.stale_summoners:
+            return await self.respond(None)
+        return await self.respond([
+            {"queueType": "RANKED_FLEX_SR", "tier": "IRON", "rank": "IV", "wins": 1, "losses": 1},
+            {"queueType": "RANKED_SOLO_5x5", "tier": "GOLD", "rank": "II", "wins": 30, "losses": 20},
+        ])
+
+
+@pytest.fixture()
+def refresh_db(tmp_path):
+    db_name = str(tmp_path / "riot.db")
+    db = initialize_database(db_name)
+    for index in range(12):
+        db.cursor.execute(
+            "INSERT INTO player (user_id, game_name, tag_id) VALUES (?, ?, ?)",
+            (index + 1, f"player{index}", f"NA{index}")
+        )
+        db.cursor.execute(
+            "INSERT INTO game (user_id, game_name, tier, rank) VALUES (?, ?, 'unranked', '')",
+            (index + 1, f"player{index}")
+        )
+    db.connection.commit()
+    db.close_db()
+    return db_name
+
+
+async def run_refresh(fake, db_name, players, sweeps=1, **kwargs):
+    async def refresh(pipeline):
+        for _ in range(sweeps):
+            stats = await pipeline.refresh_players(players)
+        return stats
+
+    return await with_pipeline(fake, db_name, refresh, **kwargs)
+
+
+async def with_pipeline(fake, db_name, function, rate_limits=None, cache_seconds=0, **kwargs):
+    server = TestServer(fake.app())
+    await server.start_server()
+    url = str(server.make_url("")).rstrip("/")
+    client = RiotClient(api_key="test-key", rate_limits=rate_limits, cache_seconds=cache_seconds)
+    pipeline = RiotRefreshPipeline(client=client, db_name=db_name, account_url=url, platform_url=url, **kwargs)
+    try:
+        return await function(pipeline)
+    finally:
+        await client.close()
+        await server.close()
+
+
+def refreshed_ids(db_name):
+    game = Game(db_name=db_name)
+    rows = game.cursor.execute("SELECT user_id FROM player WHERE riot_refreshed_at IS NOT NULL ORDER BY user_id").fetchall()
+    game.close_db()
+    return [row[0] for row in rows]
+
+
+@pytest.mark.asyncio
+async def test_refresh_players_bounds_concurrency_and_batches_writes(refresh_db):
+    fake = FakeRiot()
+    players = [(index + 1, f"player{index}", f"NA{index}") for index in range(12)]
+    players.append((99, "missing", "NA0"))
+
+    stats = await run_refresh(fake, refresh_db, players, concurrency=4, batch_size=5, rate_limits=((1000, 1),))
+
+    assert fake.max_in_flight <= 4
+    assert fake.max_in_flight > 1
+    # Three requests per ranked player and one for the unknown account
+    assert stats["requests"] == 12 * 3 + 1
+    assert stats["players_updated"] == 12
+    assert stats["batches"] == 3
+
+    game = Game(db_name=refresh_db)
+    rows = game.cursor.execute("SELECT DISTINCT tier, rank, wins, losses FROM game").fetchall()
+    game.close_db()
+    assert rows == [("GOLD", "II", 30, 20)]
+
+
+@pytest.mark.asyncio
+async def test_refresh_players_waits_for_retry_after(refresh_db):
+    fake = FakeRiot(throttle_first=2)
+
+    started = time.monotonic()
+    stats = await run_refresh(fake, refresh_db, [(1, "player0", "NA0")], concurrency=2, rate_limits=((1000, 1),))
+
+    assert time.monotonic() - started >= 0.2
+    assert stats["retries"] == 2
+    assert stats["players_updated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_players_reuses_resolved_riot_ids(refresh_db):
+    fake = FakeRiot()
+    players = [(index + 1, f"player{index}", f"NA{index}") for index in range(3)]
+
+    # The first sweep resolves every Riot ID, the second only asks for league entries
+    stats = await run_refresh(fake, refresh_db, players, sweeps=2, rate_limits=((1000, 1),))
+
+    assert fake.paths.count("account") == 3
+    assert fake.paths.count("summoner") == 3
+    assert fake.paths.count("league") == 6
+    assert stats["identity_hits"] == 3
+    assert stats["players_updated"] == 3
+
+
+@pytest.mark.asyncio
+async def test_stale_summoner_id_is_resolved_again(refresh_db):
+    fake = FakeRiot()
+    game = Game(db_name=refresh_db)
+    game.cursor.execute(
+        "INSERT INTO riot_identity (game_name, tag_id, puuid, summoner_id) VALUES ('PLAYER0', 'na0', 'old', 'gone')"
+    )
+    game.connection.commit()
+    fake.stale_summoners.add("gone")
+
+    stats = await run_refresh(fake, refresh_db, [(1, "player0", "NA0")], rate_limits=((1000, 1),))
+
+    assert fake.paths == ["league", "account", "summoner", "league"]
+    assert stats["players_updated"] == 1
+    rows = game.cursor.execute("SELECT puuid, summoner_id FROM riot_identity").fetchall()
+    game.close_db()
+    assert rows == [("puuid-player0", "summoner-player0")]
+
+
+@pytest.mark.asyncio
+async def test_failed_lookups_are_not_stamped(refresh_db):
+    fake = FakeRiot()
+    fake.fail_first = 1
+
+    async def refresh(pipeline):
+        pipeline.client.max_retries = 0
+        # Player 1 meets the outage, player 2 is ranked and player 3 is a definitive 404
+        return await pipeline.refresh_players([(1, "player0", "NA0"), (2, "player1", "NA1"), (3, "missing", "NA2")])
+
+    stats = await with_pipeline(fake, refresh_db, refresh, concurrency=1, rate_limits=((1000, 1),))
+
+    assert stats["failed"] == 1
+    assert refreshed_ids(refresh_db) == [2, 3]
+
+
+def riot_api(pipeline, db_name):
+    api = RiotAPI(client=pipeline.client)
+    api.base_url = f"{pipeline.platform_url}/lol"
+    api.dao = AsyncDAO(db_name)
+    return api
+
+
+@pytest.mark.asyncio
+async def test_riot_api_uses_cached_identity(refresh_db):
+    fake = FakeRiot()
+
+    async def lookup(pipeline):
+        api = riot_api(pipeline, refresh_db)
+        await api.dao.transaction(Riot_identity.store, "player0", "NA0", "puuid-player0", "summoner-player0")
+        return await api.get_player_info("player0", "NA0")
+
+    info = await with_pipeline(fake, refresh_db, lookup, rate_limits=((1000, 1),))
+
+    # A known Riot ID costs only the ranked request
+    assert fake.paths == ["league"]
+    assert (info["puuid"], info["id"], info["level"]) == ("puuid-player0", "summoner-player0", None)
+    assert (info["tier"], info["rank"], info["wins"], info["losses"]) == ("gold", "II", 30, 20)
+
+
+@pytest.mark.asyncio
+async def test_riot_api_looks_up_stale_identity_again(refresh_db):
+    fake = FakeRiot()
+    fake.stale_summoners.add("gone")
+
+    async def lookup(pipeline):
+        api = riot_api(pipeline, refresh_db)
+        await api.dao.transaction(Riot_identity.store, "player0", "NA0", "old", "gone")
+        info = await api.get_player_info("player0", "NA0")
+        return info, await api.dao.transaction(Riot_identity.fetch, "player0", "NA0")
+
+    info, identity = await with_pipeline(fake, refresh_db, lookup, rate_limits=((1000, 1),))
+
+    assert fake.paths == ["league", "summoner_by_name", "league"]
+    assert (info["level"], info["tier"]) == (30, "gold")
+    assert identity == ("puuid-player0", "summoner-player0")
+
+
+@pytest.mark.asyncio
+async def test_riot_api_league_entries_tell_missing_from_failed(refresh_db):
+    fake = FakeRiot()
+    fake.stale_summoners.add("gone")
+
+    async def lookups(pipeline):
+        api = riot_api(pipeline, refresh_db)
+        missing = await api.fetch_league_entries("gone")
+        pipeline.client.max_retries = 0
+        fake.fail_first = fake.requests + 1
+        failed = await api.fetch_league_entries("summoner-player0")
+        return missing, failed
+
+    missing, failed = await with_pipeline(fake, refresh_db, lookups, rate_limits=((1000, 1),))
+
+    # A 404 means the summoner ID is gone, an error only means no entries this time
+    assert missing is None
+    assert failed == []
+
+
+@pytest.mark.asyncio
+async def test_scheduler_tick_puts_checked_in_players_first_within_budget(refresh_db):
+    fake = FakeRiot()
+    game = Game(db_name=refresh_db)
+    game.cursor.execute("UPDATE player SET checked_in_at = datetime('now') WHERE user_id IN (11, 12)")
+    # Player 1 was refreshed recently and is not due
+    game.cursor.execute("UPDATE player SET riot_refreshed_at = datetime('now', '-5 minutes') WHERE user_id = 1")
+    game.connection.commit()
+    game.close_db()
+
+    async def tick(pipeline):
+        # Half of 24 requests per 60s tick is room for four players with unknown Riot IDs
+        scheduler = RiotRefreshScheduler(pipeline, tick_seconds=60, stale_minutes=60, checkin_stale_minutes=10,
+                                         background_share=0.5)
+        assert scheduler.tick_budget() == 12
+        return await scheduler.run_tick()
+
+    updated = await with_pipeline(fake, refresh_db, tick, rate_limits=((1000, 1), (48, 120)))
+
+    assert updated == 4
+    assert fake.requests == 12
+    refreshed = refreshed_ids(refresh_db)
+    assert 11 in refreshed and 12 in refreshed
+    assert len(refreshed) == 5
+
+
+@pytest.mark.asyncio
+async def test_ticks_leave_headroom_for_refresh_now(refresh_db):
+    fake = FakeRiot()
+
+    async def tick_then_refresh(pipeline):
+        scheduler = RiotRefreshScheduler(pipeline, tick_seconds=60, stale_minutes=60, background_share=0.5)
+        # The tick may spend 6 of the 12 requests the window allows
+        assert scheduler.tick_budget() == 6
+        ticked = await scheduler.run_tick()
+        waiting = [user_id for user_id in range(1, 13) if user_id not in refreshed_ids(refresh_db)][:2]
+        # Two more unknown Riot IDs fit in the rest of the window without waiting for it to roll over
+        return ticked, await scheduler.refresh_now(waiting, timeout=5)
+
+    ticked, on_demand = await with_pipeline(fake, refresh_db, tick_then_refresh, rate_limits=((1000, 1), (12, 60)))
+
+    assert (ticked, on_demand) == (2, 2)
+    assert fake.requests == 12
+
+
+@pytest.mark.asyncio
+async def test_refresh_now_skips_fresh_players(refresh_db):
+    fake = FakeRiot()
+
+    async def refresh_twice(pipeline):
+        scheduler = RiotRefreshScheduler(pipeline, stale_minutes=60)
+        first = await scheduler.refresh_now([1, 2, 3], timeout=10)
+        second = await scheduler.refresh_now([1, 2, 3, 4], timeout=10)
+        return first, second
+
+    first, second = await with_pipeline(fake, refresh_db, refresh_twice, rate_limits=((1000, 1),))
+
+    assert (first, second) == (3, 1)
+    assert fake.paths.count("league") == 4
+    assert refreshed_ids(refresh_db) == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_riot_client_reuses_connections_and_caches_responses(refresh_db):
+    fake = FakeRiot(delay=0.05)
+
+    async def lookups(pipeline):
+        url = f"{pipeline.platform_url}/lol/league/v4/entries/by-summoner/summoner-player0"
+        # Identical requests in flight are sent once, later ones come from the cache
+        first = await asyncio.gather(*(pipeline.client.request_json(url) for _ in range(5)))
+        second = await pipeline.client.request_json(url)
+        uncached = await pipeline.client.request_json(url, cache=False)
+        for index in range(6):
+            await pipeline.client.request_json(f"{pipeline.platform_url}/lol/summoner/v4/summoners/by-puuid/puuid-{index}")
+        return first, second, uncached, pipeline.client.stats
+
+    first, second, uncached, stats = await with_pipeline(fake, refresh_db, lookups, cache_seconds=60)
+
+    assert all(body == second == uncached for body in first)
+    assert fake.paths.count("league") == 2
+    assert stats["cache_hits"] == 5
+    # Sequential requests travel over one keep-alive connection
+    assert len(fake.peers) == 1
+
+
+@pytest.mark.asyncio
+async def test_riot_client_retries_server_errors_with_backoff(refresh_db, monkeypatch):
+    fake = FakeRiot()
+    fake.fail_first = 2
+    delays = []
+
+    async def lookup(pipeline):
+        original = pipeline.client.backoff
+
+        def backoff(attempt):
+            delays.append(original(attempt) / 100)
+            return delays[-1]
+
+        monkeypatch.setattr(pipeline.client, "backoff", backoff)
+        return await pipeline.client.request_json(f"{pipeline.platform_url}/lol/summoner/v4/summoners/by-puuid/puuid-x")
+
+    body = await with_pipeline(fake, refresh_db, lookup)
+
+    assert body == {"id": "summoner-x"}
+    assert fake.requests == 3
+    # Jitter keeps every delay between half and all of the exponential step
+    assert 0.005 <= delays[0] <= 0.01
+    assert 0.01 <= delays[1] <= 0.02
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_holds_every_window():
+    limiter = RateLimiter(parse_rate_limits("3:0.2, 5:0.5"))
+
+    started = time.monotonic()
+    stamps = []
+    for _ in range(6):
+        await limiter.acquire()
+        stamps.append(time.monotonic() - started)
+
+    assert parse_rate_limits("20:1,100:120") == ((20, 1.0), (100, 120.0))
+    # 3 per 0.2s lets the first three through, the fourth waits for the window
+    assert stamps[2] < 0.1
+    assert stamps[3] >= 0.19
+    # 5 per 0.5s holds the sixth until the first request leaves that window
+    assert stamps[5] >= 0.49
+
+
+@pytest.mark.asyncio
+async def test_riot_id_resolution_does_not_hold_up_registration(monkeypatch):
+    from tournament_bot.bot.views import common
+    release = asyncio.Event()
+    resolved = []
+
+    class SlowPipeline:
+        async def resolve_identity(self, game_name, tag_id):
+            await release.wait()
+            resolved.append((game_name, tag_id))
+            return ("puuid", "summoner")
+
+    monkeypatch.setattr(common, "get_refresh_pipeline", lambda: SlowPipeline())
+
+    # Scheduling returns at once, the lookup finishes later without anyone awaiting it
+    task = common.schedule_riot_id_resolution("player0", "NA0")
+    assert task in common._resolve_tasks and not resolved
+    release.set()
+    await task
+    assert resolved == [("player0", "NA0")]
+    assert task not in common._resolve_tasks
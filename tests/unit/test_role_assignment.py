@@ -169,5 +169,38 @@ class TestRoleAssignment(unittest.TestCase):
         self.assertEqual(mid_player['user_id'], 'player6',
                          "Player with highest mid performance should be assigned mid")
 
+
+    def test_assign_team_roles_maximizes_total_performance(self):
+        """Test that the assignment has the best total over every role permutation"""
+        import itertools
+
+        team = [
+            {'user_id': 'p1', 'roleBasedPerformance': {'top': 1.0, 'mid': 0.95}},
+            {'user_id': 'p2', 'roleBasedPerformance': {'top': 0.99}},
+            {'user_id': 'p3', 'roleBasedPerformance': {'mid': 0.9, 'jungle': 0.5}},
+            {'user_id': 'p4', 'roleBasedPerformance': {'bottom': 0.8}},
+            {'user_id': 'p5', 'roleBasedPerformance': {'support': 0.7, 'bottom': 0.75}}
+        ]
+        standard_roles = ["top", "jungle", "mid", "bottom", "support"]
+
+        def total(roles):
+            return sum(player['roleBasedPerformance'].get(role, -100.0) for player, role in zip(team, roles))
+
+        best_total = max(total(roles) for roles in itertools.permutations(standard_roles))
+        assigned_team = self.matchmaker.assign_team_roles(team)
+
+        self.assertAlmostEqual(total([player['assigned_role'] for player in assigned_team]), best_total)
+        self.assertNotIn('assigned_role', team[0], "Input players should not be modified")
+
+    def test_assign_team_roles_forces_extra_players(self):
+        """Test that players beyond the five roles are marked as forced"""
+        team = self.test_team + [{'user_id': 'player6', 'roleBasedPerformance': {'mid': 0.1}}]
+
+        assigned_team = self.matchmaker.assign_team_roles(team)
+        assigned_roles = [player['assigned_role'] for player in assigned_team]
+
+        self.assertEqual(assigned_roles.count('forced'), 1)
+        self.assertEqual(assigned_team[5]['assigned_role'], 'forced')
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file